@@ -4,14 +4,70 @@ from src.music_theory.core.constants import notes, scales, chords, interval_half
 from src.music_theory.core.notes import (
     note_to_midi,
     note_string_to_midi,
+    note_strings_to_midi,
+    find_invalid_note_strings,
+    InvalidNoteError,
     midi_to_note_string,
     build_scale_midi,
     build_scale_note_strings,
     build_chord,
+    voicing_cache_info,
+    clear_voicing_cache,
     build_diatonic_chord,
     transpose_note_to_string,
     transpose_to_midi,
 )
+from src.music_theory.core.chord import Chord
+from src.music_theory.core.chord_graph import ChordGraph, ChordPath, chord_graph, find_chord_paths
+from src.music_theory.core.chord_symbols import ChordSymbol, parse_chord_symbol, iter_lead_sheet
+from src.music_theory.core.chord_index import (
+    ChordIndex,
+    chord_index,
+    identify_chords_batch,
+    pitch_class_mask,
+    pitch_class_masks,
+)
+from src.music_theory.core.key import Key
+from src.music_theory.core.markov import MarkovProgressionModel
+from src.music_theory.core.neo_riemannian import (
+    transform_table,
+    apply_transforms,
+    tonnetz_walks,
+    triad_index,
+    triad_name,
+    triad_voicings,
+    walk_to_progression,
+)
+from src.music_theory.core.pitch_class_set import PitchClassSet, common_tone_count
+from src.music_theory.core.registry import (
+    TypeRegistry,
+    registry,
+    register_chord,
+    register_scale,
+    register_interval,
+)
+from src.music_theory.core.roman import RomanPlan, compile_roman, roman_progression
+from src.music_theory.core.scale_index import ScaleIndex, scale_index, find_scales_batch
+from src.music_theory.core.scale_table import ScaleTable, scale_table
+from src.music_theory.core.spelling import midi_to_note_strings, note_spelling_table, parse_key
+from src.music_theory.core.voice_leading import (
+    VoiceLeadingDistances,
+    voice_leading_distances,
+    taxicab_distance_matrix,
+    mean_distance_matrix,
+    common_tone_matrix,
+    VoiceAssignment,
+    voice_assignment,
+    voice_assignment_distances,
+    voice_assignment_matrix,
+    optimal_voice_leading,
+)
+from src.music_theory.core.voicing import (
+    iter_chord_voicings,
+    top_chord_voicings,
+    count_chord_voicings,
+    chord_voicing_at,
+)
 
 __all__ = [
     "notes",
@@ -20,11 +76,70 @@ __all__ = [
     "interval_half_steps",
     "note_to_midi",
     "note_string_to_midi",
+    "note_strings_to_midi",
+    "find_invalid_note_strings",
+    "InvalidNoteError",
     "midi_to_note_string",
     "build_scale_midi",
     "build_scale_note_strings",
     "build_chord",
+    "voicing_cache_info",
+    "clear_voicing_cache",
     "build_diatonic_chord",
     "transpose_note_to_string",
     "transpose_to_midi",
+    "Chord",
+    "ChordGraph",
+    "ChordPath",
+    "chord_graph",
+    "find_chord_paths",
+    "ChordSymbol",
+    "parse_chord_symbol",
+    "iter_lead_sheet",
+    "ChordIndex",
+    "chord_index",
+    "identify_chords_batch",
+    "pitch_class_mask",
+    "pitch_class_masks",
+    "Key",
+    "MarkovProgressionModel",
+    "transform_table",
+    "apply_transforms",
+    "tonnetz_walks",
+    "triad_index",
+    "triad_name",
+    "triad_voicings",
+    "walk_to_progression",
+    "PitchClassSet",
+    "common_tone_count",
+    "TypeRegistry",
+    "registry",
+    "register_chord",
+    "register_scale",
+    "register_interval",
+    "RomanPlan",
+    "compile_roman",
+    "roman_progression",
+    "ScaleIndex",
+    "scale_index",
+    "find_scales_batch",
+    "ScaleTable",
+    "scale_table",
+    "midi_to_note_strings",
+    "note_spelling_table",
+    "parse_key",
+    "VoiceLeadingDistances",
+    "voice_leading_distances",
+    "taxicab_distance_matrix",
+    "mean_distance_matrix",
+    "common_tone_matrix",
+    "VoiceAssignment",
+    "voice_assignment",
+    "voice_assignment_distances",
+    "voice_assignment_matrix",
+    "optimal_voice_leading",
+    "iter_chord_voicings",
+    "top_chord_voicings",
+    "count_chord_voicings",
+    "chord_voicing_at",
 ]
@@ -3,10 +3,184 @@ Chord module for generating chord progressions and arpeggios.
 
 This module provides tools for creating chord progressions based on scale degrees,
 with support for inversions, modal interchange, and custom chord voicings.
-It also includes utilities for arpeggiating chords with custom patterns.
+It also includes utilities for arpeggiating chords with custom patterns, and the
+Chord value object that carries a voiced chord through these functions.
 """
 
-from src.music_theory.core.notes import build_scale_midi, midi_to_note_string, extend_notes_across_octaves
+from functools import lru_cache
+from weakref import WeakValueDictionary
+
+import numpy as np
+
+from src.music_theory.core.chord_index import chord_index
+from src.music_theory.core.constants import chords, interval_half_steps
+from src.music_theory.core.notes import midi_to_note_string, extend_notes_across_octaves, build_chord, note_to_midi
+from src.music_theory.core.pitch_class_set import PitchClassSet, pitch_class_mask
+from src.music_theory.core.registry import registry
+from src.music_theory.core.scale_table import scale_table
+
+
+class Chord:
+    """
+    An immutable, interned voiced chord.
+
+    Stores the root, chord type, inversion and a sorted tuple of MIDI notes, and
+    computes the pitch-class mask and bass once. Equal chords are the same
+    object, so they are cheap dict and memoization keys. A Chord iterates,
+    indexes and measures like its note tuple, so it can be passed to any
+    function that reads a list of notes; list(chord) gives a mutable copy.
+
+    Attributes:
+        root (int | None): Root MIDI note, if known.
+        chord_type (str | None): Key of constants.chords, if known.
+        inversion (int | None): Which chord tone is in the bass, if known.
+        notes (tuple[int]): Sorted MIDI notes.
+        mask (int): 12-bit pitch-class mask of the notes.
+        bass (int | None): Lowest note, or None for an empty chord.
+
+    Example:
+        >>> c = Chord.build("C4", "major", 1)
+        >>> c.notes, c.bass
+        ((64, 67, 72), 64)
+        >>> c is Chord.build(60, "major", 1)
+        True
+    """
+
+    __slots__ = ("root", "chord_type", "inversion", "notes", "mask", "bass", "_key", "__weakref__")
+    _interned = WeakValueDictionary()
+
+    def __new__(cls, notes, root=None, chord_type=None, inversion=None):
+        """
+        Get the interned Chord for some notes.
+
+        Args:
+            notes (Iterable[int]): MIDI notes in any order.
+            root (int | str | None): Root note, if known.
+            chord_type (str | None): Chord type, if known.
+            inversion (int | None): Inversion, if known.
+        """
+        notes = tuple(sorted(int(note) for note in notes))
+        root = None if root is None else note_to_midi(root)
+        key = (notes, root, chord_type, inversion)
+        chord = cls._interned.get(key)
+        if chord is None:
+            chord = object.__new__(cls)
+            for name, value in (("notes", notes), ("root", root), ("chord_type", chord_type),
+                                ("inversion", inversion), ("mask", pitch_class_mask(notes)),
+                                ("bass", notes[0] if notes else None), ("_key", key)):
+                object.__setattr__(chord, name, value)
+            cls._interned[key] = chord
+        return chord
+
+    @classmethod
+    def build(cls, base_note, chord_type, inversion=0, **voicing):
+        """
+        Build a chord with build_chord and intern it.
+
+        Args:
+            base_note (int | str): The root note of the chord.
+            chord_type (str): The type of chord.
+            inversion (int): The inversion number (default 0).
+            **voicing: Any other keyword argument of build_chord.
+
+        Returns:
+            Chord: The interned chord.
+        """
+        notes = build_chord(base_note, chord_type, inversion, **voicing)
+        return cls(notes, base_note, chord_type, inversion)
+
+    @classmethod
+    def from_notes(cls, notes):
+        """
+        Intern some notes, naming the chord if they form exactly one chord type.
+
+        The root and type come from an exact match in constants.chords, preferring
+        the bass as root. As in build_chord, the root is placed at or below the bass.
+
+        Args:
+            notes (Iterable[int]): MIDI notes in any order.
+
+        Returns:
+            Chord: The interned chord; root and chord_type are None if unnamed.
+        """
+        notes = sorted(notes)
+        matches = chord_index.exact_matches(pitch_class_mask(notes))
+        if not notes or not matches:
+            return cls(notes)
+        root_pc, chord_type = min(matches, key=lambda match: (match[0] - notes[0]) % 12)
+        root = notes[0] - (notes[0] - root_pc) % 12
+        return cls(notes, root, chord_type, _inversion_of(notes[0], root_pc, chord_type))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Chord is immutable")
+
+    def __reduce__(self):
+        return Chord, self._key
+
+    def __repr__(self):
+        return (f"Chord(notes={list(self.notes)}, root={self.root}, chord_type={self.chord_type!r}, "
+                f"inversion={self.inversion})")
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, Chord) and self._key == other._key)
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __iter__(self):
+        return iter(self.notes)
+
+    def __len__(self):
+        return len(self.notes)
+
+    def __getitem__(self, index):
+        return self.notes[index]
+
+    @property
+    def pitch_class_set(self):
+        """PitchClassSet: The chord's pitch classes."""
+        return PitchClassSet.from_mask(self.mask)
+
+    def transpose(self, semitones):
+        """
+        Transpose every note (and the root) by a number of semitones.
+
+        Args:
+            semitones (int): Semitones to move; negative moves down.
+
+        Returns:
+            Chord: The interned transposed chord.
+        """
+        root = None if self.root is None else self.root + semitones
+        return Chord((note + semitones for note in self.notes), root, self.chord_type, self.inversion)
+
+    def revoice(self, notes):
+        """
+        Keep the root and chord type but take new notes, e.g. from voice leading.
+
+        Args:
+            notes (Iterable[int]): The new voicing.
+
+        Returns:
+            Chord: The interned revoiced chord, with its root moved to at or
+                   below the new bass and its inversion recomputed.
+        """
+        notes = sorted(notes)
+        if not notes or self.root is None:
+            return Chord(notes, self.root, self.chord_type, self.inversion)
+        root = notes[0] - (notes[0] - self.root) % 12
+        inversion = self.inversion
+        if self.chord_type is not None:
+            inversion = _inversion_of(notes[0], self.root % 12, self.chord_type)
+        return Chord(notes, root, self.chord_type, inversion)
+
+
+def _inversion_of(bass, root_pc, chord_type):
+    """Index of the bass among the chord type's tones, or None if it is not a chord tone."""
+    for index, interval in enumerate(chords[chord_type]):
+        if (root_pc + interval_half_steps[interval]) % 12 == bass % 12:
+            return index
+    return None
 
 
 class ScaledChordProgression:
@@ -39,7 +213,7 @@ class ScaledChordProgression:
         """
         self.base_note = base_note
 
-    def generate_progression(self, degrees, scale_type="major", chord_types=None):
+    def generate_progression(self, degrees, scale_type="major", chord_types=None, as_chords=False):
         """
         Generate a chord progression based on scale degrees.
 
@@ -63,42 +237,147 @@ class ScaledChordProgression:
                 - [1, 3, 5] = triad (root, 3rd, 5th)
                 - [1, 3, 5, 7] = seventh chord
                 - [0, 2, 4, 6] = same as [1, 3, 5, 7] (0-indexed internally)
+            as_chords (bool): If True, return interned Chord objects (named via
+                Chord.from_notes) instead of lists. Default is False.
 
         Returns:
-            list[list[int]]: A list of chords, where each chord is a list of
-                             MIDI note numbers.
+            list[list[int]] | list[Chord]: A list of chords, where each chord is
+                             a list of MIDI note numbers (or a Chord).
 
         Example:
             >>> scp = ScaledChordProgression(48)
             >>> # I-IV(1st inv)-vi-V progression with 7th chords
             >>> cp = scp.generate_progression([1, (4, 1), 6, 5], "major", [[1,3,5,7]]*4)
+
+        Raises:
+            ValueError: If chord_types does not have one voicing per degree.
         """
         if chord_types is None:
-            chord_types = [[1, 3, 5] for _ in range(len(degrees))]
-
-        chord_types = [list(ct) for ct in chord_types]
-        for chord_type in chord_types:
-            for note_index in range(len(chord_type)):
-                chord_type[note_index] = chord_type[note_index] - 1
+            chord_types = [[1, 3, 5]] * len(degrees)
+        _check_chord_types(degrees, chord_types)
 
+        _sync_progression_offsets()
+        base_note = note_to_midi(self.base_note)
         cp = []
-        for i in range(len(degrees)):
-            degree = degrees[i]
-            chord_type = chord_types[i]
-            if type(degree) == int:
-                degree = (degree,0,scale_type )
-            elif type(degree) == tuple and len(degree) == 2:
-                degree = (degree[0], degree[1], scale_type)
-            start_note = degree[0] - 1
-            inversion = degree[1]
-            mode = degree[2]
-            parallel_scale_notes = extend_notes_across_octaves(build_scale_midi(self.base_note, mode), 5)
-            chord = [parallel_scale_notes[start_note + x] for x in
-                     (chord_type + [y + 7 for y in chord_type])[inversion:inversion + len(chord_type)]]
-            cp.append(chord)
+        for degree, chord_type in zip(degrees, chord_types):
+            chord = [base_note + offset for offset in _progression_chord_offsets(
+                *_normalize_degree(degree, scale_type), tuple(chord_type))]
+            cp.append(Chord.from_notes(chord) if as_chords else chord)
 
         return cp
 
+    def generate_progressions(self, degree_sequences, scale_type="major", chord_types=None, base_notes=None,
+                              chord_type=None):
+        """
+        Render many degree sequences, optionally in many keys, into one array.
+
+        Each distinct (degree, chord type) pair is resolved once; the output is
+        then a single gather plus the base notes.
+
+        Args:
+            degree_sequences (list[list]): Degree sequences in the format of
+                generate_progression; shorter sequences are padded.
+            scale_type (str): The scale type to use. Default is "major".
+            chord_types (list[list[list[int]]] | None): One chord voicing list
+                per sequence, each with one voicing per degree (as in
+                generate_progression), or None.
+            base_notes (array-like | None): Base notes to render every sequence
+                in, e.g. self.base_note + np.arange(12) for all transpositions.
+                Default is self.base_note only.
+            chord_type (list[int] | None): One voicing for every chord, e.g.
+                [1, 3, 5, 7]; used when chord_types is None. Default is
+                triads.
+
+        Returns:
+            np.ndarray: MIDI notes of shape (sequences, chords, notes), or
+                (len(base_notes), sequences, chords, notes) if base_notes is
+                given. Missing chords and notes of smaller chords are -1.
+
+        Example:
+            >>> scp = ScaledChordProgression(48)
+            >>> scp.generate_progressions([[1, 4, 5, 1]], base_notes=48 + np.arange(12)).shape
+            (12, 1, 4, 3)
+
+        Raises:
+            ValueError: If both chord_types and chord_type are given, or
+                chord_types does not have one voicing list per sequence and
+                one voicing per degree.
+        """
+        if chord_types is None:
+            chord_types = [[[1, 3, 5] if chord_type is None else chord_type] * len(degrees)
+                           for degrees in degree_sequences]
+        elif chord_type is not None:
+            raise ValueError("chord_types and chord_type cannot both be given")
+        elif len(chord_types) != len(degree_sequences):
+            raise ValueError(f"chord_types has {len(chord_types)} voicing lists it has to have one per sequence "
+                             f"({len(degree_sequences)})")
+        _sync_progression_offsets()
+        tokens, token_ids = {}, []
+        for degrees, sequence_types in zip(degree_sequences, chord_types):
+            _check_chord_types(degrees, sequence_types)
+            token_ids.append([
+                tokens.setdefault((_normalize_degree(degree, scale_type), tuple(chord_type)), len(tokens))
+                for degree, chord_type in zip(degrees, sequence_types)])
+
+        width = max((len(chord_type) for _, chord_type in tokens), default=0)
+        table = np.full((len(tokens) + 1, width), -1, dtype=np.int64)
+        for (degree, chord_type), token in tokens.items():
+            offsets = _progression_chord_offsets(*degree, chord_type)
+            table[token, :len(offsets)] = offsets
+        ids = np.full((len(degree_sequences), max((len(row) for row in token_ids), default=0)), len(tokens))
+        for row, sequence_ids in enumerate(token_ids):
+            ids[row, :len(sequence_ids)] = sequence_ids
+
+        offsets = table[ids]
+        bases = np.asarray(note_to_midi(self.base_note) if base_notes is None else base_notes, dtype=np.int64)
+        notes = bases.reshape(bases.shape + (1, 1, 1)) + offsets
+        return np.where(offsets >= 0, notes, -1)
+
+
+def _check_chord_types(degrees, chord_types):
+    """Raise ValueError unless there is one chord voicing per degree."""
+    if len(chord_types) != len(degrees):
+        raise ValueError(f"chord_types has {len(chord_types)} voicings it has to have one per degree ({len(degrees)})")
+
+
+def _normalize_degree(degree, scale_type):
+    """Expand a degree item of generate_progression to (degree, inversion, mode)."""
+    if type(degree) == int:
+        return degree, 0, scale_type
+    if len(degree) == 2:
+        return degree[0], degree[1], scale_type
+    return tuple(degree)
+
+
+# Scale definitions version the cached progression offsets were built from.
+_offsets_version = registry.version("scales")
+
+
+def _sync_progression_offsets():
+    """Empty the progression offset cache if a scale type was redefined since it was filled."""
+    global _offsets_version
+    if _offsets_version != registry.version("scales"):
+        changes = registry.changes_since("scales", _offsets_version)
+        if changes.replaced:
+            _progression_chord_offsets.cache_clear()
+        _offsets_version = changes.snapshot.version
+
+
+@lru_cache(maxsize=4096)
+def _progression_chord_offsets(degree, inversion, mode, chord_type):
+    """
+    Semitone offsets from the base note of one progression chord.
+
+    chord_type holds 1-based scale intervals. Inverting moves the lowest tones
+    up by one octave of the scale, i.e. by the scale length in scale steps, so
+    scales of any size invert correctly.
+    """
+    scale_length = scale_table.scale_length(mode)
+    intervals = [interval - 1 for interval in chord_type]
+    intervals = (intervals + [interval + scale_length for interval in intervals])[inversion:inversion + len(intervals)]
+    return tuple(scale_table.offsets(mode, [degree - 1 + interval for interval in intervals]).tolist())
+
+
 def build_arpeggio_from_chord(chord, length, pattern=None):
     """
     Generate an arpeggiated sequence from a chord.
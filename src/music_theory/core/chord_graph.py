@@ -0,0 +1,261 @@
+"""
+Chord graph module for finding smooth paths between harmonies.
+
+Nodes are every (root, chord_type, inversion) from constants.chords, each
+voiced in close position around a common register, and edge weights are the
+voice-leading cost between every pair of node voicings. The edge table is
+computed once per graph (a single kernel call), again only after chord
+definitions change, and reused by every query.
+
+Path queries bound the number of chords and may not come back to a chord
+once they have left it. Min-plus steps over all nodes at once (NumPy) give
+the cheapest cost from every node to the goal for each number of remaining
+chords, ignoring that rule. These exact lower bounds guide a best-first (A*)
+search over partial paths that applies the rule while it expands them, so
+complete paths come off the priority queue cheapest first and the first k
+are the k shortest valid paths.
+"""
+
+import heapq
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.constants import chords
+from src.music_theory.core.key import Key
+from src.music_theory.core.notes import build_chord, note_to_midi
+from src.music_theory.core.pitch_class_set import pitch_class_mask
+from src.music_theory.core.registry import registry
+from src.music_theory.core.voice_leading import taxicab_distance_matrix, voice_assignment_matrix
+
+ChordSpec = Union[Tuple[Union[int, str], str], Tuple[Union[int, str], str, int]]
+
+_COLUMN_CHUNK = 256
+
+
+class ChordPath(NamedTuple):
+    """A path through the chord graph: total cost, (root pitch class, chord_type, inversion) nodes and voicings."""
+    cost: int
+    chords: List[Tuple[int, str, int]]
+    voicings: List[List[int]]
+
+
+class ChordGraph:
+    """
+    Graph of voiced chords with precomputed voice-leading edge costs.
+
+    Nodes are built on first use, and rebuilt when chord types are registered
+    or redefined; a graph over all chord types picks up new ones.
+
+    Attributes:
+        nodes (List[Tuple[int, str, int]]): (root pitch class, chord_type, inversion) per node.
+        voicings (List[List[int]]): The voicing of each node.
+
+    Example:
+        >>> path = chord_graph.shortest_paths(("C", "major_seventh"), ("Fs", "half_diminished_seventh"), min_chords=3,
+        ...                                   max_chords=4, chord_types=["minor_seventh", "dominant_seventh"])[0]
+        >>> [(root, chord_type) for root, chord_type, _ in path.chords]
+        [(0, 'major_seventh'), (0, 'dominant_seventh'), (6, 'half_diminished_seventh')]
+    """
+
+    def __init__(self, chord_types: Optional[Sequence[str]] = None, center: int = 64, metric: str = "assignment"):
+        """
+        Initialize a ChordGraph.
+
+        Args:
+            chord_types: Chord types to include (default: all of constants.chords).
+            center: Every voicing is moved by octaves so its mean pitch lies
+                    within 6 semitones of center.
+            metric: Edge cost, "assignment" (voice_assignment, every voice
+                    takes part) or "taxicab" (calculate_taxicab_distance_between_notes,
+                    which lets extra voices of the larger chord move for free).
+
+        Raises:
+            ValueError: If a chord type or the metric is not supported.
+        """
+        if chord_types is not None:
+            for chord_type in chord_types:
+                if chord_type not in chords:
+                    raise ValueError(f"not supported chord {chord_type}")
+        if metric not in ("taxicab", "assignment"):
+            raise ValueError(f"metric is {metric} it has to be 'taxicab' or 'assignment'")
+        self.metric = metric
+        self._center = center
+        self._chord_types = None if chord_types is None else list(chord_types)
+        self._nodes: List[Tuple[int, str, int]] = []
+        self._voicings: List[List[int]] = []
+        self._edges: Optional[np.ndarray] = None
+        self._version = -1
+
+    def _build(self) -> None:
+        """Voice every node from the current chord definitions; edges are recomputed on next use."""
+        snapshot = registry.snapshot("chords")
+        chord_types = list(snapshot.definitions) if self._chord_types is None else self._chord_types
+        for chord_type in chord_types:
+            if chord_type not in snapshot.definitions:
+                raise ValueError(f"not supported chord {chord_type}")
+        self._nodes, self._voicings = [], []
+        for root in range(12):
+            for chord_type in chord_types:
+                for inversion in range(len(snapshot.definitions[chord_type])):
+                    voicing = build_chord(root, chord_type, inversion)
+                    shift = 12 * round((self._center - sum(voicing) / len(voicing)) / 12)
+                    self._nodes.append((root, chord_type, inversion))
+                    self._voicings.append([note + shift for note in voicing])
+        self._roots = np.array([root for root, _, _ in self._nodes])
+        self._types = np.array([chord_type for _, chord_type, _ in self._nodes])
+        chord_ids = {chord: index for index, chord in enumerate(dict.fromkeys(node[:2] for node in self._nodes))}
+        self._chord_ids = np.array([chord_ids[node[:2]] for node in self._nodes])
+        self._masks = np.array([pitch_class_mask(voicing) for voicing in self._voicings])
+        self._edges = None
+        self._version = snapshot.version
+
+    @property
+    def nodes(self) -> List[Tuple[int, str, int]]:
+        """(root pitch class, chord_type, inversion) per node."""
+        if self._version != registry.version("chords"):
+            self._build()
+        return self._nodes
+
+    @property
+    def voicings(self) -> List[List[int]]:
+        """The voicing of each node."""
+        if self._version != registry.version("chords"):
+            self._build()
+        return self._voicings
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Voice-leading cost between every pair of nodes, built on first use."""
+        if self._edges is None or self._version != registry.version("chords"):
+            voicings = self.voicings
+            kernel = voice_assignment_matrix if self.metric == "assignment" else taxicab_distance_matrix
+            self._edges = kernel(voicings, voicings)
+        return self._edges
+
+    def node_indices(self, chord: ChordSpec) -> np.ndarray:
+        """Indices of the nodes for (root, chord_type), or for (root, chord_type, inversion)."""
+        nodes = self.nodes
+        root, chord_type = note_to_midi(chord[0]) % 12, chord[1]
+        selected = (self._roots == root) & (self._types == chord_type)
+        if len(chord) > 2:
+            selected &= np.array([inversion == chord[2] for _, _, inversion in nodes])
+        indices = np.flatnonzero(selected)
+        if len(indices) == 0:
+            raise ValueError(f"chord {chord} is not in the graph")
+        return indices
+
+    def shortest_paths(self, start: ChordSpec, goal: ChordSpec, min_chords: int = 2, max_chords: int = 5,
+                       k: int = 1, chord_types: Optional[Sequence[str]] = None, key: Optional[Key] = None,
+                       max_step_cost: Optional[int] = None) -> List[ChordPath]:
+        """
+        Find the k cheapest chord paths from start to goal.
+
+        Args:
+            start: (root, chord_type) or (root, chord_type, inversion) to start from.
+            goal: (root, chord_type) or (root, chord_type, inversion) to end on.
+            min_chords: Fewest chords in a path, start and goal included.
+            max_chords: Most chords in a path, start and goal included.
+            k: Number of paths to return.
+            chord_types: Chord types allowed between start and goal (default: all).
+            key: If given, chords between start and goal must lie in this Key.
+            max_step_cost: Largest allowed cost of a single step, or None.
+
+        Returns:
+            Up to k paths, cheapest first. A path never returns to a chord
+            (root and chord_type) after moving to another one; changing the
+            inversion of a chord in place is not a revisit.
+
+        Raises:
+            ValueError: If a chord is not in the graph or the length bounds are invalid.
+        """
+        if min_chords < 2 or max_chords < min_chords:
+            raise ValueError(f"chord counts {min_chords}..{max_chords} are invalid, need 2 <= min_chords <= max_chords")
+        start_nodes, goal_nodes = self.node_indices(start), self.node_indices(goal)
+        edges = self.edges.astype(np.float64)
+        if max_step_cost is not None:
+            edges[edges > max_step_cost] = np.inf
+
+        # Intermediate chords: allowed types, inside the key, and neither the start nor the goal chord.
+        passable = np.ones(len(self.nodes), dtype=bool)
+        if chord_types is not None:
+            passable &= np.isin(self._types, list(chord_types))
+        if key is not None:
+            passable &= (self._masks & ~pitch_class_mask(key.pitch_classes.tolist())) == 0
+        passable[self.node_indices(start[:2])] = False
+        passable[self.node_indices(goal[:2])] = False
+
+        # bounds[chords, node]: cheapest cost from node to a goal node for a path that already has that many chords.
+        edges[np.arange(len(edges)), np.arange(len(edges))] = np.inf
+        bounds = self._goal_bounds(edges, passable, goal_nodes, min_chords, max_chords)
+        goal_bound = np.full(len(self.nodes), np.inf)
+        goal_bound[goal_nodes] = 0
+
+        paths: List[ChordPath] = []
+        heap: list = []
+        counter = 0
+
+        def expand(cost: float, route: Tuple[int, ...]) -> None:
+            # Push the cheapest successor of route; its siblings are pushed one by one as it is popped.
+            nonlocal counter
+            last, length = route[-1], len(route) + 1
+            step_bound = np.where(passable, bounds[length], np.inf)
+            if length >= min_chords:
+                step_bound = np.minimum(step_bound, goal_bound)
+            # A chord may be re-voiced in place (inversion change) but not come back after another chord.
+            revisits = np.isin(self._chord_ids, self._chord_ids[list(route)])
+            revisits[self._chord_ids == self._chord_ids[last]] = False
+            revisits[list(route)] = True
+            totals = cost + edges[last] + step_bound
+            totals[revisits] = np.inf
+            successors = np.flatnonzero(np.isfinite(totals))
+            if len(successors):
+                successors = successors[np.argsort(totals[successors], kind="stable")]
+                heapq.heappush(heap, (totals[successors[0]], counter, cost, route, successors, totals, 0))
+                counter += 1
+
+        for node in start_nodes.tolist():
+            expand(0, (node,))
+        # Best-first search guided by exact bounds (A*): complete paths come off the heap cheapest first.
+        while heap and len(paths) < k:
+            _, _, cost, route, successors, totals, rank = heapq.heappop(heap)
+            if rank + 1 < len(successors):
+                heapq.heappush(heap, (totals[successors[rank + 1]], counter, cost, route, successors, totals, rank + 1))
+                counter += 1
+            node = int(successors[rank])
+            child_cost, child = cost + edges[route[-1], node], route + (node,)
+            if goal_bound[node] == 0:
+                paths.append(ChordPath(int(child_cost), [self.nodes[i] for i in child],
+                                       [list(self.voicings[i]) for i in child]))
+            else:
+                expand(child_cost, child)
+        return paths
+
+    @staticmethod
+    def _goal_bounds(edges: np.ndarray, passable: np.ndarray, goal_nodes: np.ndarray, min_chords: int,
+                     max_chords: int) -> np.ndarray:
+        """
+        Cheapest cost from every node to a goal node, ignoring the revisit rule, by path length.
+
+        Min-plus steps over all nodes at once give the cheapest cost in exactly s more steps; row c of the
+        result is the minimum over the step counts that complete a path which already has c chords.
+        """
+        size = len(edges)
+        steps = np.full((max_chords, size), np.inf)
+        steps[1] = edges[:, goal_nodes].min(axis=1)
+        for count in range(2, max_chords):
+            via = np.where(passable, steps[count - 1], np.inf)
+            for chunk in range(0, size, _COLUMN_CHUNK):
+                steps[count, chunk:chunk + _COLUMN_CHUNK] = (edges[chunk:chunk + _COLUMN_CHUNK] + via).min(axis=1)
+        bounds = np.full((max_chords + 1, size), np.inf)
+        for count in range(1, max_chords):
+            bounds[count] = steps[max(1, min_chords - count):max_chords - count + 1].min(axis=0)
+        return bounds
+
+
+chord_graph = ChordGraph()
+
+
+def find_chord_paths(start: ChordSpec, goal: ChordSpec, **options) -> List[ChordPath]:
+    """Find the cheapest chord paths from start to goal; see ChordGraph.shortest_paths."""
+    return chord_graph.shortest_paths(start, goal, **options)
@@ -0,0 +1,176 @@
+"""
+Chord index module for constant-time chord identification.
+
+Every set of pitch classes is encoded as a 12-bit mask (bit 0 = C, bit 11 = B).
+The index precomputes, for all 4096 masks, every (root, chord_type) from
+constants.chords whose pitch classes are contained in that mask, so
+identifying the chords in a note set is one mask computation and one table
+lookup, and a whole corpus of note sets is identified in one pass.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.constants import chords, interval_half_steps
+from src.music_theory.core.pitch_class_set import PitchClassSet, pitch_class_mask
+from src.music_theory.core.registry import registry
+
+NoteSets = Union[np.ndarray, Sequence[Iterable[int]]]
+
+
+def pitch_class_masks(note_sets: NoteSets) -> np.ndarray:
+    """
+    Encode many note sets as 12-bit masks.
+
+    Args:
+        note_sets: A 2-D integer array with one note set per row (negative
+                   entries are padding), or a sequence of note iterables or
+                   PitchClassSets.
+
+    Returns:
+        An int64 array with one mask per note set.
+    """
+    if isinstance(note_sets, np.ndarray) and note_sets.ndim == 2:
+        bits = np.where(note_sets >= 0, np.left_shift(1, note_sets % 12), 0)
+        return np.bitwise_or.reduce(bits, axis=1).astype(np.int64)
+    return np.fromiter((pitch_class_mask(notes) for notes in note_sets), dtype=np.int64, count=len(note_sets))
+
+
+def _chord_type_mask(chord_type: str, definitions=chords, intervals=interval_half_steps) -> int:
+    return pitch_class_mask(intervals[interval] for interval in definitions[chord_type])
+
+
+_QUERIES = np.arange(4096)[:, None]
+
+
+class ChordIndex:
+    """
+    Lookup table from pitch-class mask to contained (root, chord_type) pairs.
+
+    The table is built on first use. Matches are ordered by root pitch class,
+    then by the order of constants.chords. Chord types added through the
+    registry are merged into the rows that contain them; redefining one
+    rebuilds the table. Register many chord types with
+    registry.register_chords so they are merged in one pass.
+
+    Example:
+        >>> chord_index.lookup(pitch_class_mask([60, 64, 67]))
+        ((0, 'major'),)
+    """
+
+    def __init__(self):
+        self._table: Optional[List[Tuple[Tuple[int, str], ...]]] = None
+        self._exact: Dict[int, Tuple[Tuple[int, str], ...]] = {}
+        self._root_ends: Optional[np.ndarray] = None
+        self._version = -1
+
+    @staticmethod
+    def _entries(definitions, chord_types) -> Tuple[List[Tuple[int, str]], np.ndarray]:
+        """(root, chord_type) entries of some chord types on all 12 roots, by root, and their masks."""
+        intervals = registry.snapshot("intervals").definitions
+        chord_masks = [PitchClassSet.from_mask(_chord_type_mask(chord_type, definitions, intervals))
+                       for chord_type in chord_types]
+        entries = [(root, chord_type) for root in range(12) for chord_type in chord_types]
+        masks = [chord_mask.transpose(root).mask for root in range(12) for chord_mask in chord_masks]
+        return entries, np.array(masks, dtype=np.int64)
+
+    def _build(self, definitions, chord_types=None) -> List[Tuple[Tuple[int, str], ...]]:
+        """Build the table from definitions, or merge chord_types into the current table."""
+        order = {chord_type: position for position, chord_type in enumerate(definitions)}
+        # Added chord types normally come last in the chord order, so on every root they go
+        # after the current entries; anything else falls back to a full build.
+        merge = chord_types is not None and min(map(order.__getitem__, chord_types)) == len(order) - len(chord_types)
+        chord_types = sorted(chord_types, key=order.__getitem__) if merge else list(order)
+        entries, masks = self._entries(definitions, chord_types)
+        # contains[query, entry]: the chord's pitch classes all lie in the query mask.
+        queries, columns = np.nonzero((masks[None, :] & ~_QUERIES) == 0)
+        # root_ends[query, root]: how many entries of the row have a root up to root.
+        root_ends = np.bincount(queries * 12 + columns // len(chord_types), minlength=4096 * 12)
+        root_ends = root_ends.reshape(4096, 12).cumsum(axis=1)
+        bounds = np.flatnonzero(np.diff(queries, prepend=-1, append=4096))
+        queries, bounds = queries[bounds[:-1]].tolist(), bounds.tolist()
+        # Gathered through an object array: one big list of matches would slow the garbage collector.
+        entry_array = np.empty(len(entries), dtype=object)
+        for i, entry in enumerate(entries):
+            entry_array[i] = entry
+        matches = entry_array[columns]
+        if merge:
+            # Only the rows containing an added chord are touched; entries are inserted from
+            # the highest root down so the current row's root ends stay valid.
+            table, exact, ends = list(self._table), dict(self._exact), self._root_ends.tolist()
+            for query, start, stop in zip(queries, bounds, bounds[1:]):
+                row, row_ends = list(table[query]), ends[query]
+                for entry in reversed(matches[start:stop].tolist()):
+                    row.insert(row_ends[entry[0]], entry)
+                table[query] = tuple(row)
+            root_ends += self._root_ends
+        else:
+            # Entries are already in (root, chord order), so every row comes out sorted.
+            table, exact = [()] * 4096, {}
+            for query, start, stop in zip(queries, bounds, bounds[1:]):
+                table[query] = tuple(matches[start:stop].tolist())
+        sort_key = lambda entry: (entry[0], order[entry[1]])
+        for entry, mask in zip(entries, masks.tolist()):
+            exact[mask] = tuple(sorted(exact.get(mask, ()) + (entry,), key=sort_key))
+        self._exact, self._root_ends = exact, root_ends
+        return table
+
+    def _sync(self) -> None:
+        """Bring the table up to date with the registry."""
+        changes = registry.changes_since("chords", self._version)
+        if self._table is None or changes.replaced:
+            self._table = self._build(changes.snapshot.definitions)
+        elif changes.added:
+            self._table = self._build(changes.snapshot.definitions, changes.added)
+        self._version = changes.snapshot.version
+
+    @property
+    def table(self) -> List[Tuple[Tuple[int, str], ...]]:
+        if self._table is None or self._version != registry.version("chords"):
+            self._sync()
+        return self._table
+
+    def clear(self) -> None:
+        """Drop the table so it is rebuilt on next use, e.g. after changing chord definitions."""
+        registry.sync()
+        self._table = None
+
+    def lookup(self, mask: int) -> Tuple[Tuple[int, str], ...]:
+        """All (root pitch class, chord_type) pairs whose pitch classes lie within mask."""
+        return self.table[mask]
+
+    def exact_matches(self, mask: int) -> Tuple[Tuple[int, str], ...]:
+        """(root pitch class, chord_type) pairs whose pitch classes are exactly mask."""
+        self.table
+        return self._exact.get(mask, ())
+
+    def identify(self, notes: Iterable[int]) -> Tuple[Tuple[int, str], ...]:
+        """All (root pitch class, chord_type) pairs contained in a note set."""
+        return self.table[pitch_class_mask(notes)]
+
+    def identify_batch(self, note_sets: NoteSets) -> List[Tuple[Tuple[int, str], ...]]:
+        """
+        Identify the chords contained in many note sets in one pass.
+
+        Args:
+            note_sets: A 2-D integer array with one note set per row (negative
+                       entries are padding), or a sequence of note iterables.
+
+        Returns:
+            One tuple of (root pitch class, chord_type) pairs per note set.
+
+        Example:
+            >>> chord_index.identify_batch(np.array([[60, 64, 67, -1], [62, 65, 69, 72]]))[0]
+            ((0, 'major'),)
+        """
+        table = self.table
+        return [table[mask] for mask in pitch_class_masks(note_sets).tolist()]
+
+
+chord_index = ChordIndex()
+
+
+def identify_chords_batch(note_sets: NoteSets) -> List[Tuple[Tuple[int, str], ...]]:
+    """Identify the chords contained in many note sets; see ChordIndex.identify_batch."""
+    return chord_index.identify_batch(note_sets)
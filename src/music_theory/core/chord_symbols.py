@@ -0,0 +1,295 @@
+"""
+Chord symbol module for reading lead-sheet chord names.
+
+A symbol such as "F#m7b5", "Cmaj9/E", "Bb13sus4" or "G7alt" is matched
+against one compiled regular expression:
+
+    root [accidental] suffix [/bass]
+
+    root:        A..G
+    accidental:  #, b, ♯ or ♭
+    suffix:      a chord quality from _SUFFIXES, e.g. m, maj7, ø, 9, 13sus4,
+                 7alt, optionally followed by alterations (b9, #11, b13,
+                 sus4, add2, no3, ...), or the name of a chord type from the
+                 registry; "5" is a power chord. Parentheses and commas are
+                 ignored, so m(maj7) reads as mmaj7 and 7(b9,#11) as 7b9#11
+    /bass:       a bass note, e.g. /E
+
+An altered chord that matches a registered chord type becomes that type;
+otherwise it keeps the quality it is based on as chord_type and records its
+exact semitones in intervals.
+
+Parsed symbols are cached by text (and chord definitions version), so a lead
+sheet that repeats a few chords parses each distinct symbol once. A slash
+bass that is a chord tone becomes the inversion passed to build_chord; any
+other bass note is added below the chord. iter_lead_sheet streams whole
+files line by line.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from src.music_theory.core.chord import Chord
+from src.music_theory.core.constants import middle_octave
+from src.music_theory.core.notes import build_chord
+from src.music_theory.core.registry import registry
+
+_LETTERS = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+_ACCIDENTALS = {"": 0, "#": 1, "♯": 1, "b": -1, "♭": -1}
+
+# Suffix (without parentheses) -> chord type from constants.chords.
+_SUFFIXES = {
+    "": "major", "M": "major", "maj": "major",
+    "m": "minor", "min": "minor", "-": "minor",
+    "dim": "diminished", "°": "diminished", "o": "diminished",
+    "aug": "augmented", "+": "augmented",
+    "sus2": "sus2", "sus4": "sus4", "sus": "sus4",
+    "6": "major_sixth", "m6": "minor_sixth", "min6": "minor_sixth", "-6": "minor_sixth",
+    "6/9": "6/9", "69": "6/9", "add9": "add9", "sus9": "sus9",
+    "7": "dominant_seventh",
+    "maj7": "major_seventh", "M7": "major_seventh", "Δ": "major_seventh", "Δ7": "major_seventh",
+    "m7": "minor_seventh", "min7": "minor_seventh", "-7": "minor_seventh",
+    "mmaj7": "minor_major_seventh", "mM7": "minor_major_seventh", "minmaj7": "minor_major_seventh",
+    "-maj7": "minor_major_seventh", "mΔ7": "minor_major_seventh", "-Δ7": "minor_major_seventh",
+    "dim7": "diminished_seventh", "°7": "diminished_seventh", "o7": "diminished_seventh",
+    "m7b5": "half_diminished_seventh", "min7b5": "half_diminished_seventh", "-7b5": "half_diminished_seventh",
+    "ø": "half_diminished_seventh", "ø7": "half_diminished_seventh",
+    "aug7": "augmented_minor_seventh", "+7": "augmented_minor_seventh", "7#5": "augmented_minor_seventh",
+    "7+5": "augmented_minor_seventh",
+    "maj7#5": "augmented_major_seventh", "augmaj7": "augmented_major_seventh", "+maj7": "augmented_major_seventh",
+    "Δ#5": "augmented_major_seventh", "Δ7#5": "augmented_major_seventh",
+    "maj7b5": "major_seventh_flat_five", "Δ7b5": "major_seventh_flat_five",
+    "7sus4": "dominant_seventh_sus4", "7sus": "dominant_seventh_sus4",
+    "7alt": "altered_dominant", "alt": "altered_dominant",
+    "9": "dominant_ninth", "maj9": "major_ninth", "M9": "major_ninth", "Δ9": "major_ninth",
+    "m9": "minor_ninth", "min9": "minor_ninth", "-9": "minor_ninth",
+    "m11": "minor_eleventh", "min11": "minor_eleventh", "-11": "minor_eleventh",
+    "maj11": "major_eleventh", "M11": "major_eleventh", "Δ11": "major_eleventh",
+    "13": "dominant_thirteenth", "maj13": "major_thirteenth", "M13": "major_thirteenth", "Δ13": "major_thirteenth",
+    "m13": "minor_thirteenth", "min13": "minor_thirteenth", "-13": "minor_thirteenth",
+    "13sus4": "dominant_thirteenth_sus4", "13sus": "dominant_thirteenth_sus4",
+}
+# Longest suffixes first, so "m7b5" is not read as "m7" followed by an alteration.
+_QUALITIES = sorted(_SUFFIXES, key=len, reverse=True)
+_SYMBOL = re.compile(r"(?P<root>[A-G])(?P<accidental>[#b♯♭]?)(?P<suffix>.*?)"
+                     r"(?:/(?P<bass>[A-G])(?P<bass_accidental>[#b♯♭]?))?")
+_ALTERATION = re.compile(r"(?P<kind>add|no|omit|sus)?(?P<accidental>[#b♯♭]?)(?P<degree>\d*)")
+# Semitones above the root of each chord degree, unaltered.
+_DEGREES = {2: 2, 3: 4, 4: 5, 5: 7, 6: 9, 7: 10, 9: 14, 11: 17, 13: 21}
+_SEPARATORS = re.compile(r"[\s|]+")
+# Lead-sheet token that repeats the previous chord.
+_REPEAT = "%"
+
+
+class ChordSymbol(NamedTuple):
+    """
+    A parsed chord symbol.
+
+    Attributes:
+        symbol (str): The symbol as written.
+        root (int): Root pitch class (0 = C).
+        chord_type (str): Key of constants.chords.
+        inversion (int): Inversion that puts the slash bass in the bass (0 without one).
+        bass (int | None): Pitch class of a slash bass that is not a chord tone, else None.
+        intervals (Tuple[int, ...] | None): Semitones above the root of an altered
+            chord (e.g. C7b9) that is not a chord type of its own, else None.
+    """
+    symbol: str
+    root: int
+    chord_type: str
+    inversion: int
+    bass: Optional[int]
+    intervals: Optional[Tuple[int, ...]] = None
+
+    def build_args(self, octave: int = middle_octave) -> Tuple[int, str, int]:
+        """
+        (base_note, chord_type, inversion) for build_chord, with the root in the given octave.
+
+        For an altered chord (intervals is set) this builds chord_type without the alterations; use notes().
+        """
+        return 12 * (octave + 1) + self.root, self.chord_type, self.inversion
+
+    def notes(self, octave: int = middle_octave) -> List[int]:
+        """
+        MIDI notes of the chord, with a non-chord-tone bass added below it.
+
+        Example:
+            >>> parse_chord_symbol("C/D").notes()
+            [50, 60, 64, 67]
+        """
+        if self.intervals is None:
+            notes = build_chord(*self.build_args(octave))
+        else:
+            base_note = 12 * (octave + 1) + self.root
+            notes = sorted([base_note + interval for interval in self.intervals[self.inversion:]] +
+                           [base_note + interval + 12 for interval in self.intervals[:self.inversion]])
+        if self.bass is not None:
+            notes.insert(0, notes[0] - ((notes[0] - self.bass) % 12 or 12))
+        return notes
+
+    def to_progression_item(self, octave: int = middle_octave) -> Union[Tuple[int, str, int], Chord]:
+        """
+        The chord as an item for compose_chord_progression.
+
+        Returns:
+            build_args(octave), or a voiced Chord if the bass is not a chord
+            tone or the chord is altered.
+        """
+        if self.bass is None and self.intervals is None:
+            return self.build_args(octave)
+        return Chord(self.notes(octave), root=12 * (octave + 1) + self.root,
+                     chord_type=self.chord_type if self.intervals is None else None)
+
+
+def _pitch_class(letter: str, accidental: str) -> int:
+    return (_LETTERS[letter] + _ACCIDENTALS[accidental]) % 12
+
+
+def _chord_semitones(chord_type: str) -> Tuple[int, ...]:
+    intervals = registry.snapshot("intervals").definitions
+    return tuple(intervals[interval] for interval in registry.snapshot("chords").definitions[chord_type])
+
+
+def _alter(semitones: List[int], alterations: str) -> Optional[List[int]]:
+    """Apply alterations such as "b9#11" or "sus4add2" to semitones above the root, or None if they do not parse."""
+    position = 0
+    while position < len(alterations):
+        match = _ALTERATION.match(alterations, position)
+        kind, accidental, degree = match["kind"], match["accidental"], match["degree"]
+        if kind == "sus" and not accidental:
+            degree = degree or "4"
+        if not degree or int(degree) not in _DEGREES or (kind in ("no", "omit", "sus") and accidental):
+            return None
+        position = match.end()
+        natural = _DEGREES[int(degree)]
+        if kind in ("no", "omit"):
+            # no3 removes a minor or major third, no5 any fifth, other degrees any alteration of them.
+            removed = (3, 4) if natural == 4 else (natural - 1, natural, natural + 1)
+            semitones = [tone for tone in semitones if tone not in removed]
+        elif kind == "sus":
+            if natural not in (2, 5):
+                return None
+            semitones = [tone for tone in semitones if tone not in (3, 4)] + [natural]
+        elif kind == "add" or not accidental:
+            # A bare degree (C7 13) extends the chord; add keeps it from being read as a quality.
+            semitones = semitones + [natural + _ACCIDENTALS[accidental]]
+        else:
+            # b9, #9, #11, b13, b5, #5: the altered tone replaces the unaltered one.
+            semitones = [tone for tone in semitones if tone != natural] + [natural + _ACCIDENTALS[accidental]]
+    return sorted(set(semitones))
+
+
+@lru_cache(maxsize=1024)
+def _parse_suffix(suffix: str, version: int) -> Tuple[str, Optional[Tuple[int, ...]]]:
+    """Resolve a suffix to (chord_type, intervals); version is the chord definitions version it was resolved in."""
+    if suffix in _SUFFIXES:
+        return _SUFFIXES[suffix], None
+    definitions = registry.snapshot("chords").definitions
+    if suffix in definitions:
+        return suffix, None
+    if suffix == "5":
+        return "major", (0, 7)
+    for quality in _QUALITIES:
+        if not suffix.startswith(quality):
+            continue
+        semitones = _alter(list(_chord_semitones(_SUFFIXES[quality])), suffix[len(quality):])
+        if semitones is None:
+            continue
+        for chord_type in definitions:
+            if list(_chord_semitones(chord_type)) == semitones:
+                return chord_type, None
+        return _SUFFIXES[quality], tuple(semitones)
+    raise ValueError(f"not supported chord suffix {suffix!r}")
+
+
+def parse_chord_symbol(symbol: str) -> ChordSymbol:
+    """
+    Parse a lead-sheet chord symbol, cached by text.
+
+    Args:
+        symbol: A chord symbol such as "F#m7b5", "Cmaj9/E", "G7alt" or "C7(b9,#11)".
+
+    Returns:
+        The ChordSymbol; chord.notes() builds it.
+
+    Raises:
+        ValueError: If the symbol is not supported.
+
+    Example:
+        >>> parse_chord_symbol("Cmaj7/E")
+        ChordSymbol(symbol='Cmaj7/E', root=0, chord_type='major_seventh', inversion=1, bass=None, intervals=None)
+        >>> parse_chord_symbol("Bb13sus4").build_args(3)
+        (58, 'dominant_thirteenth_sus4', 0)
+        >>> parse_chord_symbol("C7b9").notes()
+        [60, 64, 67, 70, 73]
+    """
+    return _parse_chord_symbol(symbol, registry.version("chords"))
+
+
+@lru_cache(maxsize=4096)
+def _parse_chord_symbol(symbol: str, version: int) -> ChordSymbol:
+    match = _SYMBOL.fullmatch(re.sub(r"[(),]", "", symbol.strip()))
+    if match is None:
+        raise ValueError(f"not supported chord symbol {symbol!r}")
+    root = _pitch_class(match["root"], match["accidental"])
+    try:
+        chord_type, intervals = _parse_suffix(match["suffix"], version)
+    except ValueError:
+        raise ValueError(f"not supported chord symbol {symbol!r}") from None
+    if match["bass"] is None:
+        return ChordSymbol(symbol, root, chord_type, 0, None, intervals)
+    bass = _pitch_class(match["bass"], match["bass_accidental"])
+    if intervals is None:
+        # Tones above the octave (9ths, 13ths) cannot be put in the bass by an inversion.
+        inversion_basses = [build_chord(0, chord_type, inversion)[0] for inversion in range(len(
+            _chord_semitones(chord_type)))]
+    else:
+        inversion_basses = [interval for interval in intervals if interval < 12]
+    for inversion, inversion_bass in enumerate(inversion_basses):
+        if (root + inversion_bass) % 12 == bass:
+            return ChordSymbol(symbol, root, chord_type, inversion, None, intervals)
+    return ChordSymbol(symbol, root, chord_type, 0, bass, intervals)
+
+
+def iter_lead_sheet(source: Union[str, os.PathLike, Iterable[str]]) -> Iterator[Tuple[int, ChordSymbol]]:
+    """
+    Stream the chord symbols of a lead sheet.
+
+    Symbols are separated by whitespace or bar lines ("|"); "%" repeats the
+    previous chord. Lines are read one at a time, so large files are never
+    held in memory.
+
+    Args:
+        source: A file path, or an iterable of lines such as an open file.
+
+    Yields:
+        (line number, ChordSymbol) pairs, line numbers starting at 1.
+
+    Raises:
+        ValueError: If a symbol is not supported; the message gives its line.
+
+    Example:
+        >>> [chord.chord_type for _, chord in iter_lead_sheet(["| Dm7 | G7 | Cmaj7 | % |"])]
+        ['minor_seventh', 'dominant_seventh', 'major_seventh', 'major_seventh']
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as lines:
+            yield from iter_lead_sheet(lines)
+        return
+    previous = None
+    for line_number, line in enumerate(source, start=1):
+        for token in _SEPARATORS.split(line.strip()):
+            if not token:
+                continue
+            if token == _REPEAT:
+                if previous is None:
+                    raise ValueError(f"line {line_number}: {_REPEAT} has no previous chord to repeat")
+                yield line_number, previous
+                continue
+            try:
+                previous = parse_chord_symbol(token)
+            except ValueError as error:
+                raise ValueError(f"line {line_number}: {error}") from None
+            yield line_number, previous
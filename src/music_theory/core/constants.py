@@ -31,6 +31,7 @@ interval_half_steps = {
     "major_seventh": 11,
     "minor_ninth": 13,
     "major_ninth": 14,
+    "augmented_ninth": 15,
     "minor_eleventh": 16,
     "major_eleventh": 17,
     "minor_thirteenth": 22,
@@ -45,6 +46,7 @@ chords = {
     'augmented': ['unison', 'major_third', 'minor_sixth'],
     'sus2': ['unison', 'major_second', 'perfect_fifth'],
     'sus4': ['unison', 'perfect_fourth', 'perfect_fifth'],
+    'dominant_seventh_sus4': ['unison', 'perfect_fourth', 'perfect_fifth', 'minor_seventh'],
     'major_seventh': ['unison', 'major_third', 'perfect_fifth', 'major_seventh'],
     'minor_seventh': ['unison', 'minor_third', 'perfect_fifth', 'minor_seventh'],
     'minor_major_seventh': ['unison', 'minor_third', 'perfect_fifth', 'major_seventh'],
@@ -63,6 +65,10 @@ chords = {
     'dominant_thirteenth': ['unison', 'major_third', 'perfect_fifth', 'minor_seventh', 'major_ninth',
                             'major_thirteenth'],
     'major_thirteenth': ['unison', 'major_third', 'perfect_fifth', 'major_seventh', 'major_ninth', 'major_thirteenth'],
+    'dominant_thirteenth_sus4': ['unison', 'perfect_fourth', 'perfect_fifth', 'minor_seventh', 'major_ninth',
+                                 'major_thirteenth'],
+    # Altered dominant: flat and sharp ninth with a sharp fifth (b13)
+    'altered_dominant': ['unison', 'major_third', 'minor_sixth', 'minor_seventh', 'minor_ninth', 'augmented_ninth'],
     # The major eleventh is often omitted because it clashes with the major third
     'minor_thirteenth': ['unison', 'minor_third', 'perfect_fifth', 'minor_seventh', 'major_ninth', 'major_thirteenth'],
     # The major eleventh is often omitted because it clashes with the major third
@@ -76,5 +82,5 @@ chords = {
 }
 
 min_note = 0
-max_note = 120
+max_note = 127
 middle_octave = 4
\ No newline at end of file
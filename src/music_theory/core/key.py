@@ -0,0 +1,153 @@
+"""
+Key module for mapping between MIDI pitches and scale degrees.
+
+A Key precomputes, for all 128 MIDI numbers, which scale degree and octave
+each pitch belongs to and where it lands when snapped into the scale. Degree
+lookups and quantizing whole melodies are then single NumPy gathers instead
+of rebuilding the scale for every note.
+
+Degrees are 1-based. The octave of a degree follows note naming, so in
+C major degree 1 at octave 4 is C4 (60); in A minor, C4 is degree 3 at
+octave 3 because its tonic A3 starts that octave of the scale.
+"""
+
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.constants import min_note, max_note, middle_octave
+from src.music_theory.core.notes import note_to_midi
+from src.music_theory.core.scale_table import scale_table
+from src.music_theory.core.spelling import midi_to_note_strings
+
+ArrayLike = Union[int, Sequence[int], np.ndarray]
+
+
+class Key:
+    """
+    A tonic and scale type with precomputed degree and snapping tables.
+
+    Attributes:
+        root (int): Pitch class of the tonic (0 = C).
+        scale_type (str): A key of constants.scales.
+        pitch_classes (np.ndarray): Pitch classes of the scale in degree order.
+        midi_degrees (np.ndarray): 1-based degree of each MIDI number, 0 if not in the key.
+        midi_octaves (np.ndarray): Octave of that degree for each MIDI number.
+
+    Example:
+        >>> key = Key("C", "major")
+        >>> key.snap_to_scale([61, 66, 70]).tolist()
+        [60, 65, 69]
+        >>> key.note(5)
+        67
+    """
+
+    def __init__(self, root: Union[int, str], scale_type: str = "major"):
+        """
+        Initialize a Key.
+
+        Args:
+            root: The tonic as a note name ("F", "Bb", "Fs3") or MIDI number.
+                  Only its pitch class is used.
+            scale_type: The type of scale (default "major").
+        """
+        self.root = note_to_midi(root) % 12
+        self.scale_type = scale_type
+        self._spelling_key = (root if isinstance(root, str) else self.root, scale_type)
+        self._offsets = scale_table.scale(0, scale_type)
+        self.pitch_classes = (self.root + self._offsets) % 12
+
+        pitch_class_degree = np.zeros(12, dtype=np.int64)
+        pitch_class_degree[self.pitch_classes] = np.arange(1, len(self._offsets) + 1)
+
+        midi = np.arange(max_note + 1)
+        self.midi_degrees = pitch_class_degree[midi % 12]
+        in_key = self.midi_degrees > 0
+        offsets = np.where(in_key, self._offsets[self.midi_degrees - 1], 0)
+        self.midi_octaves = (midi - self.root - offsets) // 12 - 1
+
+        # Nearest in-key pitch at or below / at or above every MIDI number.
+        key_notes = midi[in_key]
+        below = np.searchsorted(key_notes, midi, side="right") - 1
+        above = np.searchsorted(key_notes, midi, side="left")
+        self._snap_down = np.where(below >= 0, key_notes[np.maximum(below, 0)], key_notes[0])
+        self._snap_up = np.where(above < len(key_notes), key_notes[np.minimum(above, len(key_notes) - 1)], key_notes[-1])
+        for table in (self.pitch_classes, self.midi_degrees, self.midi_octaves, self._snap_down, self._snap_up):
+            table.flags.writeable = False
+
+    def __repr__(self) -> str:
+        return f"Key(root={self.root}, scale_type={self.scale_type!r})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Key) and (self.root, self.scale_type) == (other.root, other.scale_type)
+
+    def __hash__(self) -> int:
+        return hash((self.root, self.scale_type))
+
+    @staticmethod
+    def _check_range(pitches: np.ndarray) -> np.ndarray:
+        pitches = np.asarray(pitches, dtype=np.int64)
+        if pitches.size and (pitches.min() < min_note or pitches.max() > max_note):
+            raise ValueError(f"pitches have to be in range {min_note}-{max_note}")
+        return pitches
+
+    def note(self, degree: ArrayLike, octave: ArrayLike = middle_octave) -> Union[int, np.ndarray]:
+        """
+        Get the MIDI number of a degree in an octave; degree and octave broadcast.
+
+        Degrees past the scale length continue into the next octave.
+        """
+        midi = scale_table.degree(self.root + 12 * (np.asarray(octave) + 1), self.scale_type, degree)
+        return int(midi) if midi.ndim == 0 else midi
+
+    def contains(self, pitches: ArrayLike) -> np.ndarray:
+        """Boolean array marking which pitches are in the key."""
+        return self.midi_degrees[self._check_range(pitches)] > 0
+
+    def degree_of(self, pitches: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map pitches to (degree, octave) arrays.
+
+        Pitches outside the key get degree 0; snap them first if needed.
+
+        Example:
+            >>> degrees, octaves = Key("A", "minor").degree_of([57, 60])
+            >>> degrees.tolist(), octaves.tolist()
+            ([1, 3], [3, 3])
+        """
+        pitches = self._check_range(pitches)
+        return self.midi_degrees[pitches], self.midi_octaves[pitches]
+
+    def snap_to_scale(self, pitches: ArrayLike, direction: str = "nearest", prefer: str = "down") -> np.ndarray:
+        """
+        Quantize pitches to in-key notes.
+
+        Args:
+            pitches: MIDI numbers (any shape) in range 0-127.
+            direction: "nearest" (default), "down" or "up".
+            prefer: For "nearest", which way to go when both neighbours are
+                    equally far ("down" or "up").
+
+        Returns:
+            An array of in-key MIDI numbers with the same shape as pitches.
+
+        Raises:
+            ValueError: If direction or prefer is not recognized.
+        """
+        pitches = self._check_range(pitches)
+        down = self._snap_down[pitches]
+        up = self._snap_up[pitches]
+        if direction == "down":
+            return down
+        if direction == "up":
+            return up
+        if direction != "nearest" or prefer not in ("down", "up"):
+            raise ValueError(f"direction is {direction!r} and prefer is {prefer!r}; "
+                             f"expected 'nearest'/'down'/'up' and 'down'/'up'")
+        below, above = pitches - down, up - pitches
+        take_up = (above < below) if prefer == "down" else (above <= below)
+        return np.where(take_up, up, down)
+
+    def spell(self, pitches: ArrayLike) -> np.ndarray:
+        """Note names for pitches, spelled for this key."""
+        return midi_to_note_strings(pitches, key=self._spelling_key)
@@ -0,0 +1,261 @@
+"""
+Markov module for learning and sampling chord progressions.
+
+A MarkovProgressionModel learns two chains from a corpus of progressions in
+the format of ScaledChordProgression.generate_progression:
+
+    degree chain:      the next degree item given the previous 1..order items
+    chord type chain:  the chord type (scale intervals such as [1, 3, 5, 7])
+                       given the degree it is built on and the previous
+                       0..order-1 chord types
+
+Contexts are encoded as integers and the transition probabilities of every
+order are stored together as one sparse CSR matrix (row pointers, target
+tokens and cumulative probabilities). Sampling backs off from the longest
+context that was seen in training to shorter ones, and draws the next token
+for thousands of progressions at once with a single searchsorted per step.
+Trained models are saved and loaded as .npz archives.
+"""
+
+import json
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Token 0 pads the start of every progression.
+_START = 0
+
+
+def _to_token(item):
+    """Hashable form of a degree item or chord type."""
+    return tuple(item) if isinstance(item, (list, tuple)) else int(item)
+
+
+def _encode(vocabulary: dict, items) -> List[int]:
+    return [vocabulary.setdefault(_to_token(item), len(vocabulary) + 1) for item in items]
+
+
+class _TransitionMatrix:
+    """Sparse transition probabilities for context orders 0..order, with backoff."""
+
+    def __init__(self, order: int):
+        self.order = order
+        self.contexts: List[np.ndarray] = []
+        self.row_starts = np.zeros(order + 1, dtype=np.int64)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.targets = np.zeros(0, dtype=np.int64)
+        # Cumulative probability within a row plus the row number, so rows are globally increasing.
+        self.cdf = np.zeros(0, dtype=np.float64)
+
+    def fit(self, context_codes: List[np.ndarray], targets: np.ndarray) -> None:
+        """Count transitions; context_codes[k] holds the order-k context code of every target."""
+        indptr, row_targets, probabilities, self.contexts = [0], [], [], []
+        for order, codes in enumerate(context_codes):
+            self.row_starts[order] = len(indptr) - 1
+            pairs, counts = np.unique(np.stack([codes, targets]), axis=1, return_counts=True)
+            contexts, starts = np.unique(pairs[0], return_index=True)
+            self.contexts.append(contexts)
+            ends = np.append(starts[1:], pairs.shape[1])
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                row_counts = counts[start:end]
+                row_targets.append(pairs[1, start:end])
+                probabilities.append(np.cumsum(row_counts) / row_counts.sum())
+                indptr.append(indptr[-1] + end - start)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.targets = np.concatenate(row_targets)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(self.indptr))
+        self.cdf = np.concatenate(probabilities) + rows
+
+    def rows(self, context_codes: List[np.ndarray]) -> np.ndarray:
+        """Row of the longest seen context for every sample (order 0 always exists)."""
+        rows = np.full(len(context_codes[0]), -1, dtype=np.int64)
+        for order in range(self.order, -1, -1):
+            contexts = self.contexts[order]
+            position = np.minimum(np.searchsorted(contexts, context_codes[order]), len(contexts) - 1)
+            seen = (contexts[position] == context_codes[order]) & (rows < 0)
+            rows[seen] = self.row_starts[order] + position[seen]
+        return rows
+
+    def sample(self, rows: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Draw one target token per row."""
+        index = np.searchsorted(self.cdf, rows + rng.random(len(rows)), side="right")
+        return self.targets[np.minimum(index, self.indptr[rows + 1] - 1)]
+
+    def to_arrays(self, prefix: str) -> dict:
+        return {f"{prefix}_contexts": np.concatenate(self.contexts),
+                f"{prefix}_context_lengths": np.array([len(c) for c in self.contexts]),
+                f"{prefix}_row_starts": self.row_starts, f"{prefix}_indptr": self.indptr,
+                f"{prefix}_targets": self.targets, f"{prefix}_cdf": self.cdf}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str, order: int) -> "_TransitionMatrix":
+        matrix = cls(order)
+        matrix.contexts = np.split(arrays[f"{prefix}_contexts"], np.cumsum(arrays[f"{prefix}_context_lengths"])[:-1])
+        matrix.row_starts = arrays[f"{prefix}_row_starts"]
+        matrix.indptr = arrays[f"{prefix}_indptr"]
+        matrix.targets = arrays[f"{prefix}_targets"]
+        matrix.cdf = arrays[f"{prefix}_cdf"]
+        return matrix
+
+
+class MarkovProgressionModel:
+    """
+    Chord progression generator trained on degree and chord type transitions.
+
+    Attributes:
+        order (int): Longest context used by the chains.
+
+    Example:
+        >>> model = MarkovProgressionModel(order=2).fit([[1, 4, 5, 1], [1, 6, 4, 5]])
+        >>> degrees, chord_types = model.sample(count=100, length=8, seed=0)[0]
+        >>> progression = ScaledChordProgression(48).generate_progression(degrees, "major", chord_types)
+    """
+
+    def __init__(self, order: int = 2):
+        """
+        Initialize an untrained model.
+
+        Args:
+            order: Longest context used by the chains (1 or more).
+
+        Raises:
+            ValueError: If order is less than 1.
+        """
+        if order < 1:
+            raise ValueError(f"order is {order} it has to be at least 1")
+        self.order = order
+        self._degrees: List = []
+        self._chord_types: List = []
+        self._degree_chain: Optional[_TransitionMatrix] = None
+        self._chord_type_chain: Optional[_TransitionMatrix] = None
+
+    def _degree_codes(self, history: np.ndarray) -> List[np.ndarray]:
+        """Context codes of orders 0..order from the previous degrees (last column most recent)."""
+        base = len(self._degrees) + 1
+        codes = [np.zeros(len(history), dtype=np.int64)]
+        for order in range(1, self.order + 1):
+            codes.append(codes[-1] * base + history[:, -order])
+        return codes
+
+    def _chord_type_codes(self, degrees: np.ndarray, history: np.ndarray) -> List[np.ndarray]:
+        """Context codes of orders 0..order from the current degree and the previous chord types."""
+        base = len(self._chord_types) + 1
+        codes = [np.zeros(len(degrees), dtype=np.int64), degrees.astype(np.int64)]
+        for order in range(2, self.order + 1):
+            codes.append(codes[-1] * base + history[:, -(order - 1)])
+        return codes
+
+    def fit(self, progressions: Sequence[Sequence], chord_types: Optional[Sequence[Sequence]] = None
+            ) -> "MarkovProgressionModel":
+        """
+        Learn transition probabilities from a corpus.
+
+        Args:
+            progressions: Lists of degree items as accepted by
+                          generate_progression (int, (degree, inversion) or
+                          (degree, inversion, mode)).
+            chord_types: One list of chord types per progression (scale
+                         intervals per chord, e.g. [1, 3, 5, 7]). Default: triads.
+
+        Returns:
+            The model itself.
+
+        Raises:
+            ValueError: If the corpus is empty or chord_types does not match it.
+        """
+        if not progressions or not any(progressions):
+            raise ValueError("The corpus must contain at least one non-empty progression")
+        if chord_types is None:
+            chord_types = [[[1, 3, 5]] * len(progression) for progression in progressions]
+        if len(chord_types) != len(progressions) or any(
+                len(types) != len(progression) for types, progression in zip(chord_types, progressions)):
+            raise ValueError("chord_types must give one chord type per degree of every progression")
+
+        degree_vocabulary, chord_type_vocabulary = {}, {}
+        padding = [_START] * self.order
+        degree_rows, chord_type_rows, degree_targets, chord_type_targets = [], [], [], []
+        for progression, types in zip(progressions, chord_types):
+            degrees = padding + _encode(degree_vocabulary, progression)
+            chord_type_ids = padding + _encode(chord_type_vocabulary, types)
+            for t in range(self.order, len(degrees)):
+                degree_rows.append(degrees[t - self.order:t])
+                chord_type_rows.append(chord_type_ids[t - self.order:t])
+                degree_targets.append(degrees[t])
+                chord_type_targets.append(chord_type_ids[t])
+        self._degrees = list(degree_vocabulary)
+        self._chord_types = list(chord_type_vocabulary)
+
+        degree_targets = np.array(degree_targets, dtype=np.int64)
+        self._degree_chain = _TransitionMatrix(self.order)
+        self._degree_chain.fit(self._degree_codes(np.array(degree_rows, dtype=np.int64)), degree_targets)
+        self._chord_type_chain = _TransitionMatrix(self.order)
+        self._chord_type_chain.fit(self._chord_type_codes(degree_targets, np.array(chord_type_rows, dtype=np.int64)),
+                                   np.array(chord_type_targets, dtype=np.int64))
+        return self
+
+    def sample_ids(self, count: int, length: int, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sample progressions as vocabulary ids (1-based; see sample for items).
+
+        Returns:
+            Degree ids and chord type ids, both of shape (count, length).
+
+        Raises:
+            ValueError: If the model has not been trained.
+        """
+        if self._degree_chain is None:
+            raise ValueError("The model has to be trained with fit() or loaded before sampling")
+        rng = np.random.default_rng(seed)
+        degrees = np.zeros((count, self.order + length), dtype=np.int64)
+        chord_types = np.zeros((count, self.order + length), dtype=np.int64)
+        for t in range(self.order, self.order + length):
+            rows = self._degree_chain.rows(self._degree_codes(degrees[:, t - self.order:t]))
+            degrees[:, t] = self._degree_chain.sample(rows, rng)
+            rows = self._chord_type_chain.rows(self._chord_type_codes(degrees[:, t], chord_types[:, t - self.order:t]))
+            chord_types[:, t] = self._chord_type_chain.sample(rows, rng)
+        return degrees[:, self.order:], chord_types[:, self.order:]
+
+    def sample(self, count: int = 1, length: int = 8, seed: Optional[int] = None) -> List[Tuple[list, list]]:
+        """
+        Sample progressions.
+
+        Args:
+            count: Number of progressions.
+            length: Chords per progression.
+            seed: Seed for the random generator.
+
+        Returns:
+            A list of (degrees, chord_types) pairs to pass to
+            ScaledChordProgression.generate_progression.
+        """
+        degree_ids, chord_type_ids = self.sample_ids(count, length, seed)
+        degrees = [None] + self._degrees
+        chord_types = [None] + [list(chord_type) for chord_type in self._chord_types]
+        return [([degrees[i] for i in row], [chord_types[i] for i in types])
+                for row, types in zip(degree_ids.tolist(), chord_type_ids.tolist())]
+
+    def save(self, path) -> None:
+        """
+        Save the trained model to a .npz archive.
+
+        Raises:
+            ValueError: If the model has not been trained.
+        """
+        if self._degree_chain is None:
+            raise ValueError("The model has to be trained with fit() before saving")
+        vocabulary = json.dumps({"degrees": [list(d) if isinstance(d, tuple) else d for d in self._degrees],
+                                 "chord_types": [list(c) for c in self._chord_types]})
+        np.savez(path, order=self.order, vocabulary=np.array(vocabulary),
+                 **self._degree_chain.to_arrays("degree"), **self._chord_type_chain.to_arrays("chord_type"))
+
+    @classmethod
+    def load(cls, path) -> "MarkovProgressionModel":
+        """Load a model saved with save()."""
+        with np.load(path) as arrays:
+            model = cls(int(arrays["order"]))
+            vocabulary = json.loads(str(arrays["vocabulary"]))
+            model._degrees = [_to_token(d) for d in vocabulary["degrees"]]
+            model._chord_types = [tuple(c) for c in vocabulary["chord_types"]]
+            model._degree_chain = _TransitionMatrix.from_arrays(arrays, "degree", model.order)
+            model._chord_type_chain = _TransitionMatrix.from_arrays(arrays, "chord_type", model.order)
+        return model
@@ -0,0 +1,186 @@
+"""
+Neo-Riemannian module for P/L/R transforms and Tonnetz walks.
+
+The 24 major and minor triads are numbered root + 12 * quality (0 = major,
+1 = minor), so C major is 0 and A minor is 21. Every transform is a 24-entry
+lookup table mapping a triad number to its image:
+
+    P (parallel):        C major <-> C minor
+    L (leading-tone):    C major <-> E minor
+    R (relative):        C major <-> A minor
+
+Compound transforms such as "PL" or "RLP" apply their letters left to right
+and are composed into a single table once. Walks over the Tonnetz are then a
+gather per step over all walks at once, and turning triad numbers into MIDI
+notes is one more gather from a 24-row voicing table.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.constants import chords, interval_half_steps, middle_octave
+from src.music_theory.core.notes import note_to_midi
+
+QUALITIES = ("major", "minor")
+
+_TRIAD_INTERVALS = np.array([[interval_half_steps[interval] for interval in chords[quality]] for quality in QUALITIES])
+_ROOTS = np.arange(24) % 12
+_IS_MINOR = np.arange(24) >= 12
+
+# Base transforms: (root shift for major, root shift for minor); each one flips the quality.
+_BASE_SHIFTS = {"P": (0, 0), "L": (4, 8), "R": (9, 3)}
+# Common compound transforms by name.
+COMPOUND_TRANSFORMS: Dict[str, str] = {
+    "N": "RLP",  # Nebenverwandt: C major <-> F minor
+    "S": "LPR",  # Slide: C major <-> C# minor
+    "H": "LPL",  # Hexatonic pole: C major <-> Ab minor
+}
+
+
+def triad_index(root: Union[int, str], quality: str) -> int:
+    """
+    Number of a triad (root pitch class + 12 for minor).
+
+    Raises:
+        ValueError: If quality is not "major" or "minor".
+
+    Example:
+        >>> triad_index("A4", "minor")
+        21
+    """
+    if quality not in QUALITIES:
+        raise ValueError(f"quality is {quality} it has to be 'major' or 'minor'")
+    return note_to_midi(root) % 12 + 12 * QUALITIES.index(quality)
+
+
+def triad_name(index: int) -> Tuple[int, str]:
+    """The (root pitch class, quality) of a triad number."""
+    return index % 12, QUALITIES[index // 12]
+
+
+@lru_cache(maxsize=None)
+def transform_table(transform: str) -> np.ndarray:
+    """
+    Lookup table of a transform over all 24 triads.
+
+    Args:
+        transform: Letters from P, L, R and the names in COMPOUND_TRANSFORMS,
+                   applied left to right ("PL" is P, then L).
+
+    Returns:
+        A read-only int64 array; table[i] is the image of triad i.
+
+    Raises:
+        ValueError: If transform contains an unknown letter.
+
+    Example:
+        >>> int(transform_table("R")[triad_index("C", "major")])
+        21
+    """
+    table = np.arange(24)
+    for letter in transform:
+        if letter in COMPOUND_TRANSFORMS:
+            step = transform_table(COMPOUND_TRANSFORMS[letter])
+        elif letter in _BASE_SHIFTS:
+            major_shift, minor_shift = _BASE_SHIFTS[letter]
+            roots = (_ROOTS + np.where(_IS_MINOR, minor_shift, major_shift)) % 12
+            step = roots + 12 * ~_IS_MINOR
+        else:
+            raise ValueError(f"unknown transform {letter} in {transform}")
+        table = step[table]
+    table.setflags(write=False)
+    return table
+
+
+def apply_transforms(start: int, transforms: Sequence[str]) -> List[int]:
+    """
+    Triads visited by applying transforms one after another.
+
+    Example:
+        >>> [triad_name(i) for i in apply_transforms(0, ["P", "L"])]
+        [(0, 'major'), (0, 'minor'), (8, 'major')]
+    """
+    path = [start]
+    for transform in transforms:
+        path.append(int(transform_table(transform)[path[-1]]))
+    return path
+
+
+def tonnetz_walks(start: Union[int, Sequence[int], np.ndarray], steps: int, count: int = 1,
+                  transforms: Sequence[str] = ("P", "L", "R"), weights: Optional[Sequence[float]] = None,
+                  allowed: Optional[Sequence[int]] = None, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Generate many random walks over the Tonnetz at once.
+
+    Each step applies one of transforms, chosen at random with the given
+    weights. If allowed is given, only transforms that land on an allowed
+    triad are chosen; a walk with no such transform stays where it is.
+
+    Args:
+        start: Starting triad number, or one per walk.
+        steps: Number of transforms per walk.
+        count: Number of walks (ignored if start gives one triad per walk).
+        transforms: Transforms to choose from (see transform_table).
+        weights: Relative probability of each transform (default: equal).
+        allowed: Triad numbers walks may visit, or None for all 24.
+        seed: Seed for the random generator.
+
+    Returns:
+        An int64 array of shape (count, steps + 1) of triad numbers.
+
+    Example:
+        >>> tonnetz_walks(0, 4, count=1000, seed=1).shape
+        (1000, 5)
+    """
+    starts = np.asarray(start, dtype=np.int64)
+    starts = np.full(count, starts) if starts.ndim == 0 else starts
+    tables = np.stack([transform_table(transform) for transform in transforms])
+    weights = np.ones(len(tables)) if weights is None else np.asarray(weights, dtype=np.float64)
+    allowed_mask = np.ones(24, dtype=bool)
+    if allowed is not None:
+        allowed_mask[:] = False
+        allowed_mask[np.asarray(allowed, dtype=np.int64)] = True
+    rng = np.random.default_rng(seed)
+
+    walks = np.empty((len(starts), steps + 1), dtype=np.int64)
+    walks[:, 0] = starts
+    for step in range(steps):
+        current = walks[:, step]
+        images = tables[:, current].T
+        probabilities = weights[None, :] * allowed_mask[images]
+        totals = probabilities.sum(axis=1)
+        # Inverse-CDF sampling of one transform per walk.
+        thresholds = rng.random(len(current)) * totals
+        choice = (probabilities.cumsum(axis=1) <= thresholds[:, None]).sum(axis=1)
+        choice = np.minimum(choice, len(tables) - 1)
+        walks[:, step + 1] = np.where(totals > 0, images[np.arange(len(current)), choice], current)
+    return walks
+
+
+def triad_voicings(triads: Union[int, Sequence[int], np.ndarray], octave: int = middle_octave) -> np.ndarray:
+    """
+    Root-position MIDI notes of triad numbers, in one gather.
+
+    Args:
+        triads: Triad numbers of any shape.
+        octave: Octave of the roots (4 puts C major at [60, 64, 67]).
+
+    Returns:
+        An int64 array of shape triads.shape + (3,).
+    """
+    table = 12 * (octave + 1) + _ROOTS[:, None] + _TRIAD_INTERVALS[_IS_MINOR.astype(np.int64)]
+    return table[np.asarray(triads, dtype=np.int64)]
+
+
+def walk_to_progression(walk: Sequence[int], octave: int = middle_octave) -> List[Tuple[int, str]]:
+    """
+    Turn a walk into (root MIDI note, chord_type) items for compose_chord_progression.
+
+    Example:
+        >>> walk_to_progression([0, 21, 5])
+        [(60, 'major'), (69, 'minor'), (65, 'major')]
+    """
+    base = 12 * (octave + 1)
+    return [(base + int(index) % 12, QUALITIES[int(index) // 12]) for index in walk]
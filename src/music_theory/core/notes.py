@@ -8,17 +8,74 @@ scale generation, chord construction with advanced voicing options, and
 finding optimal chord inversions for smooth voice leading.
 
 Note naming convention:
-    - Notes are named A-G with 's' suffix for sharps (e.g., Cs, Fs, Gs)
+    - Notes are named A-G with 's' suffix for sharps (e.g., Cs, Fs, Gs);
+      '#' sharps and 'b' flats (e.g., C#, Bb, Eb3) are accepted on input
     - Octave numbers follow standard MIDI convention
     - MIDI note 60 = C4 (middle C)
     - Default octave (when not specified) is 4, so "C" = C4 = MIDI 60
 """
 
 import math
+import re
+from functools import lru_cache
 from itertools import product
-from typing import List, Union, Set, Dict
+from typing import List, Union, Set, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 
 from src.music_theory.core.constants import *
+from src.music_theory.core.chord_index import chord_index
+from src.music_theory.core.pitch_class_set import PitchClassSet, pitch_class_mask
+from src.music_theory.core.registry import registry
+from src.music_theory.core.scale_table import scale_table
+from src.music_theory.core.spelling import midi_to_note_strings, note_spelling_table
+from src.music_theory.core.voice_leading import taxicab_distance_matrix
+from src.music_theory.core.voicing import iter_chord_voicings
+
+
+_LETTER_PITCH_CLASSES = {"c": 0, "d": 2, "e": 4, "f": 5, "g": 7, "a": 9, "b": 11}
+_ACCIDENTAL_OFFSETS = {"": 0, "s": 1, "#": 1, "b": -1}
+_NOTE_STRING_PATTERN = re.compile(r"^([a-g])(s|#|b)?(-?\d+)?$")
+
+
+def _build_note_name_table() -> Dict[str, int]:
+    """Map every lowercase note name, bare or with octave -1..9, to its MIDI number."""
+    table = {}
+    for letter, pitch_class in _LETTER_PITCH_CLASSES.items():
+        for accidental, offset in _ACCIDENTAL_OFFSETS.items():
+            name = letter + accidental
+            table[name] = pitch_class + offset + (middle_octave + 1) * 12
+            for octave in range(-1, 10):
+                table[f"{name}{octave}"] = pitch_class + offset + (octave + 1) * 12
+    return table
+
+
+_NOTE_NAME_TO_MIDI = _build_note_name_table()
+
+
+class InvalidNoteError(ValueError):
+    """Raised by the batch parsers; ``invalid_entries`` lists every (position, note) rejected."""
+
+    def __init__(self, invalid_entries: List[Tuple[Union[int, Tuple[int, ...]], str]]):
+        self.invalid_entries = invalid_entries
+        shown = ", ".join(f"{position} {note!r}" for position, note in invalid_entries[:10])
+        if len(invalid_entries) > 10:
+            shown += f", ... ({len(invalid_entries) - 10} more)"
+        super().__init__(f"{len(invalid_entries)} invalid note(s) at positions: {shown}")
+
+
+def _parse_note_string(note: str) -> Optional[int]:
+    """Return the MIDI number for a note string, or None if it cannot be parsed."""
+    key = note.lower()
+    midi = _NOTE_NAME_TO_MIDI.get(key)
+    if midi is not None:
+        return midi
+    # Octaves outside -1..9 are not in the table, fall back to the grammar.
+    match = _NOTE_STRING_PATTERN.match(key)
+    if match is None or match.group(3) is None:
+        return None
+    letter, accidental, octave = match.groups()
+    return _LETTER_PITCH_CLASSES[letter] + _ACCIDENTAL_OFFSETS[accidental or ""] + (int(octave) + 1) * 12
 
 
 def note_to_midi(note: Union[int, str]) -> int:
@@ -50,7 +107,7 @@ def note_string_to_midi(note: str) -> int:
 
     Args:
         note: A note string in format "NoteName" or "NoteNameOctave".
-              Examples: "C", "C4", "Fs3", "Gs"
+              Examples: "C", "C4", "Fs3", "Gs", "Bb", "Eb3", "C#-1", "A10"
               If no octave is specified, uses middle_octave from constants.
 
     Returns:
@@ -66,14 +123,88 @@ def note_string_to_midi(note: str) -> int:
         54
         >>> note_string_to_midi("C")  # Uses middle_octave default (4)
         60
+        >>> note_string_to_midi("Bb3")
+        58
     """
-    if any(n.lower() == note.lower() for n in notes):
-        return [n.lower() == note.lower() for n in notes].index(True) + (middle_octave + 1) * 12
-    elif note[-1].isdigit() and any(n.lower() == note[:-1].lower() for n in notes):
-        return [n.lower() == note[:-1].lower() for n in notes].index(True) + (int(note[-1]) + 1) * 12
-    else:
+    midi = _parse_note_string(note)
+    if midi is None:
         raise ValueError(
-            f"Invalid note '{note}'. Notes must be A-G (with optional sharp 's' suffix: Cs, Ds, Fs, Gs, As) followed by an octave number.")
+            f"Invalid note '{note}'. Notes must be A-G (with optional sharp 's'/'#' or flat 'b' suffix: Cs, C#, Bb) followed by an octave number.")
+    return midi
+
+
+def _lookup_note_strings(note_names: Union[Sequence[str], np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Parse each distinct name once and scatter the results back over the input shape."""
+    names = np.asarray(note_names)
+    if names.size == 0:
+        return np.zeros(names.shape, dtype=np.int64), np.ones(names.shape, dtype=bool), names
+    names = names.astype(str)
+    unique_names, inverse = np.unique(names.ravel(), return_inverse=True)
+    parsed = [_parse_note_string(name) for name in unique_names.tolist()]
+    unique_valid = np.array([midi is not None for midi in parsed])
+    unique_midi = np.array([0 if midi is None else midi for midi in parsed], dtype=np.int64)
+    midi = unique_midi[inverse].reshape(names.shape)
+    valid = unique_valid[inverse].reshape(names.shape)
+    return midi, valid, names
+
+
+def _invalid_entries(valid: np.ndarray, names: np.ndarray) -> List[Tuple[Union[int, Tuple[int, ...]], str]]:
+    positions = np.argwhere(~valid)
+    if names.ndim == 1:
+        return [(int(position[0]), str(names[position[0]])) for position in positions]
+    return [(tuple(int(i) for i in position), str(names[tuple(position)])) for position in positions]
+
+
+def find_invalid_note_strings(note_names: Union[Sequence[str], np.ndarray]) -> List[Tuple[Union[int, Tuple[int, ...]], str]]:
+    """
+    List every note string that cannot be parsed, together with its position.
+
+    Args:
+        note_names: A sequence or NumPy array (any shape) of note strings.
+
+    Returns:
+        A list of (position, note) pairs in row-major order. Positions are ints
+        for 1-D input and index tuples otherwise. Empty if all notes are valid.
+
+    Example:
+        >>> find_invalid_note_strings(["C4", "H2", "Bb3", "Cx"])
+        [(1, 'H2'), (3, 'Cx')]
+    """
+    _, valid, names = _lookup_note_strings(note_names)
+    return _invalid_entries(valid, names)
+
+
+def note_strings_to_midi(note_names: Union[Sequence[str], np.ndarray], invalid_value: Optional[int] = None) -> np.ndarray:
+    """
+    Convert many note strings to MIDI numbers in one call.
+
+    Each distinct name is parsed once through a prebuilt lookup table, so large
+    chord charts with repeated names cost roughly one NumPy gather. Accepts the
+    same names as note_string_to_midi, including flats and multi-digit or
+    negative octaves.
+
+    Args:
+        note_names: A sequence or NumPy array (any shape) of note strings.
+        invalid_value: Value written for unparseable entries. If None (default),
+                       all invalid entries are reported together instead.
+
+    Returns:
+        An int64 array of MIDI numbers with the same shape as note_names.
+
+    Raises:
+        InvalidNoteError: If invalid_value is None and any entry is invalid. Its
+                          invalid_entries attribute lists every (position, note).
+
+    Example:
+        >>> note_strings_to_midi(["C4", "Bb3", "Eb3", "Fs"]).tolist()
+        [60, 58, 51, 66]
+    """
+    midi, valid, names = _lookup_note_strings(note_names)
+    if not valid.all():
+        if invalid_value is None:
+            raise InvalidNoteError(_invalid_entries(valid, names))
+        midi[~valid] = invalid_value
+    return midi
 
 
 def midi_to_note_string(num: int) -> str:
@@ -96,8 +227,8 @@ def midi_to_note_string(num: int) -> str:
         'C3'
     """
     if num < min_note or num > max_note:
-        raise ValueError(f"num {num} has to be in range 0-100")
-    return f"{notes[num % 12]}{num // 12 - 1}"
+        raise ValueError(f"num {num} has to be in range {min_note}-{max_note}")
+    return str(note_spelling_table()[num])
 
 
 def transpose_note_to_string(note: Union[int, str], semitones: int = 12) -> str:
@@ -165,10 +296,7 @@ def build_scale_midi(num: Union[int, str], scale_type: str) -> List[int]:
         >>> build_scale_midi("C4", "minor")
         [60, 62, 63, 65, 67, 68, 70]
     """
-    if scale_type not in scales.keys():
-        raise ValueError(f"not supported scale {scale_type}")
-    num = note_to_midi(num)
-    return [num + sum(scales[scale_type][:i]) for i in range(len(scales[scale_type]))]
+    return scale_table.scale(note_to_midi(num), scale_type).tolist()
 
 
 def get_scale_degree(note: Union[int, str], scale_type: str, degree: int) -> int:
@@ -179,6 +307,7 @@ def get_scale_degree(note: Union[int, str], scale_type: str, degree: int) -> int
         note: The root note of the scale (MIDI number or string).
         scale_type: The type of scale (e.g., "major", "minor").
         degree: The scale degree (1-based). 1 = root, 2 = second, etc.
+                Degrees past the top of the scale continue into higher octaves.
 
     Returns:
         The MIDI note number of the requested scale degree.
@@ -189,7 +318,7 @@ def get_scale_degree(note: Union[int, str], scale_type: str, degree: int) -> int
         >>> get_scale_degree(60, "major", 3)  # The 3rd degree (E)
         64
     """
-    return build_scale_midi(note, scale_type)[degree - 1]
+    return int(scale_table.degree(note_to_midi(note), scale_type, degree))
 
 
 def build_diatonic_chord(note: Union[int, str], scale_type: str, degree: int, num_notes: int) -> List[int]:
@@ -214,10 +343,7 @@ def build_diatonic_chord(note: Union[int, str], scale_type: str, degree: int, nu
         >>> build_diatonic_chord("C4", "major", 2, 4)  # Dm7
         [62, 65, 69, 72]
     """
-    base_scale = build_scale_midi(note, scale_type)
-    scale = extend_notes_across_octaves(base_scale, 3)
-    c_notes = [degree - 1 + 2 * i for i in range(num_notes)]
-    return [scale[c_note] for c_note in c_notes]
+    return scale_table.diatonic_chord(note_to_midi(note), scale_type, degree, num_notes).tolist()
 
 
 def build_scale_note_strings(num: Union[int, str], scale_type: str) -> List[str]:
@@ -229,13 +355,20 @@ def build_scale_note_strings(num: Union[int, str], scale_type: str) -> List[str]
         scale_type: The type of scale (e.g., "major", "minor", "dorian").
 
     Returns:
-        A list of note strings representing the scale.
+        A list of note strings representing the scale, spelled for the key
+        (one letter per degree for seven-note scales).
 
     Examples:
         >>> build_scale_note_strings(60, "major")
         ['C4', 'D4', 'E4', 'F4', 'G4', 'A4', 'B4']
+        >>> build_scale_note_strings("F4", "major")
+        ['F4', 'G4', 'A4', 'Bb4', 'C5', 'D5', 'E5']
+        >>> build_scale_note_strings("Cs4", "major")[:3]
+        ['Cs4', 'Ds4', 'Es4']
     """
-    return [midi_to_note_string(n) for n in build_scale_midi(num, scale_type)]
+    scale = build_scale_midi(num, scale_type)
+    # A tonic given as a name keeps its spelling (Cs rather than Db); numbers get the default tonic spelling.
+    return midi_to_note_strings(scale, key=(num if isinstance(num, str) else scale[0], scale_type)).tolist()
 
 
 def build_chord(base_note: Union[int, str], chord_type: str, inversion: int = 0, lower_octave_doubles: List[int] = None,
@@ -245,7 +378,9 @@ def build_chord(base_note: Union[int, str], chord_type: str, inversion: int = 0,
     Generate a chord with advanced voicing options.
 
     Creates a chord based on the chord type with support for inversions,
-    octave doubling, spread voicings, and openness control.
+    octave doubling, spread voicings, and openness control. Voicing shapes are
+    cached per (chord_type, inversion, over_octaves), so repeated calls only
+    add the root to a cached interval tuple (see voicing_cache_info).
 
     Args:
         base_note: The root note of the chord (MIDI number or string).
@@ -274,12 +409,12 @@ def build_chord(base_note: Union[int, str], chord_type: str, inversion: int = 0,
         >>> build_chord("C4", "major_seventh")
         [60, 64, 67, 71]
     """
+    if chord_type not in chords.keys():
+        raise ValueError(f"not supported chord {chord_type}")
     if interval_half_steps[chords[chord_type][-1]] > 12:
         over_octaves = max(over_octaves, 2)
     if openness < 0 or openness >= 1:
         raise ValueError(f"openness is {openness} it has to be in range [0,1)")
-    if chord_type not in chords.keys():
-        raise ValueError(f"not supported chord {chord_type}")
     base_note = note_to_midi(base_note)
 
     if lower_octave_doubles is None:
@@ -289,19 +424,65 @@ def build_chord(base_note: Union[int, str], chord_type: str, inversion: int = 0,
     root_position = [base_note + interval_half_steps[interval] for interval in chords[chord_type]]
     lower_notes = [transpose_to_midi(root_position[index], -12) for index in lower_octave_doubles]
     upper_notes = [transpose_to_midi(root_position[index]) for index in upper_octave_doubles]
-    base_part = root_position[inversion:]
-    transposed_part = [transpose_to_midi(note) for note in root_position][:inversion]
-    base_part.extend(transposed_part)
-    base_part.sort()
 
-    all_inversions = list(filter(lambda x: have_same_inversion(x, base_part), generate_chord_voicings(base_part, over_octaves)))
-    base_part = all_inversions[math.floor(openness * len(all_inversions))]
+    if _voicing_cache_version != registry.version("chords"):
+        _sync_voicing_cache()
+    shapes = _chord_voicing_shapes(chord_type, inversion, over_octaves)
+    base_part = [base_note + interval for interval in shapes[math.floor(openness * len(shapes))]]
     base_part.extend(lower_notes)
     base_part.extend(upper_notes)
 
     return sorted(base_part)
 
 
+VOICING_CACHE_SIZE = 1024
+# Chord definitions version the cached shapes were built from.
+_voicing_cache_version = registry.version("chords")
+
+
+@lru_cache(maxsize=VOICING_CACHE_SIZE)
+def _chord_voicing_shapes(chord_type: str, inversion: int, over_octaves: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Candidate voicings of a chord as intervals above its root, in openness order.
+
+    The voicing search is transposition-invariant, so it runs once per
+    (chord_type, inversion, over_octaves) and build_chord adds the root.
+    """
+    root_position = [interval_half_steps[interval] for interval in chords[chord_type]]
+    base_part = root_position[inversion:]
+    base_part.extend(note + 12 for note in root_position[:inversion])
+    base_part.sort()
+    # Same result as filtering generate_chord_voicings with have_same_inversion,
+    # but voicings that break the inversion are pruned during the search.
+    return tuple(tuple(voicing) for voicing in iter_chord_voicings(
+        base_part, over_octaves, min_span=12 * (over_octaves - 1), pitch_class_order=base_part))
+
+
+def voicing_cache_info():
+    """
+    Get hit/miss statistics of the build_chord voicing cache.
+
+    Returns:
+        A functools CacheInfo named tuple (hits, misses, maxsize, currsize).
+    """
+    return _chord_voicing_shapes.cache_info()
+
+
+def clear_voicing_cache() -> None:
+    """Empty the build_chord voicing cache, e.g. after changing chord definitions."""
+    registry.sync()
+    _chord_voicing_shapes.cache_clear()
+
+
+def _sync_voicing_cache() -> None:
+    """Empty the voicing cache only if a chord type was redefined since it was filled."""
+    global _voicing_cache_version
+    changes = registry.changes_since("chords", _voicing_cache_version)
+    if changes.replaced:
+        _chord_voicing_shapes.cache_clear()
+    _voicing_cache_version = changes.snapshot.version
+
+
 def generate_chord_voicings(chord: List[int], octaves: int, filtered: bool = True) -> List[List[int]]:
     """
     Generate all possible voicings of a chord across multiple octaves.
@@ -319,7 +500,8 @@ def generate_chord_voicings(chord: List[int], octaves: int, filtered: bool = Tru
 
     Returns:
         A list of chord voicings (each a list of MIDI notes), sorted by
-        evenness of note spacing.
+        evenness of note spacing. Use iter_chord_voicings from the voicing
+        module to prune by constraints or stop after the first few.
 
     Example:
         >>> chord = [60, 64, 67]  # C major
@@ -378,8 +560,8 @@ def are_same_pitch_classes(chord_1: List[int], chord_2: List[int]) -> bool:
     Check if two chords contain the same pitch classes (ignoring octave).
 
     Args:
-        chord_1: First chord as a list of MIDI note numbers.
-        chord_2: Second chord as a list of MIDI note numbers.
+        chord_1: First chord as a list of MIDI note numbers or a PitchClassSet.
+        chord_2: Second chord as a list of MIDI note numbers or a PitchClassSet.
 
     Returns:
         True if both chords have the same pitch classes, False otherwise.
@@ -390,7 +572,7 @@ def are_same_pitch_classes(chord_1: List[int], chord_2: List[int]) -> bool:
         >>> are_same_pitch_classes([60, 64, 67], [60, 63, 67])  # C major vs C minor
         False
     """
-    return {x % 12 for x in chord_1} == {x % 12 for x in chord_2}
+    return pitch_class_mask(chord_1) == pitch_class_mask(chord_2)
 
 
 def have_same_inversion(chord_1: List[int], chord_2: List[int]) -> bool:
@@ -398,11 +580,12 @@ def have_same_inversion(chord_1: List[int], chord_2: List[int]) -> bool:
     Check if two chords have the same inversion (same bass note pitch class).
 
     Compares chords position by position to check if corresponding notes
-    have the same pitch class.
+    have the same pitch class. A PitchClassSet counts as its pitch classes in
+    ascending order.
 
     Args:
-        chord_1: First chord as a list of MIDI note numbers.
-        chord_2: Second chord as a list of MIDI note numbers.
+        chord_1: First chord as a list of MIDI note numbers or a PitchClassSet.
+        chord_2: Second chord as a list of MIDI note numbers or a PitchClassSet.
 
     Returns:
         True if chords have matching pitch classes in order, False otherwise.
@@ -413,6 +596,8 @@ def have_same_inversion(chord_1: List[int], chord_2: List[int]) -> bool:
         >>> have_same_inversion([60, 64, 67], [64, 67, 72])  # Different inversion
         False
     """
+    if isinstance(chord_1, PitchClassSet) and isinstance(chord_2, PitchClassSet):
+        return chord_1.mask == chord_2.mask
     return all(x1 % 12 == x2 % 12 for x1, x2 in zip(chord_1, chord_2))
 
 
@@ -421,7 +606,8 @@ def identify_chords_from_notes(notes_as_list: Set[int]) -> Dict[str, List[int]]:
     Identify possible chord names from a set of notes.
 
     Analyzes a set of MIDI notes and returns all matching chord types
-    from the chord dictionary.
+    from the chord dictionary. Matches come from the precomputed pitch-class
+    mask table in chord_index; see identify_chords_batch for many note sets.
 
     Args:
         notes_as_list: A set of MIDI note numbers to analyze.
@@ -434,18 +620,25 @@ def identify_chords_from_notes(notes_as_list: Set[int]) -> Dict[str, List[int]]:
         >>> identify_chords_from_notes({60, 64, 67})
         {'C4 major': [60, 64, 67]}
     """
-    def is_in_set(chord_tones, note_set) -> bool:
-        return all(x in note_set for x in chord_tones)
+    note_list = list(notes_as_list)
+    note_names = midi_to_note_strings(note_list).tolist()
+    chord_types_by_root = {}
+    for root, chord_type in chord_index.identify(note_list):
+        chord_types_by_root.setdefault(root, []).append(chord_type)
 
     all_chords = {}
-    for note in notes_as_list:
-        for chord_type in chords:
-            chord_as_list = build_chord(note, chord_type)
-            if is_in_set({x % 12 for x in chord_as_list}, {x % 12 for x in notes_as_list}):
-                all_chords[f"{midi_to_note_string(note)} {chord_type}"] = chord_as_list
+    for note, note_name in zip(note_list, note_names):
+        for chord_type in chord_types_by_root.get(note % 12, ()):
+            all_chords[f"{note_name} {chord_type}"] = build_chord(note, chord_type)
 
     return all_chords
 
+def _like(template, voicing: List[int]):
+    """Return voicing as the same kind of chord as template; Chord objects are revoiced."""
+    revoice = getattr(template, "revoice", None)
+    return revoice(voicing) if revoice is not None else voicing
+
+
 def calculate_mean_chord_distance(base_note: Union[int, str], chord_type, base_note2: Union[int, str], chord_type2,
                             inversion=0, inversion2=0) -> float:
     """
@@ -579,6 +772,11 @@ def find_closest_chord_inversion_by_mean(base_note: Union[int, str], chord_type,
     )[1]
 
 
+def _midi_voicings(voicings: List[List[int]]) -> List[List[int]]:
+    """Voicings whose notes are all valid MIDI numbers (the distance kernels read negative notes as padding)."""
+    return [voicing for voicing in voicings if min_note <= voicing[0] and voicing[-1] <= max_note]
+
+
 def find_closest_chord_voicing_for_voice_leading(base_note: Union[int, str], chord_type, base_note2: Union[int, str], chord_type2,
                                   inversion) -> List[int]:
     """
@@ -601,9 +799,11 @@ def find_closest_chord_voicing_for_voice_leading(base_note: Union[int, str], cho
         >>> find_closest_chord_voicing_for_voice_leading("C4", "major", "F4", "major", 0)
         [60, 65, 69]
     """
-    chord_two_possibilities = generate_all_chord_voicings(build_chord(transpose_to_midi(base_note2, -12), chord_type2), 3)
+    chord_two_possibilities = _midi_voicings(generate_all_chord_voicings(
+        build_chord(transpose_to_midi(base_note2, -12), chord_type2), 3))
     chord_one = build_chord(base_note, chord_type, inversion)
-    return min(chord_two_possibilities, key=lambda chord_two: calculate_taxicab_distance_between_notes(chord_one, chord_two))
+    distances = taxicab_distance_matrix(chord_two_possibilities, [chord_one])[:, 0]
+    return chord_two_possibilities[int(distances.argmin())]
 
 
 def find_smooth_chord_voicing_from_notes(chord_one: List[int], chord_2: List[int]) -> List[int]:
@@ -618,14 +818,17 @@ def find_smooth_chord_voicing_from_notes(chord_one: List[int], chord_2: List[int
         chord_2: Second chord as a list of MIDI note numbers.
 
     Returns:
-        A voicing of chord_2 with minimal taxicab distance from chord_one.
+        A voicing of chord_2 with minimal taxicab distance from chord_one
+        (a Chord if chord_2 is a Chord).
 
     Example:
         >>> find_smooth_chord_voicing_from_notes([60, 64, 67], [65, 69, 72])
         [60, 65, 69]
     """
-    chord_two_possibilities = generate_all_chord_voicings([transpose_to_midi(note, -12) for note in chord_2], 3)
-    return min(chord_two_possibilities, key=lambda chord_two: calculate_taxicab_distance_between_notes(chord_one, chord_two))
+    chord_two_possibilities = _midi_voicings(generate_all_chord_voicings(
+        [transpose_to_midi(note, -12) for note in chord_2], 3))
+    distances = taxicab_distance_matrix(chord_two_possibilities, [list(chord_one)])[:, 0]
+    return _like(chord_2, chord_two_possibilities[int(distances.argmin())])
 
 def find_chord_voicing_by_common_tones(chord1: List[int], chord2: List[int]) -> List[int]:
     """
@@ -638,10 +841,12 @@ def find_chord_voicing_by_common_tones(chord1: List[int], chord2: List[int]) ->
     
     Args:
         chord1: List of MIDI note numbers for the reference chord
-        chord2: List of MIDI note numbers for the chord to voice
+        chord2: List of MIDI note numbers for the chord to voice, or a
+                PitchClassSet (its pitch classes are placed near chord1)
     
     Returns:
         A sorted list of MIDI note numbers representing the voiced chord2
+        (a Chord if chord2 is a Chord)
         
     Raises:
         ValueError: If either chord is empty
@@ -654,6 +859,8 @@ def find_chord_voicing_by_common_tones(chord1: List[int], chord2: List[int]) ->
     if not chord1 or not chord2:
         raise ValueError("Both chord1 and chord2 must be non-empty lists")
     
+    template = chord2
+    chord2 = list(chord2)
     chord2_inversion = []
     same_note_indices = set()  # Use set to track which chord2 indices already used (dedup)
     
@@ -689,6 +896,6 @@ def find_chord_voicing_by_common_tones(chord1: List[int], chord2: List[int]) ->
             chord2_inversion.append(note + 12 * best_octave_offset)
 
     chord2_inversion.sort()
-    return chord2_inversion
+    return _like(template, chord2_inversion)
 
 
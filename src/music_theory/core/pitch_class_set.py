@@ -0,0 +1,188 @@
+"""
+Pitch class set module backed by 12-bit integer masks.
+
+A PitchClassSet stores its pitch classes as one int (bit 0 = C, bit 11 = B).
+Union, intersection, transposition and common-tone counts are single integer
+operations, and inversion, normal form and prime form come from tables over
+all 4096 masks, so comparing pitch-class content costs a few int operations
+instead of building Python sets.
+
+Normal and prime forms follow Rahn's ordering: the most compact rotation,
+ties broken by the interval from the first to the last, then second-to-last
+element, and so on.
+"""
+
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+_FULL_MASK = 0xFFF
+# Number of pitch classes in every mask; an array so the batch kernels can index it with arrays of masks.
+_POPCOUNT = np.array([bin(mask).count("1") for mask in range(4096)], dtype=np.int64)
+# Inversion about C (pc -> -pc) for every mask.
+_INVERSION = [sum(1 << ((12 - pc) % 12) for pc in range(12) if mask >> pc & 1) for mask in range(4096)]
+_FORMS: Optional[Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]] = None
+
+
+def _pitch_classes(mask: int) -> List[int]:
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+def _rotate(mask: int, semitones: int) -> int:
+    semitones %= 12
+    return ((mask << semitones) | (mask >> (12 - semitones))) & _FULL_MASK
+
+
+def _packing_key(ordering: List[int]) -> Tuple[int, ...]:
+    """Rahn's comparison: span first, then intervals from the first to each earlier element."""
+    return tuple((pc - ordering[0]) % 12 for pc in reversed(ordering))
+
+
+def _normal_form(mask: int) -> Tuple[int, ...]:
+    pcs = _pitch_classes(mask)
+    if not pcs:
+        return ()
+    rotations = [pcs[i:] + pcs[:i] for i in range(len(pcs))]
+    return tuple(min(rotations, key=lambda ordering: (_packing_key(ordering), ordering[0])))
+
+
+def _form_tables() -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]:
+    """Build normal and prime forms for all 4096 masks on first use."""
+    global _FORMS
+    if _FORMS is None:
+        normal_forms = [_normal_form(mask) for mask in range(4096)]
+        prime_forms = []
+        for mask in range(4096):
+            candidates = [tuple((pc - form[0]) % 12 for pc in form)
+                          for form in (normal_forms[mask], normal_forms[_INVERSION[mask]]) if form]
+            prime_forms.append(min(candidates, key=lambda form: _packing_key(list(form))) if candidates else ())
+        _FORMS = (normal_forms, prime_forms)
+    return _FORMS
+
+
+class PitchClassSet:
+    """
+    An immutable set of pitch classes stored as a 12-bit mask.
+
+    Iterating yields pitch classes in ascending order, so a PitchClassSet can
+    be passed wherever a list of notes is read for its pitch classes.
+
+    Attributes:
+        mask (int): The 12-bit mask (bit 0 = C).
+
+    Example:
+        >>> c_major = PitchClassSet([60, 64, 67])
+        >>> list(c_major.transpose(7))
+        [2, 7, 11]
+        >>> c_major.common_tones(PitchClassSet([67, 71, 74]))
+        1
+        >>> c_major.prime_form()
+        (0, 3, 7)
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, pitches: Iterable[int] = ()):
+        """
+        Initialize a PitchClassSet.
+
+        Args:
+            pitches: MIDI notes or pitch classes; only their values mod 12 are kept.
+        """
+        mask = 0
+        for pitch in pitches:
+            mask |= 1 << (pitch % 12)
+        object.__setattr__(self, "mask", mask)
+
+    @classmethod
+    def from_mask(cls, mask: int) -> "PitchClassSet":
+        """Create a PitchClassSet directly from a 12-bit mask."""
+        pitch_class_set = cls.__new__(cls)
+        object.__setattr__(pitch_class_set, "mask", mask & _FULL_MASK)
+        return pitch_class_set
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PitchClassSet is immutable")
+
+    def __repr__(self) -> str:
+        return f"PitchClassSet({list(self)})"
+
+    def __iter__(self):
+        return iter(_pitch_classes(self.mask))
+
+    def __len__(self) -> int:
+        return int(_POPCOUNT[self.mask])
+
+    def __contains__(self, pitch: int) -> bool:
+        return bool(self.mask >> (pitch % 12) & 1)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PitchClassSet) and self.mask == other.mask
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __or__(self, other: "PitchClassSet") -> "PitchClassSet":
+        return PitchClassSet.from_mask(self.mask | pitch_class_mask(other))
+
+    def __and__(self, other: "PitchClassSet") -> "PitchClassSet":
+        return PitchClassSet.from_mask(self.mask & pitch_class_mask(other))
+
+    def __sub__(self, other: "PitchClassSet") -> "PitchClassSet":
+        return PitchClassSet.from_mask(self.mask & ~pitch_class_mask(other))
+
+    def __xor__(self, other: "PitchClassSet") -> "PitchClassSet":
+        return PitchClassSet.from_mask(self.mask ^ pitch_class_mask(other))
+
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+
+    def issubset(self, other: "PitchClassSet") -> bool:
+        return self.mask & ~pitch_class_mask(other) == 0
+
+    def transpose(self, semitones: int) -> "PitchClassSet":
+        """Transpose by a number of semitones (bit rotation)."""
+        return PitchClassSet.from_mask(_rotate(self.mask, semitones))
+
+    def invert(self, axis: int = 0) -> "PitchClassSet":
+        """Invert each pitch class pc to (axis - pc) mod 12."""
+        return PitchClassSet.from_mask(_rotate(_INVERSION[self.mask], axis))
+
+    def common_tones(self, other: Union["PitchClassSet", Iterable[int]]) -> int:
+        """Number of pitch classes shared with another set or note list."""
+        return int(_POPCOUNT[self.mask & pitch_class_mask(other)])
+
+    def normal_form(self) -> Tuple[int, ...]:
+        """The most compact ordering of the pitch classes (Rahn)."""
+        return _form_tables()[0][self.mask]
+
+    def prime_form(self) -> Tuple[int, ...]:
+        """The set-class representative starting on 0, inversion included (Rahn)."""
+        return _form_tables()[1][self.mask]
+
+    def is_transposition_of(self, other: "PitchClassSet") -> bool:
+        """True if some transposition maps this set onto the other."""
+        other_mask = pitch_class_mask(other)
+        return any(_rotate(self.mask, n) == other_mask for n in range(12))
+
+
+def pitch_class_mask(notes: Union[PitchClassSet, Iterable[int]]) -> int:
+    """
+    Encode the pitch classes of some MIDI notes as a 12-bit mask.
+
+    Example:
+        >>> pitch_class_mask([60, 64, 67])
+        145
+    """
+    if isinstance(notes, PitchClassSet):
+        return notes.mask
+    mask = 0
+    for note in notes:
+        mask |= 1 << (note % 12)
+    return mask
+
+
+def common_tone_count(chord_1: Union[PitchClassSet, Iterable[int]], chord_2: Union[PitchClassSet, Iterable[int]]) -> int:
+    """Number of pitch classes two chords share."""
+    return int(_POPCOUNT[pitch_class_mask(chord_1) & pitch_class_mask(chord_2)])
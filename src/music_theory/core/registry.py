@@ -0,0 +1,271 @@
+"""
+Registry module for adding chord, scale and interval definitions at runtime.
+
+constants.chords, constants.scales and constants.interval_half_steps stay the
+library's definition tables, but they should be changed through the registry
+rather than by assignment. The registry serializes changes with a lock and
+publishes, per kind, an immutable snapshot (a read-only mapping of tuples)
+with a version counter that increases with every change.
+
+Derived tables (the chord index, the scale table and index, the voicing
+cache, ...) remember the version they were built from. On use they compare it
+with the current version, which costs one dict lookup, and ask
+changes_since() what happened in between: added definitions are merged into
+the existing table, and only redefined (or removed) ones force a rebuild.
+
+Redefining an interval counts as redefining every chord that uses it, so
+chord-derived tables only need to watch the "chords" version.
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Sequence, Tuple
+
+from src.music_theory.core import constants
+
+KINDS = ("chords", "scales", "intervals")
+
+
+class RegistrySnapshot(NamedTuple):
+    """An immutable view of one kind of definitions at one version."""
+    version: int
+    definitions: Mapping[str, object]
+
+
+class RegistryChanges(NamedTuple):
+    """
+    What changed in one kind of definitions since an earlier version.
+
+    Attributes:
+        snapshot (RegistrySnapshot): The current snapshot.
+        added (FrozenSet[str]): Names that are new since that version.
+        replaced (FrozenSet[str]): Names that were redefined or removed since then.
+    """
+    snapshot: RegistrySnapshot
+    added: FrozenSet[str]
+    replaced: FrozenSet[str]
+
+
+def _freeze(value):
+    return tuple(value) if isinstance(value, (list, tuple)) else value
+
+
+def _thaw(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+class TypeRegistry:
+    """
+    Thread-safe, versioned store of chord, scale and interval definitions.
+
+    Attributes:
+        live (Dict[str, dict]): The mutable dicts kept in step with the
+            snapshots, by kind (the constants module's tables for the
+            default registry).
+
+    Example:
+        >>> registry.register_chord("major_add_sharp_eleven", ["unison", "major_third", "tritone", "perfect_fifth"])
+        >>> "major_add_sharp_eleven" in registry.snapshot("chords").definitions
+        True
+    """
+
+    def __init__(self, chords: Dict[str, list] = None, scales: Dict[str, list] = None,
+                 intervals: Dict[str, int] = None):
+        """
+        Initialize a TypeRegistry over existing definition dicts.
+
+        Args:
+            chords: Chord type -> interval names (default: a new empty dict).
+            scales: Scale type -> semitone steps (default: a new empty dict).
+            intervals: Interval name -> semitones (default: a new empty dict).
+        """
+        self.live = {"chords": {} if chords is None else chords, "scales": {} if scales is None else scales,
+                     "intervals": {} if intervals is None else intervals}
+        self._lock = threading.RLock()
+        self._snapshots: Dict[str, RegistrySnapshot] = {}
+        # Per kind, (version, name, replaced) for every change in version order.
+        self._log: Dict[str, List[Tuple[int, str, bool]]] = {kind: [] for kind in KINDS}
+        for kind in KINDS:
+            self._publish(kind, {name: _freeze(value) for name, value in self.live[kind].items()}, 0)
+
+    def _publish(self, kind: str, definitions: dict, version: int) -> None:
+        self._snapshots[kind] = RegistrySnapshot(version, MappingProxyType(definitions))
+
+    def _check_live(self, kind: str) -> None:
+        # Adopt definitions added to or removed from the live dict directly (the old way of extending).
+        if len(self.live[kind]) != len(self._snapshots[kind].definitions):
+            self.sync()
+
+    def version(self, kind: str) -> int:
+        """
+        Current version of one kind of definitions ("chords", "scales" or "intervals").
+
+        Raises:
+            ValueError: If kind is not supported.
+        """
+        if kind not in self._snapshots:
+            raise ValueError(f"kind is {kind} it has to be one of {', '.join(KINDS)}")
+        self._check_live(kind)
+        return self._snapshots[kind].version
+
+    def snapshot(self, kind: str) -> RegistrySnapshot:
+        """The current immutable snapshot of one kind of definitions."""
+        self.version(kind)
+        return self._snapshots[kind]
+
+    def changes_since(self, kind: str, version: int) -> RegistryChanges:
+        """
+        Names added and replaced since an earlier version of one kind.
+
+        A name both added and then redefined counts as replaced.
+        """
+        with self._lock:
+            snapshot = self.snapshot(kind)
+            added, replaced = set(), set()
+            for changed_version, name, was_replaced in reversed(self._log[kind]):
+                if changed_version <= version:
+                    break
+                (replaced if was_replaced else added).add(name)
+            added -= replaced
+            return RegistryChanges(snapshot, frozenset(added), frozenset(replaced))
+
+    def _apply(self, kind: str, definitions: Mapping[str, object], replace: bool) -> None:
+        """Store a validated batch of definitions as one new version."""
+        with self._lock:
+            current = self._snapshots[kind]
+            updated = dict(current.definitions)
+            changes = []
+            for name, value in definitions.items():
+                value = _freeze(value)
+                if name in updated:
+                    if updated[name] == value:
+                        continue
+                    if not replace:
+                        raise ValueError(f"{kind[:-1]} {name} is already registered, pass replace=True to redefine it")
+                changes.append((name, name in updated))
+                updated[name] = value
+            for name, _ in changes:
+                self.live[kind][name] = _thaw(updated[name])
+            self._record(kind, updated, changes)
+
+    def _record(self, kind: str, definitions: dict, changes: List[Tuple[str, bool]]) -> None:
+        """Log (name, replaced) changes and publish definitions as the next version."""
+        if not changes:
+            return
+        version = self._snapshots[kind].version + 1
+        self._log[kind].extend((version, name, was_replaced) for name, was_replaced in changes)
+        self._publish(kind, definitions, version)
+        if kind == "intervals":
+            # Chords built from a redefined interval are redefined too.
+            redefined = {name for name, was_replaced in changes if was_replaced}
+            chords = self._snapshots["chords"].definitions
+            self._record("chords", dict(chords), [(name, True) for name, intervals in chords.items()
+                                                  if redefined.intersection(intervals)])
+
+    def register_chords(self, definitions: Mapping[str, Sequence[str]], replace: bool = False) -> None:
+        """
+        Register many chord types at once, as a single new version.
+
+        This is the path for loading chord types at startup: every registration
+        makes derived tables such as the chord index update on their next use,
+        so a batch costs one update where registering one by one costs one each.
+
+        Args:
+            definitions: Chord type -> interval names from the intervals
+                         (e.g. ["unison", "major_third", "perfect_fifth"]).
+            replace: Allow redefining existing chord types (default False).
+                     Registering an identical definition is always allowed.
+
+        Raises:
+            ValueError: If a definition is empty, uses an unknown interval, or
+                        redefines a chord type without replace.
+        """
+        intervals = self.snapshot("intervals").definitions
+        for name, chord in definitions.items():
+            if len(chord) == 0:
+                raise ValueError(f"chord {name} has no intervals")
+            for interval in chord:
+                if interval not in intervals:
+                    raise ValueError(f"not supported interval {interval} in chord {name}")
+        self._apply("chords", definitions, replace)
+
+    def register_scales(self, definitions: Mapping[str, Sequence[int]], replace: bool = False) -> None:
+        """
+        Register many scale types at once, as a single new version.
+
+        Args:
+            definitions: Scale type -> semitone steps between consecutive
+                         notes, e.g. [2, 2, 1, 2, 2, 2, 1].
+            replace: Allow redefining existing scale types (default False).
+
+        Raises:
+            ValueError: If a step is not a positive integer or a scale type is
+                        redefined without replace.
+        """
+        for name, steps in definitions.items():
+            if len(steps) == 0 or any(int(step) != step or step <= 0 for step in steps):
+                raise ValueError(f"scale {name} has steps {list(steps)} they have to be positive integers")
+        self._apply("scales", {name: [int(step) for step in steps] for name, steps in definitions.items()}, replace)
+
+    def register_intervals(self, definitions: Mapping[str, int], replace: bool = False) -> None:
+        """
+        Register many intervals at once, as a single new version.
+
+        Args:
+            definitions: Interval name -> semitones above the root (0 or more).
+            replace: Allow redefining existing intervals (default False).
+
+        Raises:
+            ValueError: If a size is negative or an interval is redefined without replace.
+        """
+        for name, half_steps in definitions.items():
+            if int(half_steps) != half_steps or half_steps < 0:
+                raise ValueError(f"interval {name} is {half_steps} it has to be a non-negative integer")
+        self._apply("intervals", {name: int(half_steps) for name, half_steps in definitions.items()}, replace)
+
+    def register_chord(self, name: str, intervals: Sequence[str], replace: bool = False) -> None:
+        """Register one chord type; see register_chords."""
+        self.register_chords({name: intervals}, replace)
+
+    def register_scale(self, name: str, steps: Sequence[int], replace: bool = False) -> None:
+        """Register one scale type; see register_scales."""
+        self.register_scales({name: steps}, replace)
+
+    def register_interval(self, name: str, half_steps: int, replace: bool = False) -> None:
+        """Register one interval; see register_intervals."""
+        self.register_intervals({name: half_steps}, replace)
+
+    def sync(self) -> None:
+        """
+        Adopt changes made directly to the live dicts since the last snapshot.
+
+        Added entries are registered; changed or deleted ones count as
+        replaced. Only needed after editing definitions in place without
+        changing their number, which the registry cannot notice by itself.
+        """
+        with self._lock:
+            for kind in KINDS:
+                live, current = self.live[kind], self._snapshots[kind]
+                frozen = {name: _freeze(value) for name, value in live.items()}
+                changes = [(name, name in current.definitions) for name, value in frozen.items()
+                           if current.definitions.get(name) != value]
+                changes.extend((name, True) for name in current.definitions if name not in frozen)
+                self._record(kind, frozen, changes)
+
+
+registry = TypeRegistry(constants.chords, constants.scales, constants.interval_half_steps)
+
+
+def register_chord(name: str, intervals: Sequence[str], replace: bool = False) -> None:
+    """Register a chord type in the library's registry; see TypeRegistry.register_chords."""
+    registry.register_chord(name, intervals, replace)
+
+
+def register_scale(name: str, steps: Sequence[int], replace: bool = False) -> None:
+    """Register a scale type in the library's registry; see TypeRegistry.register_scales."""
+    registry.register_scale(name, steps, replace)
+
+
+def register_interval(name: str, half_steps: int, replace: bool = False) -> None:
+    """Register an interval in the library's registry; see TypeRegistry.register_intervals."""
+    registry.register_interval(name, half_steps, replace)
@@ -0,0 +1,267 @@
+"""
+Roman numeral module for compiling progression strings.
+
+A progression such as "ii7 - V7/V - V7 - I6 | bVI(minor)" is parsed once into
+a RomanPlan (cached by text). A plan holds, per chord, the root as semitones
+above the tonic, the chord type from constants.chords and the inversion, so
+applying it to a key is integer arithmetic, and rendering it in many keys at
+once is a single NumPy gather.
+
+Symbol grammar:
+
+    [accidentals] numeral [quality] [maj] [figure] [/numeral ...] [(mode)]
+
+    numeral:      I..VII (major) or i..vii (minor)
+    quality:      ° or o (diminished), ø (half-diminished), + (augmented)
+    maj:          maj, M or Δ makes the seventh (or extension) major
+    figure:       7, 9, 11, 13 (extensions), 6, 64 (triad inversions),
+                  65, 43, 42 or 2 (seventh chord inversions)
+    /numeral:     secondary (applied) chord, e.g. V7/V; may chain (V/V/V)
+    (mode):       borrow the degree from a parallel scale, e.g. VI(minor)
+
+Degrees come from the key's scale, or from (mode) if given. Accidentals
+(b or #) are measured from the major scale on the (local) tonic, so bVI is
+eight semitones above the tonic in any key. Secondary chords are read in the
+major key of their target, or the harmonic minor key if the target is
+lowercase (so vii°7/ii is built on the leading tone of ii).
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.constants import chords, scales
+from src.music_theory.core.notes import build_chord, note_to_midi
+from src.music_theory.core.registry import registry
+from src.music_theory.core.scale_table import scale_table
+
+_NUMERALS = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7}
+_NUMERAL_PATTERN = "VII|VI|IV|V|III|II|I|vii|vi|iv|v|iii|ii|i"
+_SYMBOL = re.compile(
+    rf"(?P<accidentals>[b#♭♯]*)(?P<numeral>{_NUMERAL_PATTERN})(?P<quality>[°oø+])?(?P<major>maj|M|Δ)?"
+    rf"(?P<figure>13|11|9|7|65|64|43|42|6|2)?(?P<applied>(?:/[b#♭♯]*(?:{_NUMERAL_PATTERN}))*)"
+    r"(?:\((?P<mode>\w+)\))?")
+_SEPARATORS = re.compile(r"[\s,|\-–]+")
+
+# (triad quality, major seventh?, extension) -> chord type.
+_CHORD_TYPES: Dict[Tuple[str, bool, Optional[int]], str] = {
+    ("major", False, None): "major",
+    ("minor", False, None): "minor",
+    ("diminished", False, None): "diminished",
+    ("augmented", False, None): "augmented",
+    ("major", False, 7): "dominant_seventh",
+    ("major", True, 7): "major_seventh",
+    ("minor", False, 7): "minor_seventh",
+    ("minor", True, 7): "minor_major_seventh",
+    ("diminished", False, 7): "diminished_seventh",
+    ("half_diminished", False, 7): "half_diminished_seventh",
+    ("augmented", False, 7): "augmented_minor_seventh",
+    ("augmented", True, 7): "augmented_major_seventh",
+    ("major", False, 9): "dominant_ninth",
+    ("major", True, 9): "major_ninth",
+    ("minor", False, 9): "minor_ninth",
+    ("major", True, 11): "major_eleventh",
+    ("minor", False, 11): "minor_eleventh",
+    ("major", False, 13): "dominant_thirteenth",
+    ("major", True, 13): "major_thirteenth",
+    ("minor", False, 13): "minor_thirteenth",
+}
+# Figure -> (extension implied, inversion).
+_FIGURES = {None: (None, 0), "6": (None, 1), "64": (None, 2), "7": (7, 0), "65": (7, 1), "43": (7, 2),
+            "42": (7, 3), "2": (7, 3), "9": (9, 0), "11": (11, 0), "13": (13, 0)}
+_QUALITIES = {"°": "diminished", "o": "diminished", "ø": "half_diminished", "+": "augmented"}
+
+
+def _accidental_shift(accidentals: str) -> int:
+    return sum(1 if accidental in "#♯" else -1 for accidental in accidentals)
+
+
+class _RomanChord:
+    """One parsed symbol; its root offset depends on the key's scale, so it is resolved per scale type."""
+
+    __slots__ = ("symbol", "shift", "degree", "chord_type", "inversion", "applied", "mode")
+
+    def __init__(self, symbol: str):
+        match = _SYMBOL.fullmatch(symbol)
+        if match is None:
+            raise ValueError(f"not a Roman numeral chord symbol: {symbol!r}")
+        numeral = match["numeral"]
+        quality = _QUALITIES.get(match["quality"], "major" if numeral.isupper() else "minor")
+        extension, inversion = _FIGURES[match["figure"]]
+        if quality == "half_diminished":
+            extension = 7
+        chord_type = _CHORD_TYPES.get((quality, match["major"] is not None, extension))
+        if chord_type is None:
+            raise ValueError(f"unsupported chord quality in {symbol!r}")
+        mode = match["mode"]
+        if mode is not None and mode not in scales:
+            raise ValueError(f"not supported scale {mode} in {symbol!r}")
+        self.symbol = symbol
+        self.shift = _accidental_shift(match["accidentals"])
+        self.degree = _NUMERALS[numeral.upper()]
+        self.chord_type = chord_type
+        self.inversion = inversion
+        self.mode = mode
+        # Secondary targets from the innermost (closest to the key) outwards.
+        self.applied = [(_accidental_shift(target.rstrip("IViv")), _NUMERALS[target.lstrip("b#♭♯").upper()],
+                         target.lstrip("b#♭♯").islower())
+                        for target in reversed(match["applied"].split("/")[1:])]
+
+    def root_offset(self, scale_type: str) -> int:
+        """Semitones from the tonic to the chord root in a key of scale_type."""
+        tonic, scale = 0, scale_type
+        for shift, degree, minor in self.applied:
+            tonic += _degree_offset(scale, degree, shift, self.symbol)
+            scale = "harmonic_minor" if minor else "major"
+        return (tonic + _degree_offset(self.mode or scale, self.degree, self.shift, self.symbol)) % 12
+
+
+@lru_cache(maxsize=4096)
+def _parse_symbol(symbol: str) -> _RomanChord:
+    return _RomanChord(symbol)
+
+
+@lru_cache(maxsize=4096)
+def _symbol_root_offset(symbol: str, scale_type: str, version: int) -> int:
+    # version is the registry's scales version, so redefined scales miss the cache.
+    return _parse_symbol(symbol).root_offset(scale_type)
+
+
+def _degree_offset(scale_type: str, degree: int, shift: int, symbol: str) -> int:
+    if shift:
+        return int(scale_table.offsets("major", degree - 1)) + shift
+    if degree > scale_table.scale_length(scale_type):
+        raise ValueError(f"{symbol!r} needs degree {degree}, which {scale_type} does not have")
+    return int(scale_table.offsets(scale_type, degree - 1))
+
+
+class RomanPlan:
+    """
+    A compiled Roman numeral progression, reusable in any key.
+
+    Attributes:
+        symbols (Tuple[str, ...]): The chord symbols in order.
+        chord_types (Tuple[str, ...]): Chord type of each symbol.
+        inversions (Tuple[int, ...]): Inversion of each symbol.
+
+    Example:
+        >>> plan = compile_roman("ii7 - V7/V - V7 - I6 | bVI(minor)")
+        >>> plan.progression("C4")
+        [(62, 'minor_seventh', 0), (62, 'dominant_seventh', 0), (67, 'dominant_seventh', 0), (60, 'major', 1), (68, 'major', 0)]
+    """
+
+    def __init__(self, text: str):
+        self._chords = [_parse_symbol(symbol) for symbol in _SEPARATORS.split(text.strip()) if symbol]
+        self.symbols = tuple(chord.symbol for chord in self._chords)
+        self.chord_types = tuple(chord.chord_type for chord in self._chords)
+        self.inversions = tuple(chord.inversion for chord in self._chords)
+        self._offsets: Dict[Tuple[str, int], np.ndarray] = {}
+        self._shapes: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._chords)
+
+    def __repr__(self) -> str:
+        return f"RomanPlan({' '.join(self.symbols)!r})"
+
+    def root_offsets(self, scale_type: str = "major") -> np.ndarray:
+        """Semitones from the tonic to each chord root in a key of scale_type (cached per scales version)."""
+        version = registry.version("scales")
+        offsets = self._offsets.get((scale_type, version))
+        if offsets is None:
+            if scale_type not in scales:
+                raise ValueError(f"not supported scale {scale_type}")
+            offsets = np.array([_symbol_root_offset(symbol, scale_type, version) for symbol in self.symbols],
+                               dtype=np.int64)
+            offsets.flags.writeable = False
+            self._offsets[(scale_type, version)] = offsets
+        return offsets
+
+    def progression(self, tonic: Union[int, str], scale_type: str = "major") -> List[Tuple[int, str, int]]:
+        """
+        Apply the plan to one key.
+
+        Args:
+            tonic: The tonic as a MIDI number or note string; roots lie in the
+                   octave above it.
+            scale_type: The key's scale (default "major").
+
+        Returns:
+            (root, chord_type, inversion) items for compose_chord_progression.
+        """
+        roots = (note_to_midi(tonic) + self.root_offsets(scale_type)).tolist()
+        return list(zip(roots, self.chord_types, self.inversions))
+
+    def render(self, tonics: Union[int, Sequence[int], np.ndarray], scale_type: str = "major") -> np.ndarray:
+        """
+        Build the chords of the plan in many keys at once.
+
+        Args:
+            tonics: Tonic MIDI numbers, e.g. 60 + np.arange(12).
+            scale_type: The keys' scale (default "major").
+
+        Returns:
+            An int64 array of shape tonics.shape + (len(plan), notes) with the
+            notes of build_chord(root, chord_type, inversion); smaller chords
+            are padded with -1.
+        """
+        if self._shapes is None:
+            shapes = [build_chord(0, chord_type, inversion) for chord_type, inversion in
+                      zip(self.chord_types, self.inversions)]
+            width = max((len(shape) for shape in shapes), default=0)
+            self._shapes = np.full((len(shapes), width), -1, dtype=np.int64)
+            for row, shape in enumerate(shapes):
+                self._shapes[row, :len(shape)] = shape
+        roots = np.asarray(tonics, dtype=np.int64)[..., None] + self.root_offsets(scale_type)
+        return np.where(self._shapes >= 0, roots[..., None] + self._shapes, -1)
+
+    def scale_degrees(self, scale_type: str = "major") -> Tuple[List[tuple], List[List[int]]]:
+        """
+        Express the plan in the format of ScaledChordProgression.generate_progression.
+
+        Only chords built by stacking thirds on a scale degree can be written
+        that way, so symbols with accidentals or secondary targets are rejected.
+        The chord quality then follows the scale, as in generate_progression.
+
+        Returns:
+            (degrees, chord_types): (degree, inversion, mode) tuples and scale
+            interval lists such as [1, 3, 5, 7].
+
+        Raises:
+            ValueError: If a symbol is chromatic or a secondary chord.
+        """
+        degrees, chord_types = [], []
+        for chord in self._chords:
+            if chord.shift or chord.applied:
+                raise ValueError(f"{chord.symbol!r} cannot be written as a scale degree")
+            degrees.append((chord.degree, chord.inversion, chord.mode or scale_type))
+            chord_types.append(list(range(1, 2 * len(chords[chord.chord_type]), 2)))
+        return degrees, chord_types
+
+
+@lru_cache(maxsize=1024)
+def compile_roman(text: str) -> RomanPlan:
+    """
+    Parse a Roman numeral progression into a reusable plan, cached by text.
+
+    Args:
+        text: Symbols separated by spaces, commas, "-" or "|".
+
+    Returns:
+        The compiled RomanPlan.
+
+    Raises:
+        ValueError: If a symbol cannot be parsed.
+
+    Example:
+        >>> compile_roman("I - vi - IV - V7").progression(57)
+        [(57, 'major', 0), (66, 'minor', 0), (62, 'major', 0), (64, 'dominant_seventh', 0)]
+    """
+    return RomanPlan(text)
+
+
+def roman_progression(text: str, tonic: Union[int, str], scale_type: str = "major") -> List[Tuple[int, str, int]]:
+    """Parse (once) and apply a Roman numeral progression; see RomanPlan.progression."""
+    return compile_roman(text).progression(tonic, scale_type)
@@ -0,0 +1,163 @@
+"""
+Scale index module for finding the scales that contain a set of notes.
+
+Every scale type in constants.scales on each of the 12 roots is encoded as a
+12-bit pitch-class mask. The index precomputes, for all 4096 masks, which
+(root, scale_type) pairs contain it, ordered by fit, so "which scales contain
+these notes?" is one table lookup per note set. Ranking with partial matches
+is vectorized over all scales and many note sets at once.
+
+Fit is measured by two counts: missing notes (pitch classes of the note set
+outside the scale) and extra notes (scale pitch classes not in the note set).
+Fewer missing notes rank first, then fewer extra notes.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.music_theory.core.chord_index import NoteSets, pitch_class_masks
+from src.music_theory.core.pitch_class_set import _POPCOUNT, pitch_class_mask
+from src.music_theory.core.registry import registry
+from src.music_theory.core.scale_table import scale_table
+
+
+class ScaleIndex:
+    """
+    Lookup table from pitch-class mask to containing (root, scale_type) pairs.
+
+    Built on first use, and rebuilt when scales are registered or redefined.
+    Entries are ordered by scale type (as in constants.scales) then root;
+    lookups return them ordered by fit.
+
+    Example:
+        >>> scale_index.find([60, 62, 64, 65, 67, 69, 71])[:2]
+        ((0, 'major'), (9, 'minor'))
+    """
+
+    def __init__(self):
+        self._entries: Optional[List[Tuple[int, str]]] = None
+        self._masks: Optional[np.ndarray] = None
+        self._table: Optional[List[Tuple[Tuple[int, str], ...]]] = None
+        self._version = -1
+
+    def _build(self) -> None:
+        snapshot = registry.snapshot("scales")
+        entries, masks = [], []
+        for scale_type in snapshot.definitions:
+            for root, pitch_classes in enumerate(scale_table.pitch_class_table(scale_type)):
+                entries.append((root, scale_type))
+                masks.append(pitch_class_mask(pitch_classes.tolist()))
+        self._entries = entries
+        self._masks = np.array(masks, dtype=np.int64)
+
+        queries = np.arange(4096)[:, None]
+        contains = (queries & ~self._masks[None, :]) == 0
+        extra = _POPCOUNT[self._masks[None, :] & ~queries]
+        table = []
+        for query in range(4096):
+            candidates = np.flatnonzero(contains[query])
+            order = candidates[np.argsort(extra[query, candidates], kind="stable")]
+            table.append(tuple(entries[i] for i in order.tolist()))
+        self._table = table
+        self._version = snapshot.version
+
+    @property
+    def entries(self) -> List[Tuple[int, str]]:
+        """Every (root pitch class, scale_type) pair, in index order."""
+        if self._entries is None or self._version != registry.version("scales"):
+            self._build()
+        return self._entries
+
+    @property
+    def masks(self) -> np.ndarray:
+        """Pitch-class mask of every entry, in index order."""
+        if self._masks is None or self._version != registry.version("scales"):
+            self._build()
+        return self._masks
+
+    def clear(self) -> None:
+        """Drop the tables so they are rebuilt on next use, e.g. after changing scale definitions."""
+        registry.sync()
+        self._entries = self._masks = self._table = None
+
+    def lookup(self, mask: int) -> Tuple[Tuple[int, str], ...]:
+        """All (root pitch class, scale_type) pairs containing mask, best fit first."""
+        if self._table is None or self._version != registry.version("scales"):
+            self._build()
+        return self._table[mask]
+
+    def find(self, notes) -> Tuple[Tuple[int, str], ...]:
+        """All (root pitch class, scale_type) pairs containing some notes, best fit first."""
+        return self.lookup(pitch_class_mask(notes))
+
+    def find_batch(self, note_sets: NoteSets) -> List[Tuple[Tuple[int, str], ...]]:
+        """
+        Find the containing scales for many note sets in one pass.
+
+        Args:
+            note_sets: A 2-D integer array with one note set per row (negative
+                       entries are padding), or a sequence of note iterables.
+
+        Returns:
+            One tuple of (root pitch class, scale_type) pairs per note set.
+        """
+        if self._table is None or self._version != registry.version("scales"):
+            self._build()
+        table = self._table
+        return [table[mask] for mask in pitch_class_masks(note_sets).tolist()]
+
+    def rank_batch(self, note_sets: NoteSets, top: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rank every scale against many note sets, allowing partial matches.
+
+        Args:
+            note_sets: A 2-D integer array with one note set per row (negative
+                       entries are padding), or a sequence of note iterables.
+            top: Keep only the best top entries per note set (default: all).
+
+        Returns:
+            Three arrays of shape (len(note_sets), top): entry indices into
+            entries, missing-note counts, and extra-note counts.
+        """
+        # At most 4096 distinct masks: rank those, then gather rows per note set.
+        unique_masks, inverse = np.unique(pitch_class_masks(note_sets), return_inverse=True)
+        order, missing, extra = self._rank_masks(unique_masks, top)
+        return order[inverse], missing[inverse], extra[inverse]
+
+    def _rank_masks(self, query_masks: np.ndarray, top: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        queries = query_masks[:, None]
+        masks = self.masks[None, :]
+        missing = _POPCOUNT[queries & ~masks]
+        extra = _POPCOUNT[masks & ~queries]
+        # Missing notes dominate, then extra notes, then index order; the key is unique per row.
+        keys = (missing * 16 + extra) * len(self.entries) + np.arange(len(self.entries))
+        if top is not None and top < keys.shape[1]:
+            order = np.argpartition(keys, top - 1, axis=1)[:, :top]
+            order = np.take_along_axis(order, np.argsort(np.take_along_axis(keys, order, axis=1), axis=1), axis=1)
+        else:
+            order = np.argsort(keys, axis=1)
+        return order, np.take_along_axis(missing, order, axis=1), np.take_along_axis(extra, order, axis=1)
+
+    def rank(self, notes, top: Optional[int] = 5) -> List[Tuple[int, str, int, int]]:
+        """
+        Rank scales for one note set, allowing partial matches.
+
+        Returns:
+            Up to top tuples (root pitch class, scale_type, missing, extra), best first.
+
+        Example:
+            >>> scale_index.rank([60, 63, 67, 70], top=1)
+            [(0, 'minor_pentatonic', 0, 1)]
+        """
+        order, missing, extra = self.rank_batch([list(notes)], top)
+        entries = self.entries
+        return [entries[i] + (m, e) for i, m, e in zip(order[0].tolist(), missing[0].tolist(), extra[0].tolist())]
+
+
+scale_index = ScaleIndex()
+
+
+def find_scales_batch(note_sets: NoteSets) -> List[Tuple[Tuple[int, str], ...]]:
+    """Find the scales containing many note sets; see ScaleIndex.find_batch."""
+    return scale_index.find_batch(note_sets)
@@ -0,0 +1,156 @@
+"""
+Scale table module for precomputed scale lookups.
+
+Turns the step patterns in constants.scales into NumPy arrays of cumulative
+semitone offsets, compiled once per scale type on first use (and again only
+if the scale type is redefined through the registry). Scale, degree and
+diatonic-chord queries then become array slices and gathers, and every query
+broadcasts over arrays of roots and degrees, so thousands of scales or chords
+can be built in one call.
+
+All roots are MIDI numbers (ints or integer arrays). Degrees are 1-based and
+may run past the top of the scale (8 = root an octave up) or below it
+(0 = the degree just under the root).
+"""
+
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.registry import registry
+
+ArrayLike = Union[int, np.ndarray]
+
+
+class ScaleTable:
+    """
+    Precomputed cumulative offsets for every scale type in constants.scales.
+
+    Attributes:
+        octaves (int): Number of octaves kept in each precomputed ladder.
+                       Longer queries fall back to arithmetic on the base offsets.
+
+    Example:
+        >>> table = ScaleTable()
+        >>> table.scale(60, "major").tolist()
+        [60, 62, 64, 65, 67, 69, 71]
+        >>> table.build_scales(np.array([60, 62]), "minor_pentatonic").tolist()
+        [[60, 63, 65, 67, 70], [62, 65, 67, 69, 72]]
+    """
+
+    def __init__(self, octaves: int = 11):
+        self.octaves = octaves
+        self._compiled: Dict[str, Tuple[np.ndarray, int, np.ndarray]] = {}
+        self._version = registry.version("scales")
+
+    def _sync(self) -> None:
+        """Forget compiled scale types that were redefined in the registry."""
+        changes = registry.changes_since("scales", self._version)
+        for scale_type in changes.replaced:
+            self._compiled.pop(scale_type, None)
+        self._version = changes.snapshot.version
+
+    def _compile(self, scale_type: str) -> Tuple[np.ndarray, int, np.ndarray]:
+        """Return (base offsets, period, ladder) for a scale type, compiling it on first use."""
+        if self._version != registry.version("scales"):
+            self._sync()
+        compiled = self._compiled.get(scale_type)
+        if compiled is None:
+            definitions = registry.snapshot("scales").definitions
+            if scale_type not in definitions:
+                raise ValueError(f"not supported scale {scale_type}")
+            steps = np.asarray(definitions[scale_type], dtype=np.int64)
+            base = np.concatenate(([0], np.cumsum(steps)[:-1]))
+            period = int(steps.sum())
+            ladder = (base[None, :] + period * np.arange(self.octaves)[:, None]).ravel()
+            for array in (base, ladder):
+                array.flags.writeable = False
+            compiled = self._compiled[scale_type] = (base, period, ladder)
+        return compiled
+
+    def scale_length(self, scale_type: str) -> int:
+        """Number of notes per octave in the scale."""
+        return len(self._compile(scale_type)[0])
+
+    def offsets(self, scale_type: str, indices: ArrayLike) -> np.ndarray:
+        """
+        Semitone offsets from the root for 0-based scale indices.
+
+        Indices may be negative or exceed the scale length; they wrap into
+        lower or higher octaves.
+        """
+        base, period, _ = self._compile(scale_type)
+        indices = np.asarray(indices, dtype=np.int64)
+        octave, position = np.divmod(indices, len(base))
+        return base[position] + period * octave
+
+    def scale(self, root: ArrayLike, scale_type: str, octaves: int = 1) -> np.ndarray:
+        """
+        Build a scale from a root over a number of octaves.
+
+        Args:
+            root: Root MIDI number, or an array of roots.
+            scale_type: A key of constants.scales.
+            octaves: Number of octaves to span (default 1).
+
+        Returns:
+            An array of shape root.shape + (octaves * scale_length,).
+        """
+        base, _, ladder = self._compile(scale_type)
+        length = len(base) * octaves
+        steps = ladder[:length] if octaves <= self.octaves else self.offsets(scale_type, np.arange(length))
+        return np.asarray(root, dtype=np.int64)[..., None] + steps
+
+    def degree(self, root: ArrayLike, scale_type: str, degree: ArrayLike) -> np.ndarray:
+        """
+        Get 1-based scale degrees above a root; root and degree broadcast together.
+
+        Example:
+            >>> ScaleTable().degree(60, "major", 5)
+            array(67)
+        """
+        return np.asarray(root, dtype=np.int64) + self.offsets(scale_type, np.asarray(degree) - 1)
+
+    def diatonic_chord(self, root: ArrayLike, scale_type: str, degree: ArrayLike, num_notes: int) -> np.ndarray:
+        """
+        Stack thirds within the scale from a 1-based degree.
+
+        Args:
+            root: Root MIDI number of the scale, or an array of roots.
+            scale_type: A key of constants.scales.
+            degree: The degree to build on, or an array of degrees.
+            num_notes: Notes per chord (3 = triad, 4 = seventh, ...).
+
+        Returns:
+            An array of shape broadcast(root, degree).shape + (num_notes,).
+
+        Example:
+            >>> ScaleTable().diatonic_chord(60, "major", 2, 4).tolist()
+            [62, 65, 69, 72]
+        """
+        indices = np.asarray(degree, dtype=np.int64)[..., None] - 1 + 2 * np.arange(num_notes)
+        return np.asarray(root, dtype=np.int64)[..., None] + self.offsets(scale_type, indices)
+
+    def pitch_class_table(self, scale_type: str) -> np.ndarray:
+        """Pitch classes of the scale on all 12 roots, shape (12, scale_length)."""
+        return self.scale(np.arange(12), scale_type) % 12
+
+    def build_scales(self, roots: np.ndarray, scale_type: str, octaves: int = 1) -> np.ndarray:
+        """Build one scale per root; returns shape (len(roots), octaves * scale_length)."""
+        return self.scale(np.asarray(roots, dtype=np.int64).ravel(), scale_type, octaves)
+
+    def build_diatonic_chords(self, roots: ArrayLike, scale_type: str, degrees: ArrayLike, num_notes: int) -> np.ndarray:
+        """
+        Build many diatonic chords at once.
+
+        Roots and degrees broadcast against each other, e.g. roots[:, None] with
+        degrees[None, :] gives every degree in every key.
+
+        Example:
+            >>> ScaleTable().build_diatonic_chords([60, 67], "major", [1, 5], 3).tolist()
+            [[60, 64, 67], [74, 78, 81]]
+        """
+        return self.diatonic_chord(roots, scale_type, degrees, num_notes)
+
+
+scale_table = ScaleTable()
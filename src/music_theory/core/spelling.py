@@ -0,0 +1,188 @@
+"""
+Spelling module for key-aware note naming.
+
+This module chooses enharmonic spellings for MIDI notes under a key signature
+(e.g. Bb rather than As in F major) and precomputes a name table for all 128
+MIDI numbers per key, so whole note arrays can be formatted with one NumPy
+gather instead of one f-string per note.
+
+Keys are given as:
+    - None: the library's default sharp names ("C4", "Cs4", ...)
+    - a (tonic, scale_type) tuple, e.g. ("F", "major") or (65, "major")
+    - a string "Tonic scale_type", e.g. "Bb minor", "D dorian", or just "F"
+
+Seven-note scales are spelled with one letter per degree. Other scales
+(pentatonic, blues) borrow the spelling of their parallel major or minor key,
+and notes outside the scale follow the key's sharp/flat preference.
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.music_theory.core.constants import notes, scales, min_note, max_note
+
+_LETTERS = "CDEFGAB"
+_LETTER_PITCH_CLASSES = [0, 2, 4, 5, 7, 9, 11]
+_ACCIDENTALS = {"": 0, "s": 1, "#": 1, "b": -1}
+
+# Tonic spelling used when a key is given by pitch class only.
+_MAJOR_TONICS = ["C", "Db", "D", "Eb", "E", "F", "Fs", "G", "Ab", "A", "Bb", "B"]
+_MINOR_TONICS = ["C", "Cs", "D", "Eb", "E", "F", "Fs", "G", "Gs", "A", "Bb", "B"]
+
+Key = Union[None, str, Tuple[Union[int, str], str]]
+
+
+def _parse_tonic(tonic: Union[int, str], scale_type: str) -> Tuple[int, int]:
+    """Return (letter index, accidental offset) for a tonic given as a name or MIDI number."""
+    if not isinstance(tonic, str):
+        minor_like = 3 in _scale_pitch_classes(scale_type) and 4 not in _scale_pitch_classes(scale_type)
+        tonic = (_MINOR_TONICS if minor_like else _MAJOR_TONICS)[tonic % 12]
+    name = tonic.rstrip("-0123456789")
+    letter = name[:1].upper()
+    accidental = name[1:].lower()
+    if letter not in _LETTERS or accidental not in _ACCIDENTALS:
+        raise ValueError(f"Invalid tonic '{tonic}'. Tonics must be A-G with an optional 's', '#' or 'b' suffix.")
+    return _LETTERS.index(letter), _ACCIDENTALS[accidental]
+
+
+def _scale_pitch_classes(scale_type: str) -> List[int]:
+    if scale_type not in scales:
+        raise ValueError(f"not supported scale {scale_type}")
+    steps = scales[scale_type]
+    return [sum(steps[:i]) % 12 for i in range(len(steps))]
+
+
+def parse_key(key: Key) -> Optional[Tuple[int, int, str]]:
+    """
+    Normalize a key specification.
+
+    Args:
+        key: None, a (tonic, scale_type) tuple, or a "Tonic scale_type" string.
+             The scale type defaults to "major".
+
+    Returns:
+        None for the default spelling, otherwise a tuple
+        (tonic letter index, tonic accidental offset, scale_type).
+
+    Raises:
+        ValueError: If the tonic or scale type is not recognized.
+
+    Example:
+        >>> parse_key("Bb minor")
+        (6, -1, 'minor')
+    """
+    if key is None:
+        return None
+    if isinstance(key, str):
+        parts = key.split()
+        if len(parts) not in (1, 2):
+            raise ValueError(f"Invalid key '{key}'. Keys look like 'F major' or 'Bb minor'.")
+        tonic, scale_type = parts[0], (parts[1] if len(parts) == 2 else "major")
+    else:
+        tonic, scale_type = key
+    _scale_pitch_classes(scale_type)
+    letter, accidental = _parse_tonic(tonic, scale_type)
+    return letter, accidental, scale_type
+
+
+def _heptatonic_spelling(letter: int, accidental: int, pitch_classes: List[int]) -> List[Tuple[int, int]]:
+    """Spell a seven-note scale with one letter per degree."""
+    tonic_pc = (_LETTER_PITCH_CLASSES[letter] + accidental) % 12
+    spelled = []
+    for degree, offset in enumerate(pitch_classes):
+        degree_letter = (letter + degree) % 7
+        difference = (tonic_pc + offset - _LETTER_PITCH_CLASSES[degree_letter]) % 12
+        spelled.append((degree_letter, difference - 12 if difference > 6 else difference))
+    return spelled
+
+
+@lru_cache(maxsize=None)
+def _pitch_class_spellings(letter: int, accidental: int, scale_type: str) -> Tuple[Tuple[int, int], ...]:
+    """Return (letter index, accidental offset) for each of the 12 pitch classes under a key."""
+    pitch_classes = _scale_pitch_classes(scale_type)
+    if len(pitch_classes) != 7:
+        minor_like = 3 in pitch_classes and 4 not in pitch_classes
+        pitch_classes = _scale_pitch_classes("minor" if minor_like else "major")
+    spelled = _heptatonic_spelling(letter, accidental, pitch_classes)
+    tonic_pc = (_LETTER_PITCH_CLASSES[letter] + accidental) % 12
+
+    prefer_flats = sum(acc for _, acc in spelled) < 0
+    result = {}
+    for offset, spelling in zip(pitch_classes, spelled):
+        result[(tonic_pc + offset) % 12] = spelling
+    for pc in range(12):
+        if pc in result:
+            continue
+        if pc in _LETTER_PITCH_CLASSES:
+            result[pc] = (_LETTER_PITCH_CLASSES.index(pc), 0)
+        elif prefer_flats:
+            result[pc] = (_LETTER_PITCH_CLASSES.index(pc + 1), -1)
+        else:
+            result[pc] = (_LETTER_PITCH_CLASSES.index(pc - 1), 1)
+    return tuple(result[pc] for pc in range(12))
+
+
+@lru_cache(maxsize=None)
+def _spelling_table(parsed_key: Optional[Tuple[int, int, str]], sharp: str, flat: str) -> np.ndarray:
+    if parsed_key is None:
+        names = [f"{notes[n % 12].replace('s', sharp)}{n // 12 - 1}" for n in range(128)]
+    else:
+        spellings = _pitch_class_spellings(*parsed_key)
+        names = []
+        for n in range(128):
+            letter, accidental = spellings[n % 12]
+            octave = (n - accidental - _LETTER_PITCH_CLASSES[letter]) // 12 - 1
+            symbol = sharp if accidental > 0 else flat
+            names.append(f"{_LETTERS[letter]}{symbol * abs(accidental)}{octave}")
+    table = np.array(names)
+    table.flags.writeable = False
+    return table
+
+
+def note_spelling_table(key: Key = None, sharp: str = "s", flat: str = "b") -> np.ndarray:
+    """
+    Get the precomputed names of all 128 MIDI numbers under a key.
+
+    Args:
+        key: The key to spell in (see module docstring). None gives the default
+             sharp names used by midi_to_note_string.
+        sharp: Suffix used for sharps (default 's', e.g. "Cs4"; use '#' for "C#4").
+        flat: Suffix used for flats (default 'b').
+
+    Returns:
+        A read-only array of 128 note strings indexed by MIDI number.
+
+    Example:
+        >>> note_spelling_table("F major")[70]
+        'Bb4'
+    """
+    return _spelling_table(parse_key(key), sharp, flat)
+
+
+def midi_to_note_strings(nums: Union[Sequence[int], np.ndarray], key: Key = None,
+                         sharp: str = "s", flat: str = "b") -> np.ndarray:
+    """
+    Convert an array of MIDI numbers to note strings in one vectorized call.
+
+    Args:
+        nums: MIDI note numbers (any shape), each within min_note to max_note.
+        key: The key to spell in (see module docstring). Default is sharp names.
+        sharp: Suffix used for sharps (default 's').
+        flat: Suffix used for flats (default 'b').
+
+    Returns:
+        An array of note strings with the same shape as nums.
+
+    Raises:
+        ValueError: If any number is outside the valid range.
+
+    Example:
+        >>> midi_to_note_strings([65, 67, 69, 70], key="F major").tolist()
+        ['F4', 'G4', 'A4', 'Bb4']
+    """
+    nums = np.asarray(nums, dtype=np.int64)
+    if nums.size and (nums.min() < min_note or nums.max() > max_note):
+        raise ValueError(f"MIDI numbers have to be in range {min_note}-{max_note}")
+    return note_spelling_table(key, sharp, flat)[nums]
@@ -0,0 +1,510 @@
+"""
+Voice leading module for distance kernels, voice assignment and voicing whole
+chord progressions.
+
+The distance kernels compare a matrix of candidate voicings with one or more
+reference chords in a single broadcast: taxicab movement, mean-pitch distance
+and common-tone count for every (candidate, reference) pair. Chords are rows
+of a 2-D integer array padded with negative entries, or sequences of notes.
+
+Voice assignment finds which voice moves where when chords differ in size:
+the cheapest set of moves in which every voice of both chords takes part, so
+voices can split, merge and double instead of only sliding the smaller chord
+over the larger one.
+
+Greedy smoothing voices each chord from the previous one only, so long
+progressions can drift out of register and a cheap move now can force an
+expensive one later. Here every chord gets a set of candidate voicings within
+a register range, and dynamic programming (Viterbi) picks the sequence with
+the least total cost:
+
+    taxicab movement between consecutive voicings
+    + drift_weight * |mean pitch - center| for every voicing
+
+Candidates and transition matrices depend only on the chords' pitch-class
+content, so they are computed once per distinct chord (pair) and the work per
+chord is one vectorized (candidates x candidates) step. Run time is linear in
+progression length.
+"""
+
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.music_theory.core.chord_index import NoteSets, pitch_class_masks
+from src.music_theory.core.pitch_class_set import _POPCOUNT
+from src.music_theory.core.voicing import iter_chord_voicings
+
+Register = Tuple[int, int]
+
+
+class VoiceLeadingDistances(NamedTuple):
+    """Distance matrices of shape (len(candidates), len(references))."""
+    taxicab: np.ndarray
+    mean: np.ndarray
+    common_tones: np.ndarray
+
+
+def _padded(chords: NoteSets) -> np.ndarray:
+    """Chords as a 2-D int64 array with negative padding."""
+    if isinstance(chords, np.ndarray) and chords.ndim == 2:
+        return chords.astype(np.int64, copy=False)
+    width = max((len(chord) for chord in chords), default=0)
+    padded = np.full((len(chords), width), -1, dtype=np.int64)
+    for row, chord in enumerate(chords):
+        padded[row, :len(chord)] = list(chord)
+    return padded
+
+
+def _sorted_by_length(chords: NoteSets) -> Tuple[np.ndarray, np.ndarray]:
+    """Each row sorted ascending with the padding moved to the end, and the row lengths."""
+    padded = _padded(chords)
+    valid = padded >= 0
+    values = np.sort(np.where(valid, padded, np.iinfo(np.int64).max), axis=1)
+    return values, valid.sum(axis=1)
+
+
+def _sliding_taxicab(voicings_1: np.ndarray, voicings_2: np.ndarray) -> np.ndarray:
+    """Taxicab distances between sorted voicings of two fixed sizes, sliding the smaller over the larger."""
+    if voicings_1.shape[1] > voicings_2.shape[1]:
+        return _sliding_taxicab(voicings_2, voicings_1).T
+    size = voicings_1.shape[1]
+    costs = None
+    for offset in range(voicings_2.shape[1] - size + 1):
+        window = voicings_2[None, :, offset:offset + size]
+        distance = np.abs(voicings_1[:, None, :] - window).sum(axis=2)
+        costs = distance if costs is None else np.minimum(costs, distance)
+    return costs
+
+
+def taxicab_distance_matrix(candidates: NoteSets, references: NoteSets) -> np.ndarray:
+    """
+    Taxicab distance between every candidate voicing and every reference chord.
+
+    Matches calculate_taxicab_distance_between_notes pair by pair: both chords
+    are sorted and, when their sizes differ, the smaller one is aligned with
+    the best contiguous window of the larger one. Rows are grouped by size so
+    each group pair is a single broadcast.
+
+    Args:
+        candidates: A 2-D integer array with one voicing per row (negative
+                    entries are padding), or a sequence of note lists.
+        references: Reference chords in the same format.
+
+    Returns:
+        An int64 array of shape (len(candidates), len(references)).
+
+    Example:
+        >>> taxicab_distance_matrix([[60, 65, 69], [65, 69, 72]], [[60, 64, 67]]).tolist()
+        [[3], [15]]
+    """
+    values_1, lengths_1 = _sorted_by_length(candidates)
+    values_2, lengths_2 = _sorted_by_length(references)
+    result = np.zeros((len(values_1), len(values_2)), dtype=np.int64)
+    for size_1 in np.unique(lengths_1).tolist():
+        rows = np.flatnonzero(lengths_1 == size_1)
+        for size_2 in np.unique(lengths_2).tolist():
+            if size_1 == 0 or size_2 == 0:
+                continue
+            columns = np.flatnonzero(lengths_2 == size_2)
+            result[np.ix_(rows, columns)] = _sliding_taxicab(values_1[rows, :size_1], values_2[columns, :size_2])
+    return result
+
+
+def mean_distance_matrix(candidates: NoteSets, references: NoteSets) -> np.ndarray:
+    """
+    Absolute difference of mean pitch between every candidate and reference.
+
+    Args:
+        candidates: A 2-D integer array with one voicing per row (negative
+                    entries are padding), or a sequence of note lists.
+        references: Reference chords in the same format.
+
+    Returns:
+        A float array of shape (len(candidates), len(references)).
+    """
+    def means(chords):
+        padded = _padded(chords)
+        valid = padded >= 0
+        return np.where(valid, padded, 0).sum(axis=1) / valid.sum(axis=1)
+
+    return np.abs(means(candidates)[:, None] - means(references)[None, :])
+
+
+def common_tone_matrix(candidates: NoteSets, references: NoteSets) -> np.ndarray:
+    """
+    Number of shared pitch classes between every candidate and reference.
+
+    Args:
+        candidates: A 2-D integer array with one voicing per row (negative
+                    entries are padding), or a sequence of note lists.
+        references: Reference chords in the same format.
+
+    Returns:
+        An int64 array of shape (len(candidates), len(references)).
+    """
+    return _POPCOUNT[pitch_class_masks(_padded(candidates))[:, None] & pitch_class_masks(_padded(references))[None, :]]
+
+
+def voice_leading_distances(candidates: NoteSets, references: NoteSets) -> VoiceLeadingDistances:
+    """
+    All distance matrices between candidate voicings and reference chords.
+
+    Args:
+        candidates: A 2-D integer array with one voicing per row (negative
+                    entries are padding), or a sequence of note lists.
+        references: Reference chords in the same format.
+
+    Returns:
+        VoiceLeadingDistances with taxicab, mean and common_tones matrices.
+    """
+    candidates, references = _padded(candidates), _padded(references)
+    return VoiceLeadingDistances(taxicab_distance_matrix(candidates, references),
+                                 mean_distance_matrix(candidates, references),
+                                 common_tone_matrix(candidates, references))
+
+
+class VoiceAssignment(NamedTuple):
+    """A voice-leading cost and the moves (source pitch, target pitch) that achieve it."""
+    cost: int
+    moves: List[Tuple[int, int]]
+
+
+def _pitch_class_distance(note_1: int, note_2: int) -> int:
+    interval = (note_1 - note_2) % 12
+    return min(interval, 12 - interval)
+
+
+def _monotone_assignment(chord_1: List[int], chord_2: List[int]) -> VoiceAssignment:
+    """Cheapest non-crossing edge cover of two sorted chords (dynamic time warping)."""
+    rows, columns = len(chord_1), len(chord_2)
+    inf = float("inf")
+    table = [[inf] * (columns + 1) for _ in range(rows + 1)]
+    table[0][0] = 0
+    for i in range(1, rows + 1):
+        for j in range(1, columns + 1):
+            table[i][j] = abs(chord_1[i - 1] - chord_2[j - 1]) + min(
+                table[i - 1][j - 1], table[i - 1][j], table[i][j - 1])
+    moves = []
+    i, j = rows, columns
+    while i > 0 and j > 0:
+        moves.append((chord_1[i - 1], chord_2[j - 1]))
+        step = min((table[i - 1][j - 1], 0), (table[i - 1][j], 1), (table[i][j - 1], 2))[1]
+        i, j = (i - 1, j - 1) if step == 0 else (i - 1, j) if step == 1 else (i, j - 1)
+    moves.reverse()
+    return VoiceAssignment(int(table[rows][columns]), moves)
+
+
+def _min_cost_assignment(costs: List[List[float]]) -> List[int]:
+    """Hungarian algorithm for a rows <= columns matrix; returns the column of each row."""
+    rows, columns = len(costs), len(costs[0])
+    inf = float("inf")
+    u, v = [0.0] * (rows + 1), [0.0] * (columns + 1)
+    owner, way = [0] * (columns + 1), [0] * (columns + 1)
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        slack, used = [inf] * (columns + 1), [False] * (columns + 1)
+        while owner[column]:
+            used[column] = True
+            current, delta, next_column = owner[column], inf, 0
+            for j in range(1, columns + 1):
+                if not used[j]:
+                    reduced = costs[current - 1][j - 1] - u[current] - v[j]
+                    if reduced < slack[j]:
+                        slack[j], way[j] = reduced, column
+                    if slack[j] < delta:
+                        delta, next_column = slack[j], j
+            for j in range(columns + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    slack[j] -= delta
+            column = next_column
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+    assignment = [0] * rows
+    for j in range(1, columns + 1):
+        if owner[j]:
+            assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
+def _edge_cover_assignment(chord_1: List[int], chord_2: List[int], distance) -> VoiceAssignment:
+    """
+    Cheapest edge cover for any voice distance (voices may cross).
+
+    The cover is the cheapest edge at every voice, improved by a min-cost
+    matching on the savings of joining two voices with one shared edge.
+    """
+    costs = [[distance(note_1, note_2) for note_2 in chord_2] for note_1 in chord_1]
+    cheapest_1 = [min(row) for row in costs]
+    cheapest_2 = [min(column) for column in zip(*costs)]
+    savings = [[min(0, costs[i][j] - cheapest_1[i] - cheapest_2[j]) for j in range(len(chord_2))]
+               for i in range(len(chord_1))]
+    transposed = len(chord_1) > len(chord_2)
+    matrix = [list(column) for column in zip(*savings)] if transposed else savings
+    pairs = [(row, column) for row, column in enumerate(_min_cost_assignment(matrix)) if matrix[row][column] < 0]
+    edges = {(column, row) if transposed else (row, column) for row, column in pairs}
+    covered_1, covered_2 = {i for i, _ in edges}, {j for _, j in edges}
+    for i, row in enumerate(costs):
+        if i not in covered_1:
+            edges.add((i, row.index(cheapest_1[i])))
+    for j in range(len(chord_2)):
+        if j not in covered_2:
+            edges.add(([costs[i][j] for i in range(len(chord_1))].index(cheapest_2[j]), j))
+    edges = sorted(edges)
+    return VoiceAssignment(sum(costs[i][j] for i, j in edges), [(chord_1[i], chord_2[j]) for i, j in edges])
+
+
+def voice_assignment(chord_1: Sequence[int], chord_2: Sequence[int], pitch_class: bool = False) -> VoiceAssignment:
+    """
+    Find the cheapest way to move the voices of one chord to another.
+
+    Every voice of chord_1 moves to at least one voice of chord_2 and every
+    voice of chord_2 is reached from at least one voice of chord_1, so voices
+    may split (doubling), merge, or, for pitch-class distances, cross. The
+    cost is the total movement over all moves (a minimum-cost edge cover).
+
+    With pitch distances the optimal cover never crosses, so it is found by
+    dynamic programming over the sorted voices in O(len(chord_1) * len(chord_2)).
+    Pitch-class distances (shortest way around the octave) use a min-cost
+    bipartite matching.
+
+    Args:
+        chord_1: The chord the voices leave, as MIDI notes.
+        chord_2: The chord the voices arrive at, as MIDI notes.
+        pitch_class: If True, measure each move by pitch-class distance (0-6)
+                     instead of semitones.
+
+    Returns:
+        VoiceAssignment with the total cost and the (source, target) moves.
+
+    Raises:
+        ValueError: If either chord is empty.
+
+    Example:
+        >>> voice_assignment([60, 64, 67], [59, 62, 65, 67])
+        VoiceAssignment(cost=4, moves=[(60, 59), (60, 62), (64, 65), (67, 67)])
+    """
+    if not chord_1 or not chord_2:
+        raise ValueError("Both chord_1 and chord_2 must be non-empty")
+    chord_1, chord_2 = sorted(chord_1), sorted(chord_2)
+    if pitch_class:
+        return _edge_cover_assignment(chord_1, chord_2, _pitch_class_distance)
+    return _monotone_assignment(chord_1, chord_2)
+
+
+def voice_assignment_distances(chords_1: NoteSets, chords_2: NoteSets, pitch_class: bool = False) -> np.ndarray:
+    """
+    Voice assignment costs for many chord pairs (chords_1[i] to chords_2[i]).
+
+    Pairs with the same chord sizes are solved together: the dynamic program
+    runs once per size pair, vectorized over every pair of that shape.
+
+    Args:
+        chords_1: A 2-D integer array with one chord per row (negative
+                  entries are padding), or a sequence of note lists.
+        chords_2: The target chords in the same format, one per chord in chords_1.
+        pitch_class: If True, use pitch-class distances (see voice_assignment).
+
+    Returns:
+        An int64 array with one cost per pair.
+
+    Raises:
+        ValueError: If the inputs differ in length or contain empty chords.
+    """
+    values_1, lengths_1 = _sorted_by_length(chords_1)
+    values_2, lengths_2 = _sorted_by_length(chords_2)
+    if len(values_1) != len(values_2):
+        raise ValueError("chords_1 and chords_2 must contain the same number of chords")
+    if (lengths_1 == 0).any() or (lengths_2 == 0).any():
+        raise ValueError("Every chord must be non-empty")
+    result = np.zeros(len(values_1), dtype=np.int64)
+    shapes = lengths_1 * (values_2.shape[1] + 1) + lengths_2
+    for shape in np.unique(shapes).tolist():
+        pairs = np.flatnonzero(shapes == shape)
+        rows, columns = divmod(shape, values_2.shape[1] + 1)
+        chords_a, chords_b = values_1[pairs, :rows], values_2[pairs, :columns]
+        if pitch_class:
+            result[pairs] = [voice_assignment(a, b, pitch_class=True).cost
+                             for a, b in zip(chords_a.tolist(), chords_b.tolist())]
+            continue
+        result[pairs] = _monotone_costs(chords_a, chords_b)
+    return result
+
+
+def voice_assignment_matrix(candidates: NoteSets, references: NoteSets) -> np.ndarray:
+    """
+    Voice assignment cost between every candidate and every reference chord.
+
+    The all-pairs counterpart of voice_assignment_distances (pitch distances):
+    rows are grouped by chord size and each size pair is one broadcast
+    dynamic program.
+
+    Args:
+        candidates: A 2-D integer array with one chord per row (negative
+                    entries are padding), or a sequence of note lists.
+        references: Reference chords in the same format.
+
+    Returns:
+        An int64 array of shape (len(candidates), len(references)).
+
+    Raises:
+        ValueError: If a chord is empty.
+    """
+    values_1, lengths_1 = _sorted_by_length(candidates)
+    values_2, lengths_2 = _sorted_by_length(references)
+    if (lengths_1 == 0).any() or (lengths_2 == 0).any():
+        raise ValueError("Every chord must be non-empty")
+    result = np.zeros((len(values_1), len(values_2)), dtype=np.int64)
+    for size_1 in np.unique(lengths_1).tolist():
+        rows = np.flatnonzero(lengths_1 == size_1)
+        for size_2 in np.unique(lengths_2).tolist():
+            columns = np.flatnonzero(lengths_2 == size_2)
+            result[np.ix_(rows, columns)] = _monotone_costs(values_1[rows, None, :size_1],
+                                                            values_2[None, columns, :size_2])
+    return result
+
+
+def _monotone_costs(chords_1: np.ndarray, chords_2: np.ndarray) -> np.ndarray:
+    """
+    Non-crossing edge cover costs between sorted chords, broadcast over leading axes.
+
+    The dynamic program keeps one row of the table at a time.
+    """
+    shape = np.broadcast_shapes(chords_1.shape[:-1], chords_2.shape[:-1])
+    columns = chords_2.shape[-1]
+    unreachable = np.iinfo(np.int64).max // 2
+    previous = np.full(shape + (columns + 1,), unreachable, dtype=np.int64)
+    previous[..., 0] = 0
+    for i in range(chords_1.shape[-1]):
+        moves = np.abs(chords_1[..., i, None] - chords_2)
+        current = np.full_like(previous, unreachable)
+        for j in range(1, columns + 1):
+            current[..., j] = moves[..., j - 1] + np.minimum(
+                np.minimum(previous[..., j - 1], previous[..., j]), current[..., j - 1])
+        previous = current
+    return previous[..., columns]
+
+
+def _chord_key(chord: Sequence[int]) -> Tuple[int, ...]:
+    """Pitch classes with multiplicity; voicings of chords with equal keys are interchangeable."""
+    return tuple(sorted(note % 12 for note in chord))
+
+
+def _unique(voicings):
+    seen = set()
+    for voicing in voicings:
+        if voicing not in seen:
+            seen.add(voicing)
+            yield voicing
+
+
+def _candidate_voicings(key: Tuple[int, ...], register: Register, max_gap: Optional[int],
+                        max_candidates: int) -> np.ndarray:
+    """Up to max_candidates distinct voicings of key inside register, most even spacing first."""
+    low, high = register
+    base = [low + (pc - low) % 12 for pc in key]
+    voicings = iter_chord_voicings(base, (high - low) // 12 + 1, low=low, high=high, max_gap=max_gap)
+    # Doubled pitch classes yield each voicing more than once and allow unisons; keep distinct voicings
+    # without unisons.
+    distinct = _unique(tuple(v) for v in voicings if len(set(v)) == len(v))
+    candidates = list(islice(distinct, max_candidates))
+    return np.array(candidates, dtype=np.int64).reshape(len(candidates), len(key))
+
+
+def optimal_voice_leading(progression: Sequence[Sequence[int]], register: Register = (48, 84),
+                          center: Optional[float] = None, drift_weight: float = 0.25,
+                          max_gap: Optional[int] = None, max_candidates: int = 64,
+                          keep_first: bool = True) -> List[List[int]]:
+    """
+    Voice a whole progression with the least total voice movement.
+
+    Each chord keeps its pitch classes (and doublings) but may be revoiced
+    anywhere inside register. The chosen voicings minimize the sum of taxicab
+    distances between consecutive chords plus a drift penalty that pulls each
+    chord's mean pitch towards center.
+
+    Args:
+        progression: Chords as lists of MIDI notes (or Chord objects).
+        register: Lowest and highest allowed pitch (inclusive).
+        center: Mean pitch the progression should stay around. Defaults to
+                the mean of the first chord if keep_first, else the middle
+                of register.
+        drift_weight: Cost per semitone the mean pitch of a voicing lies
+                      from center; 0 disables the penalty.
+        max_gap: Largest allowed interval between adjacent voices, or None.
+        max_candidates: Voicings considered per chord (the most evenly
+                        spaced ones).
+        keep_first: If True, the first chord keeps its voicing as given.
+
+    Returns:
+        One sorted voicing per chord (a Chord where the input was a Chord).
+
+    Raises:
+        ValueError: If a chord is empty or has no voicing inside register.
+
+    Example:
+        >>> optimal_voice_leading([[60, 64, 67], [65, 69, 72], [67, 71, 74], [60, 64, 67]])
+        [[60, 64, 67], [60, 65, 69], [59, 62, 67], [60, 64, 67]]
+    """
+    if not progression:
+        return []
+    if any(len(chord) == 0 for chord in progression):
+        raise ValueError("Every chord in the progression must be non-empty")
+    low, high = register
+    if center is None:
+        center = sum(progression[0]) / len(progression[0]) if keep_first else (low + high) / 2
+
+    candidates: Dict[Tuple[int, ...], np.ndarray] = {}
+    penalties: Dict[Tuple[int, ...], np.ndarray] = {}
+    transitions: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], np.ndarray] = {}
+
+    def voicings_of(key):
+        if key not in candidates:
+            voicings = _candidate_voicings(key, register, max_gap, max_candidates)
+            if len(voicings) == 0:
+                raise ValueError(f"No voicing of pitch classes {list(key)} fits register {register}")
+            candidates[key] = voicings
+            penalties[key] = drift_weight * np.abs(voicings.mean(axis=1) - center)
+        return candidates[key]
+
+    keys = [_chord_key(chord) for chord in progression]
+    if keep_first:
+        first = np.array([sorted(progression[0])], dtype=np.int64)
+        keys[0] = ("first",)
+        candidates[keys[0]] = first
+        penalties[keys[0]] = np.zeros(1)
+    else:
+        voicings_of(keys[0])
+
+    cost = penalties[keys[0]]
+    backpointers = []
+    for previous, key in zip(keys, keys[1:]):
+        voicings = voicings_of(key)
+        pair = (previous, key)
+        if pair not in transitions:
+            transitions[pair] = taxicab_distance_matrix(candidates[previous], voicings)
+        total = cost[:, None] + transitions[pair]
+        best = total.argmin(axis=0)
+        backpointers.append(best)
+        cost = total[best, np.arange(len(best))] + penalties[key]
+
+    choice = int(cost.argmin())
+    chosen = [choice]
+    for best in reversed(backpointers):
+        choice = int(best[choice])
+        chosen.append(choice)
+    chosen.reverse()
+
+    result = []
+    for chord, key, index in zip(progression, keys, chosen):
+        voicing = candidates[key][index].tolist()
+        revoice = getattr(chord, "revoice", None)
+        result.append(revoice(voicing) if revoice is not None else voicing)
+    return result
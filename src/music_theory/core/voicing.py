@@ -0,0 +1,248 @@
+"""
+Voicing module for constraint-pruned, lazily ordered chord voicings.
+
+A voicing places every chord tone in one of several octaves. Instead of
+materializing all octaves ** len(chord) placements and sorting them, voicings
+are built from the bass upwards: register limits, maximum gaps, bass and voice
+order constraints prune partial voicings during the search, and a priority
+queue yields complete voicings in evenness order (the product of the gaps
+between adjacent voices, smallest first). Callers that only need the first few
+voicings, or one at a given percentile, never build the whole space.
+
+Voicings with equal evenness come out in the same order as
+itertools.product over the chord tones' octaves, so results match the
+brute-force enumeration exactly.
+
+A percentile query needs the size of the whole space anyway, so when that
+space is small (BRUTE_FORCE_LIMIT placements) chord_voicing_at enumerates it
+with a few NumPy operations instead of counting and walking the queue.
+"""
+
+import heapq
+import math
+from functools import lru_cache
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Largest octaves ** len(chord) that chord_voicing_at enumerates with NumPy.
+BRUTE_FORCE_LIMIT = 1 << 18
+
+
+class _VoicingSearch:
+    """Candidate pitches and constraint checks shared by the generator and the counter."""
+
+    def __init__(self, chord: Sequence[int], octaves: int, low: Optional[int], high: Optional[int],
+                 max_gap: Optional[int], bass_pitch_class: Optional[int], min_span: Optional[int],
+                 pitch_class_order: Optional[Sequence[int]]):
+        self.size = len(chord)
+        self.candidates = [
+            [(note + 12 * octave, octave) for octave in range(octaves)
+             if (low is None or note + 12 * octave >= low) and (high is None or note + 12 * octave <= high)]
+            for note in chord
+        ]
+        self.max_pitch = [max((p for p, _ in c), default=None) for c in self.candidates]
+        self.max_gap = max_gap
+        self.bass_pitch_class = None if bass_pitch_class is None else bass_pitch_class % 12
+        self.min_span = min_span
+        self.pitch_class_order = None if pitch_class_order is None else [pc % 12 for pc in pitch_class_order]
+        pitches = [p for c in self.candidates for p, _ in c]
+        # Equal pitches give a zero gap, which breaks the monotone bound below.
+        self.zero_gaps_possible = len(pitches) != len(set(pitches))
+        self.full_mask = (1 << self.size) - 1
+
+    @property
+    def feasible(self) -> bool:
+        return self.size > 0 and all(self.candidates) and (
+            self.pitch_class_order is None or len(self.pitch_class_order) == self.size)
+
+    def extensions(self, prefix_length: int, first: Optional[int], last: Optional[int], last_tone: int,
+                   remaining: int):
+        """Yield (tone, pitch, octave) for every admissible next voice above the prefix."""
+        for tone in range(self.size):
+            if not remaining & (1 << tone):
+                continue
+            for pitch, octave in self.candidates[tone]:
+                if last is not None and (pitch < last or (pitch == last and tone < last_tone)):
+                    continue
+                if self.max_gap is not None and last is not None and pitch - last > self.max_gap:
+                    continue
+                if prefix_length == 0 and self.bass_pitch_class is not None and pitch % 12 != self.bass_pitch_class:
+                    continue
+                if self.pitch_class_order is not None and pitch % 12 != self.pitch_class_order[prefix_length]:
+                    continue
+                rest = remaining & ~(1 << tone)
+                if not self._rest_placeable(rest, pitch, tone):
+                    continue
+                if self.min_span is not None:
+                    top = max([pitch] + [self.max_pitch[j] for j in range(self.size) if rest & (1 << j)])
+                    if top - (pitch if first is None else first) < self.min_span:
+                        continue
+                yield tone, pitch, octave
+
+    def _rest_placeable(self, rest: int, pitch: int, tone: int) -> bool:
+        for j in range(self.size):
+            if rest & (1 << j):
+                top = self.max_pitch[j]
+                if top < pitch or (top == pitch and j < tone):
+                    return False
+        return True
+
+
+def iter_chord_voicings(chord: Sequence[int], octaves: int, low: Optional[int] = None, high: Optional[int] = None,
+                        max_gap: Optional[int] = None, bass_pitch_class: Optional[int] = None,
+                        min_span: Optional[int] = None,
+                        pitch_class_order: Optional[Sequence[int]] = None) -> Iterator[List[int]]:
+    """
+    Lazily yield voicings of a chord in evenness order, pruning during search.
+
+    Each chord tone is placed at its pitch plus 0..octaves-1 octaves. Only
+    voicings satisfying every constraint are produced.
+
+    Args:
+        chord: A list of MIDI note numbers representing the chord.
+        octaves: Number of octaves each tone may be raised into.
+        low: Lowest allowed pitch (inclusive), or None.
+        high: Highest allowed pitch (inclusive), or None.
+        max_gap: Largest allowed interval between adjacent voices, or None.
+        bass_pitch_class: Required pitch class of the lowest voice, or None.
+        min_span: Smallest allowed distance between lowest and highest voice, or None.
+        pitch_class_order: Required pitch class of every voice from the bottom
+                           up (e.g. to keep an inversion), or None.
+
+    Yields:
+        Sorted voicings (lists of MIDI notes), most even spacing first.
+
+    Example:
+        >>> next(iter_chord_voicings([60, 64, 67], 2, bass_pitch_class=4))
+        [64, 67, 72]
+    """
+    search = _VoicingSearch(chord, octaves, low, high, max_gap, bass_pitch_class, min_span, pitch_class_order)
+    if not search.feasible:
+        return
+    counter = 0
+    # Heap entries: (bound, tie counter, prefix, remaining mask, last tone, octave assignment).
+    heap = [(1 if not search.zero_gaps_possible else 0, counter, (), search.full_mask, -1, (-1,) * search.size)]
+    batch, batch_priority = [], None
+    while heap:
+        priority, _, prefix, remaining, last_tone, assignment = heapq.heappop(heap)
+        if not remaining:
+            batch.append((assignment, list(prefix)))
+            batch_priority = priority
+        else:
+            first = prefix[0] if prefix else None
+            last = prefix[-1] if prefix else None
+            for tone, pitch, octave in search.extensions(len(prefix), first, last, last_tone, remaining):
+                child = prefix + (pitch,)
+                child_remaining = remaining & ~(1 << tone)
+                evenness = math.prod(child[i] - child[i - 1] for i in range(1, len(child)))
+                bound = evenness if (not child_remaining or not search.zero_gaps_possible) else 0
+                child_assignment = assignment[:tone] + (octave,) + assignment[tone + 1:]
+                counter += 1
+                heapq.heappush(heap, (bound, counter, child, child_remaining, tone, child_assignment))
+        # Everything with this evenness has been found once the queue moves past it.
+        if batch and (not heap or heap[0][0] > batch_priority):
+            batch.sort(key=lambda item: item[0])
+            for _, voicing in batch:
+                yield voicing
+            batch = []
+
+
+def top_chord_voicings(chord: Sequence[int], octaves: int, k: int, **constraints) -> List[List[int]]:
+    """
+    Get the k most evenly spaced voicings without enumerating the rest.
+
+    Args:
+        chord: A list of MIDI note numbers representing the chord.
+        octaves: Number of octaves each tone may be raised into.
+        k: Number of voicings to return.
+        **constraints: Any keyword constraint of iter_chord_voicings.
+
+    Returns:
+        Up to k voicings in evenness order.
+    """
+    return list(islice(iter_chord_voicings(chord, octaves, **constraints), k))
+
+
+def count_chord_voicings(chord: Sequence[int], octaves: int, low: Optional[int] = None, high: Optional[int] = None,
+                         max_gap: Optional[int] = None, bass_pitch_class: Optional[int] = None,
+                         min_span: Optional[int] = None, pitch_class_order: Optional[Sequence[int]] = None) -> int:
+    """
+    Count the voicings iter_chord_voicings would yield, without building them.
+
+    Partial voicings that share their first and last voice, remaining tones
+    and depth are counted once (memoized depth-first search).
+    """
+    search = _VoicingSearch(chord, octaves, low, high, max_gap, bass_pitch_class, min_span, pitch_class_order)
+    if not search.feasible:
+        return 0
+
+    @lru_cache(maxsize=None)
+    def count(prefix_length: int, first: Optional[int], last: Optional[int], last_tone: int, remaining: int) -> int:
+        if not remaining:
+            return 1
+        return sum(count(prefix_length + 1, pitch if first is None else first, pitch, tone, remaining & ~(1 << tone))
+                   for tone, pitch, _ in search.extensions(prefix_length, first, last, last_tone, remaining))
+
+    return count(0, None, None, -1, search.full_mask)
+
+
+def chord_voicing_at(chord: Sequence[int], octaves: int, fraction: float, **constraints) -> Optional[List[int]]:
+    """
+    Get the voicing at a percentile of the evenness order.
+
+    Equivalent to sorted_voicings[floor(fraction * len(sorted_voicings))], but
+    only the voicings up to that position are generated.
+
+    Args:
+        chord: A list of MIDI note numbers representing the chord.
+        octaves: Number of octaves each tone may be raised into.
+        fraction: A float in range [0, 1); 0 = most even voicing.
+        **constraints: Any keyword constraint of iter_chord_voicings.
+
+    Returns:
+        The selected voicing, or None if no voicing satisfies the constraints.
+
+    Raises:
+        ValueError: If fraction is out of range.
+    """
+    if fraction < 0 or fraction >= 1:
+        raise ValueError(f"fraction is {fraction} it has to be in range [0,1)")
+    if 0 < len(chord) and octaves ** len(chord) <= BRUTE_FORCE_LIMIT:
+        voicings = _enumerate_voicings(chord, octaves, **constraints)
+        return voicings[math.floor(fraction * len(voicings))].tolist() if len(voicings) else None
+    total = count_chord_voicings(chord, octaves, **constraints)
+    if total == 0:
+        return None
+    return next(islice(iter_chord_voicings(chord, octaves, **constraints), math.floor(fraction * total), None))
+
+
+def _enumerate_voicings(chord: Sequence[int], octaves: int, low: Optional[int] = None, high: Optional[int] = None,
+                        max_gap: Optional[int] = None, bass_pitch_class: Optional[int] = None,
+                        min_span: Optional[int] = None,
+                        pitch_class_order: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Every voicing iter_chord_voicings yields, in the same order, as rows of an array (vectorized brute force)."""
+    # Octave assignments in itertools.product order, one row each.
+    assignments = np.indices((octaves,) * len(chord)).reshape(len(chord), -1).T
+    pitches = np.asarray(chord, dtype=np.int64) + 12 * assignments
+    valid = np.ones(len(pitches), dtype=bool)
+    if low is not None:
+        valid &= (pitches >= low).all(axis=1)
+    if high is not None:
+        valid &= (pitches <= high).all(axis=1)
+    voicings = np.sort(pitches[valid], axis=1)
+    gaps = np.diff(voicings, axis=1)
+    valid = np.ones(len(voicings), dtype=bool)
+    if max_gap is not None:
+        valid &= (gaps <= max_gap).all(axis=1)
+    if bass_pitch_class is not None:
+        valid &= voicings[:, 0] % 12 == bass_pitch_class % 12
+    if min_span is not None:
+        valid &= voicings[:, -1] - voicings[:, 0] >= min_span
+    if pitch_class_order is not None:
+        if len(pitch_class_order) != len(chord):
+            return voicings[:0]
+        valid &= (voicings % 12 == np.asarray(pitch_class_order) % 12).all(axis=1)
+    voicings, gaps = voicings[valid], gaps[valid]
+    return voicings[np.argsort(np.prod(gaps, axis=1), kind="stable")]
@@ -6,9 +6,9 @@ velocity dynamics, string dropping, and strumming speed control.
 """
 
 import random
-from pathlib import Path
-from midiutil import MIDIFile
 from src.music_theory.guitar.guitar_chord import get_chord_from_tabs
+from src.music_theory.midi.smf import create_midi_file, write_midi_file
+from src.music_theory.midi.timeline import Timeline
 
 
 class GuitarChordPattern:
@@ -42,17 +42,6 @@ def calculate_string_delay(string_index: int, total_strings: int, tempo: int, ba
     return base_delay * ((normalized_position) ** power_factor) / base_strum_speed
 
 
-def calculate_note_time_in_pattern(pattern_progress: float, pattern_length: int, 
-                                   chord_duration: float, total_duration: float,
-                                   loop_index: int, chord_index: int, 
-                                   chord_durations: list) -> float:
-    """Calculate the absolute time for a note within the overall timing structure."""
-    loop_time = loop_index * total_duration
-    chord_start_time = sum(chord_durations[:chord_index])
-    pattern_time = (chord_duration * pattern_progress) / pattern_length
-    return loop_time + chord_start_time + pattern_time
-
-
 def calculate_velocity_for_string(string_index: int, total_strings: int, base_volume: int, is_first_string: bool = False) -> int:
     """Calculate velocity (volume) for a string based on its position in the strum."""
     if is_first_string:
@@ -75,7 +64,8 @@ def synthesize_guitar_progression(
     tempo: int = 90,
     base_volume: int = 70,
     output_path: str = None,
-    verbose: bool = False
+    verbose: bool = False,
+    backend: str = "midiutil"
 ):
     """
     Generate MIDI for guitar chord progression with strumming patterns.
@@ -89,9 +79,12 @@ def synthesize_guitar_progression(
         base_volume: Base MIDI volume (0-127).
         output_path: Path to save MIDI file. If None, returns MIDIFile object.
         verbose: Print debug info.
+        backend: MIDI writer, "midiutil" (default), "smf" for the array-backed SMFWriter,
+                 "stream" to write to output_path while synthesizing, or "events" for a
+                 NoteEventBuffer.
     
     Returns:
-        None if output_path specified, otherwise MIDIFile object.
+        None if output_path specified, otherwise the MIDIFile (or backend) object.
     """
     
     MIDI_TRACK = 0
@@ -99,17 +92,22 @@ def synthesize_guitar_progression(
     START_TIME = 0
     BASE_NOTE_DURATION = 0.08 * 4
     
-    midi = MIDIFile(1)
+    midi = create_midi_file(backend, output_file=output_path)
     midi.addTempo(MIDI_TRACK, START_TIME, tempo)
     
-    total_duration = sum(cp.chord_duration for cp in chord_patterns)
+    # Exact chord and strum times, computed once and resolved to ticks per note
+    timeline = Timeline()
+    chord_durations = [timeline.fraction(cp.chord_duration) for cp in chord_patterns]
+    chord_starts = timeline.positions(chord_durations)
+    total_duration = sum(chord_durations)
+    strum_offsets = [timeline.subdivide(duration, cp.pattern) for cp, duration in zip(chord_patterns, chord_durations)]
     
     for loop_idx in range(num_loops):
         for chord_idx, chord_pattern in enumerate(chord_patterns):
-            pattern_length = sum(chord_pattern.pattern)
-            
             for pattern_step, pattern_value in enumerate(chord_pattern.pattern):
                 is_strumming_down = (sum(chord_pattern.pattern[:pattern_step]) % 2 == 0)
+                strum_offset = strum_offsets[chord_idx][pattern_step][0]
+                strum_time = loop_idx * total_duration + chord_starts[chord_idx] + strum_offset
                 
                 chord_notes = get_chord_from_tabs(chord_pattern.tabs)
                 if not is_strumming_down:
@@ -119,17 +117,6 @@ def synthesize_guitar_progression(
                     if should_drop_string(string_idx, string_drop_probability):
                         continue
                     
-                    pattern_progress = sum(chord_pattern.pattern[:pattern_step])
-                    note_time = calculate_note_time_in_pattern(
-                        pattern_progress,
-                        pattern_length,
-                        chord_pattern.chord_duration,
-                        total_duration,
-                        loop_idx,
-                        chord_idx,
-                        [cp.chord_duration for cp in chord_patterns]
-                    )
-                    
                     string_delay = calculate_string_delay(
                         string_idx,
                         len(chord_notes),
@@ -137,7 +124,8 @@ def synthesize_guitar_progression(
                         base_strum_speed
                     )
                     
-                    final_time = note_time + string_delay
+                    final_time, note_duration = timeline.note(strum_time + timeline.fraction(string_delay),
+                                                              BASE_NOTE_DURATION)
                     
                     is_first_string = (string_idx == 0)
                     velocity = calculate_velocity_for_string(
@@ -152,15 +140,12 @@ def synthesize_guitar_progression(
                         MIDI_CHANNEL,
                         note,
                         final_time,
-                        BASE_NOTE_DURATION,
+                        note_duration,
                         velocity
                     )
     
     if output_path is not None:
-        output_path_obj = Path(output_path)
-        output_path_obj.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "wb") as f:
-            midi.writeFile(f)
+        write_midi_file(midi, output_path)
         if verbose:
             print(f"  Wrote: {output_path}")
         return None
@@ -2,5 +2,12 @@
 
 from src.music_theory.midi.compose import compose_chord_progression
 from src.music_theory.midi.arpeggio import generate_arpeggio_progression
+from src.music_theory.midi.smf import SMFWriter, create_midi_file, decode_notes, write_midi_file
+from src.music_theory.midi.streaming import StreamingMIDIWriter
+from src.music_theory.midi.events import NoteEventBuffer
+from src.music_theory.midi.timeline import Timeline
+from src.music_theory.midi.overlaps import resolve_overlaps
 
-__all__ = ["compose_chord_progression", "generate_arpeggio_progression"]
+__all__ = ["compose_chord_progression", "generate_arpeggio_progression", "SMFWriter", "create_midi_file",
+           "decode_notes", "write_midi_file", "StreamingMIDIWriter", "NoteEventBuffer",
+           "Timeline", "resolve_overlaps"]
@@ -4,11 +4,11 @@ Arpeggio generation utilities for fast chord arpeggiation.
 Generates fast arpeggiated chord progressions with customizable patterns and spanning.
 """
 
-from pathlib import Path
-from midiutil import MIDIFile
 from src.music_theory.core.notes import note_string_to_midi
 from src.music_theory.core.chord import build_arpeggio_from_chord
 from src.music_theory.core.constants import chords as CHORD_DEFINITIONS, interval_half_steps
+from src.music_theory.midi.smf import create_midi_file, write_midi_file
+from src.music_theory.midi.timeline import Timeline
 
 
 def _get_chord_intervals(chord_type):
@@ -21,7 +21,8 @@ def _get_chord_intervals(chord_type):
 
 
 def generate_arpeggio_progression(chords, output_file=None, tempo=400, volume=60, 
-                                   octaves_to_span=4, finger_pattern=None, verbose=False):
+                                   octaves_to_span=4, finger_pattern=None, verbose=False,
+                                   backend="midiutil"):
     """
     Generate fast arpeggiated chords.
     
@@ -34,13 +35,16 @@ def generate_arpeggio_progression(chords, output_file=None, tempo=400, volume=60
         octaves_to_span: Number of octaves to span (default 4)
         finger_pattern: Optional list of pattern indices (e.g., [1, 2, 4, 3, 1, 2, 3, 4])
         verbose: Print debug info (default False)
+        backend: MIDI writer, "midiutil" (default), "smf" for the array-backed SMFWriter,
+                 "stream" to write to output_file while generating, or "events" for a
+                 NoteEventBuffer.
     
     Returns:
-        None if output_file is specified, otherwise MIDIFile object.
+        None if output_file is specified, otherwise the MIDIFile (or backend) object.
         Note: Each note in the arpeggio lasts 0.5 quarter notes.
     """
     
-    midi = MIDIFile(1)
+    midi = create_midi_file(backend, output_file=output_file)
     midi.addTempo(0, 0, tempo)
     
     if finger_pattern is None:
@@ -51,8 +55,9 @@ def generate_arpeggio_progression(chords, output_file=None, tempo=400, volume=60
     if finger_pattern is None:
         finger_pattern = [1, 2, 4, 5, 2, 4, 6, 8]
     
+    timeline = Timeline()
     current_time = 0
-    beat_duration = 0.5
+    beat_duration = timeline.fraction(0.5)
     
     for base_note_str, chord_type_str in chords:
         base_midi = note_string_to_midi(base_note_str)
@@ -62,14 +67,11 @@ def generate_arpeggio_progression(chords, output_file=None, tempo=400, volume=60
         arpeggio_notes = build_arpeggio_from_chord(chord, arpeggio_length, finger_pattern)
         
         for midi_note in arpeggio_notes:
-            midi.addNote(0, 0, midi_note, current_time, beat_duration, volume)
+            midi.addNote(0, 0, midi_note, *timeline.note(current_time, beat_duration), volume)
             current_time += beat_duration
     
     if output_file is not None:
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, "wb") as f:
-            midi.writeFile(f)
+        write_midi_file(midi, output_file)
         if verbose:
             print(f"  Wrote: {output_file}")
         return None
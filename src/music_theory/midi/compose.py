@@ -4,14 +4,17 @@ Chord composition utilities for generating MIDI progressions.
 Converts simple (note_string, chord_type) specifications into full MIDI chord progressions.
 """
 
-from pathlib import Path
-from midiutil import MIDIFile
+from src.music_theory.core.chord import Chord
+from src.music_theory.core.chord_symbols import parse_chord_symbol
 from src.music_theory.core.notes import build_chord, find_chord_voicing_by_common_tones
+from src.music_theory.core.voice_leading import optimal_voice_leading
+from src.music_theory.midi.smf import create_midi_file, write_midi_file
+from src.music_theory.midi.timeline import Timeline
 
 
 def compose_chord_progression(chords, output_file=None, tempo=120, volume=70, 
                               chord_durations=None, patterns=None, loop_count=1, 
-                              smooth_voicing=False, verbose=False):
+                              smooth_voicing=False, verbose=False, backend="midiutil"):
     """
     Generate a chord progression from note/chord type pairs.
     
@@ -21,6 +24,8 @@ def compose_chord_progression(chords, output_file=None, tempo=120, volume=70,
                 - (base_note, chord_type, inversion) - e.g., ("C4", "major", 1)
                 - (base_note, chord_type, voicing_dict) - e.g., ("C4", "major", {"inversion": 1, "openness": 0.3})
                 - (base_note, chord_type, inversion, voicing_dict) - mixed format
+                - a Chord object - used as voiced
+                - a chord symbol string - e.g., "Cmaj9/E" (see parse_chord_symbol)
                 
                 Voicing options in dict: inversion, lower_octave_doubles, upper_octave_doubles, 
                                         over_octaves, openness, rootless
@@ -36,49 +41,69 @@ def compose_chord_progression(chords, output_file=None, tempo=120, volume=70,
         loop_count: Number of times to repeat the entire chord progression (default 1).
         smooth_voicing: If True, uses find_chord_voicing_by_common_tones() to smooth voice
                        leading between consecutive chords, minimizing note movement (default False).
+                       If "optimal", voices the whole progression at once with
+                       optimal_voice_leading(), minimizing total movement while staying in register.
         verbose: Print debug info (default False)
+        backend: MIDI writer, "midiutil" (default), "smf" for the array-backed
+                 SMFWriter, which is much faster for large progressions,
+                 "stream" to write to output_file while composing, or "events"
+                 for a NoteEventBuffer.
     
     Returns:
-        None if output_file is specified, otherwise MIDIFile object
+        None if output_file is specified, otherwise the MIDIFile (or backend) object
     """
     
     # Default durations
     if chord_durations is None:
         chord_durations = [4] * len(chords)
     
-    midi = MIDIFile(1)
+    midi = create_midi_file(backend, output_file=output_file)
     midi.addTempo(0, 0, tempo)
     
+    # Exact times, resolved to ticks once per note
+    timeline = Timeline()
     current_time = 0
     previous_chord_notes = None  # Track previous chord for smoothening
     
+    # Parse chord items - supports:
+    # ("Gs3", "minor") - simple
+    # ("Gs3", "minor", 1) - with inversion
+    # ("Gs3", "minor", {"inversion": 1, "openness": 0.3}) - with kwargs dict
+    # ("Gs3", "minor", 1, {"openness": 0.3}) - mixed: positional args + kwargs
+    built_chords = []
+    for chord_item in chords:
+        if isinstance(chord_item, Chord):
+            # Already voiced chord object
+            kwargs = None
+            args = chord_item
+        elif isinstance(chord_item, str):
+            # Lead-sheet chord symbol, root in the middle octave
+            kwargs = None
+            args = parse_chord_symbol(chord_item).notes()
+        elif isinstance(chord_item[-1], dict):
+            # Last element is dict - extract it for kwargs
+            kwargs = chord_item[-1]
+            args = chord_item[:-1]
+        else:
+            # No dict at end, all positional args
+            kwargs = {}
+            args = chord_item
+        
+        # Use build_chord library function with unpacked args and kwargs
+        built_chords.append(list(args) if kwargs is None else build_chord(*args, **kwargs))
+    
+    if smooth_voicing == "optimal":
+        built_chords = optimal_voice_leading(built_chords)
+    
     # Loop the entire chord progression
     for loop_idx in range(loop_count):
         previous_chord_notes = None
-        for chord_idx, chord_item in enumerate(chords):
-            # Parse chord item - supports:
-            # ("Gs3", "minor") - simple
-            # ("Gs3", "minor", 1) - with inversion
-            # ("Gs3", "minor", {"inversion": 1, "openness": 0.3}) - with kwargs dict
-            # ("Gs3", "minor", 1, {"openness": 0.3}) - mixed: positional args + kwargs
-            
-            if isinstance(chord_item[-1], dict):
-                # Last element is dict - extract it for kwargs
-                kwargs = chord_item[-1]
-                args = chord_item[:-1]
-            else:
-                # No dict at end, all positional args
-                kwargs = {}
-                args = chord_item
-            
-            # Use build_chord library function with unpacked args and kwargs
-            chord_notes = build_chord(*args, **kwargs)
-            
+        for chord_idx, chord_notes in enumerate(built_chords):
             # Apply smooth voicing if enabled and not first chord
-            if smooth_voicing and previous_chord_notes is not None:
+            if smooth_voicing and smooth_voicing != "optimal" and previous_chord_notes is not None:
                 chord_notes = find_chord_voicing_by_common_tones(previous_chord_notes, chord_notes)
             
-            chord_duration = chord_durations[chord_idx]
+            chord_duration = timeline.fraction(chord_durations[chord_idx])
             
             # Get pattern for this chord
             if patterns is None:
@@ -94,27 +119,18 @@ def compose_chord_progression(chords, output_file=None, tempo=120, volume=70,
                     pattern = patterns
             
             # Play chord multiple times according to pattern
-            pattern_sum = sum(pattern)
-            pattern_time = current_time
-            
-            for pattern_idx, pattern_value in enumerate(pattern):
-                # Duration for this chord playback
-                note_duration = (chord_duration * pattern_value) / pattern_sum
+            for pattern_offset, note_duration in timeline.subdivide(chord_duration, pattern):
+                note_time, note_length = timeline.note(current_time + pattern_offset, note_duration)
                 
                 # Play ALL notes of the chord together
                 for midi_note in chord_notes:
-                    midi.addNote(0, 0, midi_note, pattern_time, note_duration, volume)
-                
-                pattern_time += note_duration
+                    midi.addNote(0, 0, midi_note, note_time, note_length, volume)
             
             current_time += chord_duration
             previous_chord_notes = chord_notes  # Save for next iteration
     
     if output_file is not None:
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, "wb") as f:
-            midi.writeFile(f)
+        write_midi_file(midi, output_file)
         if verbose:
             print(f"  Wrote: {output_file}")
         return None
@@ -0,0 +1,249 @@
+"""
+Columnar note event buffer shared by the MIDI generators.
+
+NoteEventBuffer keeps notes as a struct of arrays (pitch, start, duration,
+velocity, channel, track) instead of writing them straight into a MIDI file
+object. Generators emit into it through the same addTempo/addNote interface
+they use for midiutil (create_midi_file(backend="events")), and the result
+can be transposed, shifted, stretched, sliced, concatenated and sorted with a
+few NumPy operations over all notes before it is converted to any MIDI
+backend.
+
+Times and durations are in quarter notes, as in midiutil.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from src.music_theory.midi.overlaps import resolve_overlaps
+from src.music_theory.midi.timeline import TICKS_PER_QUARTERNOTE, Timeline, stable_argsort, to_ticks
+
+FIELDS = ("pitch", "start", "duration", "velocity", "channel", "track")
+_FLOAT_FIELDS = ("start", "duration")
+
+
+def _column(field: str, values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64 if field in _FLOAT_FIELDS else np.int64)
+
+
+class NoteEventBuffer:
+    """
+    Struct-of-arrays note storage with vectorized transforms.
+
+    Transforms return new buffers and leave the original unchanged. Tempo
+    changes, kept as (time, bpm) pairs, follow shift and scale_time.
+
+    Attributes:
+        tempos (List[Tuple[float, float]]): Tempo changes as (time, bpm).
+
+    Example:
+        >>> events = NoteEventBuffer([60, 64, 67], [0, 1, 2], 1, 80)
+        >>> events.transpose(2).shift(4).pitch.tolist()
+        [62, 66, 69]
+        >>> midi = events.to_midi("smf")
+    """
+
+    def __init__(self, pitch=(), start=(), duration=(), velocity=80, channel=0, track=0,
+                 tempos: Iterable[Tuple[float, float]] = ()):
+        """
+        Initialize a buffer from columns.
+
+        Args:
+            pitch: MIDI note numbers.
+            start: Start times in quarter notes.
+            duration: Durations in quarter notes.
+            velocity: Velocities 0-127 (default 80).
+            channel: MIDI channels (default 0).
+            track: Track numbers (default 0).
+            tempos: Tempo changes as (time, bpm) pairs.
+
+        Every column is a scalar or an array; they broadcast together.
+        """
+        columns = np.broadcast_arrays(*(_column(field, values) for field, values in
+                                        zip(FIELDS, (pitch, start, duration, velocity, channel, track))))
+        self._columns = tuple(column.ravel().copy() for column in columns)
+        self._pending: List[Tuple[int, float, float, int, int, int]] = []
+        self.tempos: List[Tuple[float, float]] = list(tempos)
+
+    @classmethod
+    def _from_columns(cls, columns, tempos) -> "NoteEventBuffer":
+        events = cls.__new__(cls)
+        events._columns = tuple(columns)
+        events._pending = []
+        events.tempos = list(tempos)
+        return events
+
+    def _replace(self, **changes) -> "NoteEventBuffer":
+        columns = [changes.get(field, column) for field, column in zip(FIELDS, self.columns())]
+        return self._from_columns(columns, changes.get("tempos", self.tempos))
+
+    def columns(self) -> Tuple[np.ndarray, ...]:
+        """The (pitch, start, duration, velocity, channel, track) arrays."""
+        if self._pending:
+            pending = list(zip(*self._pending))
+            self._columns = tuple(np.concatenate([column, _column(field, values)]) for field, column, values in
+                                  zip(FIELDS, self._columns, pending))
+            self._pending = []
+        return self._columns
+
+    @property
+    def pitch(self) -> np.ndarray:
+        return self.columns()[0]
+
+    @property
+    def start(self) -> np.ndarray:
+        return self.columns()[1]
+
+    @property
+    def duration(self) -> np.ndarray:
+        return self.columns()[2]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        return self.columns()[3]
+
+    @property
+    def channel(self) -> np.ndarray:
+        return self.columns()[4]
+
+    @property
+    def track(self) -> np.ndarray:
+        return self.columns()[5]
+
+    @property
+    def end(self) -> np.ndarray:
+        """End times in quarter notes."""
+        return self.start + self.duration
+
+    def __len__(self) -> int:
+        return len(self._columns[0]) + len(self._pending)
+
+    def __getitem__(self, index) -> "NoteEventBuffer":
+        """Select notes with a slice, integer array or boolean mask; tempos are kept."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return self._from_columns([column[index] for column in self.columns()], self.tempos)
+
+    def __add__(self, other: "NoteEventBuffer") -> "NoteEventBuffer":
+        return NoteEventBuffer.concatenate([self, other])
+
+    def addTempo(self, track: int, time: float, tempo: float) -> None:
+        """Add a tempo change in BPM at a time in quarter notes (as midiutil.MIDIFile.addTempo)."""
+        self.tempos.append((time, tempo))
+
+    def addNote(self, track: int, channel: int, pitch: int, time: float, duration: float, volume: int) -> None:
+        """Add one note; time and duration are in quarter notes (as midiutil.MIDIFile.addNote)."""
+        self._pending.append((pitch, time, duration, volume, channel, track))
+
+    def addNotes(self, track, channel, pitches, times, durations, volumes) -> None:
+        """Add many notes at once; arguments are scalars or arrays that broadcast together."""
+        added = NoteEventBuffer(pitches, times, durations, volumes, channel, track)
+        self._columns = tuple(np.concatenate(pair) for pair in zip(self.columns(), added.columns()))
+
+    @staticmethod
+    def concatenate(buffers: Iterable["NoteEventBuffer"]) -> "NoteEventBuffer":
+        """Join buffers in order; tempo changes are merged."""
+        buffers = list(buffers)
+        if not buffers:
+            return NoteEventBuffer()
+        columns = [np.concatenate(column) for column in zip(*(events.columns() for events in buffers))]
+        tempos = sorted(set(tempo for events in buffers for tempo in events.tempos))
+        return NoteEventBuffer._from_columns(columns, tempos)
+
+    def transpose(self, semitones: int) -> "NoteEventBuffer":
+        """
+        Move every note by a number of semitones.
+
+        Raises:
+            ValueError: If a transposed pitch leaves the MIDI range 0-127.
+        """
+        pitch = self.pitch + int(semitones)
+        if len(pitch) and (pitch.min() < 0 or pitch.max() > 127):
+            raise ValueError(f"semitones is {semitones} it has to keep pitches within 0-127")
+        return self._replace(pitch=pitch)
+
+    def shift(self, time: float) -> "NoteEventBuffer":
+        """Move every note and tempo change by a time in quarter notes."""
+        return self._replace(start=self.start + time, tempos=[(start + time, bpm) for start, bpm in self.tempos])
+
+    def scale_time(self, factor: float) -> "NoteEventBuffer":
+        """
+        Stretch starts and durations (and tempo change times) by a factor.
+
+        Raises:
+            ValueError: If factor is not positive.
+        """
+        if factor <= 0:
+            raise ValueError(f"factor is {factor} it has to be positive")
+        return self._replace(start=self.start * factor, duration=self.duration * factor,
+                             tempos=[(start * factor, bpm) for start, bpm in self.tempos])
+
+    def scale_velocity(self, factor: float) -> "NoteEventBuffer":
+        """Multiply velocities by a factor, rounded and kept within 1-127 so no note falls silent."""
+        return self._replace(velocity=np.clip(np.rint(self.velocity * factor), 1, 127).astype(np.int64))
+
+    def sorted(self) -> "NoteEventBuffer":
+        """Notes in start order (by tick); notes starting on the same tick keep their order."""
+        return self[stable_argsort(to_ticks(self.start))]
+
+    def resolve_overlaps(self, policy: str = "truncate") -> "NoteEventBuffer":
+        """
+        Resolve overlapping notes of the same channel and pitch (per track).
+
+        Args:
+            policy: "truncate" (default), "merge" or "drop"; see overlaps.resolve_overlaps.
+
+        Returns:
+            The kept notes in their original order, with times on the tick grid.
+
+        Raises:
+            ValueError: If the policy is not supported.
+        """
+        pitch, start, duration, velocity, channel, track = self.columns()
+        starts = to_ticks(start)
+        # Tracks are separate instruments: fold the track into the channel so they never interact.
+        keep, ends = resolve_overlaps(track * 16 + channel, pitch, starts, to_ticks(start + duration), policy)
+        return self._replace(start=starts / TICKS_PER_QUARTERNOTE,
+                             duration=(ends - starts) / TICKS_PER_QUARTERNOTE)[keep]
+
+    def to_midi(self, backend: str = "smf", output_file=None, overlap_policy: str = "truncate"):
+        """
+        Convert to a MIDI file object of a backend.
+
+        Args:
+            backend: "midiutil", "smf" or "stream" (see create_midi_file).
+            output_file: Path for the "stream" backend.
+            overlap_policy: How the backend resolves overlapping notes.
+
+        Returns:
+            A MIDI file object, to be finished with write_midi_file.
+
+        Raises:
+            ValueError: If the backend or overlap_policy is not supported.
+        """
+        from src.music_theory.midi.smf import create_midi_file
+
+        if backend == "events":
+            return self
+        pitch, start, duration, velocity, channel, track = self.columns()
+        midi = create_midi_file(backend, int(track.max()) + 1 if len(track) else 1, output_file, overlap_policy)
+        for time, bpm in sorted(self.tempos):
+            midi.addTempo(0, time, bpm)
+        if hasattr(midi, "addNotes"):
+            order = stable_argsort(to_ticks(start))
+            midi.addNotes(track[order], channel[order], pitch[order], start[order], duration[order],
+                          velocity[order])
+        else:
+            # Exact tick-grid times, so backends that truncate floats get the same ticks.
+            timeline = Timeline()
+            for note_track, note_channel, note_pitch, start_tick, duration_tick, note_velocity in zip(
+                    track.tolist(), channel.tolist(), pitch.tolist(), to_ticks(start).tolist(),
+                    to_ticks(duration).tolist(), velocity.tolist()):
+                midi.addNote(note_track, note_channel, note_pitch, timeline.time(start_tick),
+                             timeline.time(duration_tick), note_velocity)
+        return midi
+
+    def writeFile(self, fileHandle) -> None:
+        """Write the notes as a Standard MIDI File (through SMFWriter) to a binary file handle."""
+        self.to_midi("smf").writeFile(fileHandle)
@@ -0,0 +1,94 @@
+"""
+Overlap and duplicate-note resolution for generated notes.
+
+Generators can produce notes of the same channel and pitch that overlap: the
+guitar synthesizer strikes the same strings on every strum, build_chord with
+octave doublings can repeat a pitch, and pattern repeats layer chords. A
+synthesizer has one voice per key, so such notes must be resolved before they
+are written.
+
+resolve_overlaps does this for all notes at once: one stable sort by
+(channel, pitch, start) puts every group of same-key notes side by side in
+time order, and a sweep over the sorted arrays applies a policy:
+
+    truncate: end each note where the next note of its key starts; of
+              notes starting together the last one added is kept. For
+              notes that overlap in a chain this is what midiutil's own
+              deinterleaving does, but not for a note wholly inside a
+              longer one. Both end the outer note where the inner one
+              starts, but midiutil then holds the inner note until the
+              outer note's end, while truncate keeps the inner note's own
+              end (0-200 and 100-120 become 0-100 and 100-200 in midiutil,
+              0-100 and 100-120 here).
+    merge: join notes that overlap into one note spanning all of them, with
+           the first note's velocity.
+    drop: keep the first note of every run of overlapping notes unchanged
+          and drop the others.
+
+Notes that touch (one ends where the next starts) do not overlap.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from src.music_theory.midi.timeline import stable_argsort
+
+POLICIES = ("truncate", "merge", "drop")
+
+
+def resolve_overlaps(channels, pitches, starts, ends, policy: str = "truncate") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resolve overlapping notes of the same channel and pitch.
+
+    Args:
+        channels: MIDI channel of each note.
+        pitches: MIDI pitch of each note.
+        starts: Start tick of each note.
+        ends: End tick of each note.
+        policy: "truncate" (default), "merge" or "drop" (see module docstring).
+
+    Returns:
+        (keep, ends): A boolean mask of the notes to write and their new end
+        ticks, both aligned with the input. Zero-length notes are never kept.
+
+    Raises:
+        ValueError: If the policy is not supported.
+
+    Example:
+        >>> keep, ends = resolve_overlaps([0, 0], [60, 60], [0, 480], [960, 1440])
+        >>> keep.tolist(), ends.tolist()
+        ([True, True], [480, 1440])
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy is {policy} it has to be one of {', '.join(POLICIES)}")
+    keys = np.asarray(channels, dtype=np.int64) * 128 + np.asarray(pitches, dtype=np.int64)
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.array(ends, dtype=np.int64)
+    count = len(starts)
+    if count < 2:
+        return ends > starts, ends
+
+    # By key, then start, then insertion order.
+    order = stable_argsort(starts)
+    order = order[stable_argsort(keys[order])]
+    sorted_keys, sorted_starts, sorted_ends = keys[order], starts[order], ends[order]
+    same_key = sorted_keys[1:] == sorted_keys[:-1]
+
+    if policy == "truncate":
+        sorted_ends[:-1] = np.where(same_key, np.minimum(sorted_ends[:-1], sorted_starts[1:]), sorted_ends[:-1])
+        ends[order] = sorted_ends
+        return ends > starts, ends
+
+    # Latest end so far within each key: offset keys so a running maximum cannot cross from one key to the next.
+    base = min(int(starts.min()), int(ends.min()))
+    span = max(int(starts.max()), int(ends.max())) - base + 1
+    running_end = np.maximum.accumulate(sorted_keys * span + (sorted_ends - base)) - sorted_keys * span + base
+    new_run = np.ones(count, dtype=bool)
+    new_run[1:] = ~same_key | (sorted_starts[1:] >= running_end[:-1])
+    run_starts = np.flatnonzero(new_run)
+    keep = np.zeros(count, dtype=bool)
+    keep[order[run_starts]] = True
+    if policy == "merge":
+        ends[order[run_starts]] = np.maximum.reduceat(sorted_ends, run_starts)
+    return keep & (ends > starts), ends
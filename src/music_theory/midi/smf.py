@@ -0,0 +1,424 @@
+"""
+Standard MIDI File writer backed by NumPy arrays.
+
+SMFWriter accepts the subset of the midiutil.MIDIFile interface the
+generators use (addTempo, addNote, writeFile) plus addNotes for whole arrays
+of notes. Notes are stored as rows of integers and encoded in bulk when the
+file is written: note-on and note-off events are ordered with one sort,
+delta times are turned into variable-length quantities with a few array
+operations, repeated status bytes are dropped (running status), and each
+track is assembled into a single bytearray.
+
+Times follow midiutil: quarter notes truncated to ticks (see
+timeline.to_ticks, which also absorbs float drift), the tempo track comes
+first (format 1) and note-offs sort before note-ons at the same tick.
+Overlapping notes of the same channel and pitch are resolved by
+overlaps.resolve_overlaps, by default by ending the earlier note where the
+later one starts (see that module for how this differs from midiutil's own
+deinterleaving). Events are ordered with radix sorts on integer ticks
+(timeline.stable_argsort).
+
+create_midi_file("midiutil") returns a midiutil.MIDIFile that resolves
+overlaps the same way when it is closed, instead of midiutil's own
+deinterleaving.
+"""
+
+import struct
+from pathlib import Path
+from typing import List, Tuple, Union
+
+import numpy as np
+from midiutil import MIDIFile
+from midiutil.MidiFile import NoteOff, NoteOn
+
+from src.music_theory.midi.overlaps import POLICIES, resolve_overlaps
+from src.music_theory.midi.timeline import TICKS_PER_QUARTERNOTE, stable_argsort, to_ticks
+
+BACKENDS = ("midiutil", "smf", "stream", "events")
+
+_END_OF_TRACK = b"\x00\xff\x2f\x00"
+# Columns of a stored note row.
+_TRACK, _CHANNEL, _PITCH, _START, _DURATION, _VELOCITY = range(6)
+
+
+def encode_variable_length(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode non-negative integers as MIDI variable-length quantities, in bulk.
+
+    Args:
+        values: Integers below 2**28.
+
+    Returns:
+        (codes, lengths): codes has shape (len(values), 4), with each code's
+        bytes left-aligned; lengths gives how many bytes of each row are used.
+
+    Example:
+        >>> codes, lengths = encode_variable_length(np.array([0, 128, 16384]))
+        >>> [bytes(code[:length].tolist()).hex() for code, length in zip(codes, lengths)]
+        ['00', '8100', '818000']
+    """
+    values = np.asarray(values, dtype=np.int64)
+    lengths = 1 + (values >= 1 << 7) + (values >= 1 << 14) + (values >= 1 << 21)
+    position = np.arange(4)[None, :]
+    shifts = 7 * (lengths[:, None] - 1 - position)
+    codes = (values[:, None] >> np.maximum(shifts, 0)) & 0x7F
+    codes |= np.where(position < lengths[:, None] - 1, 0x80, 0)
+    return codes.astype(np.uint8), lengths
+
+
+def encode_track_events(ticks: np.ndarray, statuses: np.ndarray, data_1: np.ndarray, data_2: np.ndarray,
+                        running_status: bool = True, previous_tick: int = 0, previous_status: int = -1) -> bytearray:
+    """
+    Encode time-sorted channel events (two data bytes each) into MTrk data.
+
+    Args:
+        ticks: Absolute tick of every event, non-decreasing.
+        statuses: Status byte of every event (e.g. 0x90 | channel).
+        data_1: First data byte (the pitch for note events).
+        data_2: Second data byte (the velocity for note events).
+        running_status: Leave out status bytes equal to the previous one.
+        previous_tick: Tick of the event before ticks[0], when continuing a track.
+        previous_status: Status in effect before the first event (-1 for none).
+
+    Returns:
+        The encoded events, without the chunk header or end-of-track event.
+    """
+    count = len(ticks)
+    codes, lengths = encode_variable_length(np.diff(np.asarray(ticks, dtype=np.int64), prepend=previous_tick))
+    statuses = np.asarray(statuses, dtype=np.int64)
+    # One row of up to 7 bytes per event: delta time (1-4), status (0-1), two data bytes.
+    rows = np.zeros((count, 7), dtype=np.uint8)
+    used = np.zeros((count, 7), dtype=bool)
+    rows[:, :4] = codes
+    used[:, :4] = np.arange(4)[None, :] < lengths[:, None]
+    rows[:, 4] = statuses
+    used[:, 4] = True
+    if running_status and count:
+        used[:, 4] = statuses != np.concatenate(([previous_status], statuses[:-1]))
+    rows[:, 5] = data_1
+    rows[:, 6] = data_2
+    used[:, 5:] = True
+    return bytearray(rows[used].tobytes())
+
+
+def _chunk(kind: bytes, data: Union[bytes, bytearray]) -> bytes:
+    return kind + struct.pack(">L", len(data)) + bytes(data)
+
+
+class SMFWriter:
+    """
+    Array-backed Standard MIDI File writer with a midiutil-compatible interface.
+
+    Attributes:
+        numTracks (int): Number of note tracks (a tempo track is added in front).
+        ticks_per_quarternote (int): Tick resolution (PPQ).
+
+    Example:
+        >>> midi = SMFWriter(1)
+        >>> midi.addTempo(0, 0, 120)
+        >>> midi.addNotes(0, 0, [60, 64, 67], [0, 1, 2], 1, 80)
+        >>> with open("out.mid", "wb") as f:
+        ...     midi.writeFile(f)
+    """
+
+    def __init__(self, numTracks: int = 1, ticks_per_quarternote: int = TICKS_PER_QUARTERNOTE,
+                 deinterleave: bool = True, running_status: bool = True, overlap_policy: str = "truncate"):
+        """
+        Initialize an empty writer.
+
+        Args:
+            numTracks: Number of note tracks (default 1).
+            ticks_per_quarternote: Tick resolution (default 960, as midiutil).
+            deinterleave: Resolve overlapping notes of the same channel and
+                          pitch with overlap_policy (default True).
+            running_status: Write note-offs as zero-velocity note-ons and leave
+                            out repeated status bytes (default True).
+            overlap_policy: "truncate" (default: end a note early where the
+                            next one starts), "merge" or "drop"; see
+                            overlaps.resolve_overlaps.
+
+        Raises:
+            ValueError: If numTracks is below 1 or overlap_policy is not supported.
+        """
+        if numTracks < 1:
+            raise ValueError(f"numTracks is {numTracks} it has to be at least 1")
+        self.numTracks = numTracks
+        self.ticks_per_quarternote = ticks_per_quarternote
+        if overlap_policy not in POLICIES:
+            raise ValueError(f"overlap_policy is {overlap_policy} it has to be one of {', '.join(POLICIES)}")
+        self.deinterleave = deinterleave
+        self.overlap_policy = overlap_policy
+        self.running_status = running_status
+        self._tempos: List[Tuple[int, int]] = []
+        self._pending: List[Tuple[int, int, int, int, int, int]] = []
+        self._chunks: List[np.ndarray] = []
+
+    def _to_ticks(self, time) -> int:
+        return to_ticks(time, self.ticks_per_quarternote)
+
+    def addTempo(self, track: int, time: float, tempo: float) -> None:
+        """Add a tempo change in BPM at a time in quarter notes (tempos live in the tempo track)."""
+        self._tempos.append((self._to_ticks(time), int(60000000 / tempo)))
+
+    def _limits(self) -> Tuple[Tuple[str, int, int], ...]:
+        """(name, column, exclusive upper bound) of every note field with a range."""
+        return (("track", _TRACK, self.numTracks), ("channel", _CHANNEL, 16), ("pitch", _PITCH, 128),
+                ("volume", _VELOCITY, 128))
+
+    def addNote(self, track: int, channel: int, pitch: int, time: float, duration: float, volume: int) -> None:
+        """
+        Add one note; time and duration are in quarter notes.
+
+        Raises:
+            ValueError: If track is not below numTracks, channel is not 0-15,
+                        or pitch or volume is not 0-127.
+        """
+        note = (track, channel, pitch, self._to_ticks(time), self._to_ticks(duration), volume)
+        for name, column, limit in self._limits():
+            if not 0 <= note[column] < limit:
+                raise ValueError(f"{name} is {note[column]} it has to be between 0 and {limit - 1}")
+        self._pending.append(note)
+
+    def addNotes(self, track, channel, pitches, times, durations, volumes) -> None:
+        """
+        Add many notes at once.
+
+        Every argument is a scalar or an array; they broadcast together.
+        Times and durations are in quarter notes.
+
+        Raises:
+            ValueError: If a track is not below numTracks, a channel is not
+                        0-15, or a pitch or volume is not 0-127. No note is
+                        added then.
+        """
+        ppq = self.ticks_per_quarternote
+        columns = np.broadcast_arrays(
+            np.asarray(track, dtype=np.int64), np.asarray(channel, dtype=np.int64),
+            np.asarray(pitches, dtype=np.int64), to_ticks(times, ppq), to_ticks(durations, ppq),
+            np.asarray(volumes, dtype=np.int64))
+        notes = np.stack([column.ravel() for column in columns], axis=1)
+        for name, column, limit in self._limits():
+            outside = (notes[:, column] < 0) | (notes[:, column] >= limit)
+            if outside.any():
+                raise ValueError(f"{name} is {notes[outside, column][0]} it has to be between 0 and {limit - 1}")
+        self._flush_pending()
+        self._chunks.append(notes)
+
+    def _flush_pending(self) -> None:
+        if self._pending:
+            self._chunks.append(np.array(self._pending, dtype=np.int64))
+            self._pending = []
+
+    def note_array(self) -> np.ndarray:
+        """All notes added so far in insertion order, as (track, channel, pitch, start, duration, velocity) rows."""
+        self._flush_pending()
+        if len(self._chunks) > 1:
+            self._chunks = [np.concatenate(self._chunks)]
+        return self._chunks[0] if self._chunks else np.zeros((0, 6), dtype=np.int64)
+
+    def _note_events(self, notes: np.ndarray) -> bytearray:
+        """Encode one track's notes (rows in insertion order) into MTrk data."""
+        starts = notes[:, _START]
+        ends = starts + notes[:, _DURATION]
+        if self.deinterleave:
+            sounding, ends = resolve_overlaps(notes[:, _CHANNEL], notes[:, _PITCH], starts, ends, self.overlap_policy)
+        else:
+            # Zero-length notes would put their note-off before their note-on.
+            sounding = ends > starts
+        notes, starts, ends = notes[sounding], starts[sounding], ends[sounding]
+
+        count = len(notes)
+        ticks = np.concatenate([ends, starts])
+        is_on = np.repeat([0, 1], count)
+        order = stable_argsort(ticks * 2 + is_on)
+        channels = np.tile(notes[:, _CHANNEL], 2)
+        velocities = np.tile(notes[:, _VELOCITY], 2)
+        if self.running_status:
+            statuses = 0x90 | channels
+            velocities = np.where(is_on == 1, velocities, 0)
+        else:
+            statuses = np.where(is_on == 1, 0x90, 0x80) | channels
+        return encode_track_events(ticks[order], statuses[order], np.tile(notes[:, _PITCH], 2)[order],
+                                   velocities[order], self.running_status)
+
+    def _tempo_events(self) -> bytearray:
+        data = bytearray()
+        previous = 0
+        for tick, microseconds in sorted(self._tempos, key=lambda tempo: tempo[0]):
+            codes, lengths = encode_variable_length(np.array([tick - previous]))
+            data += codes[0, :lengths[0]].tobytes() + b"\xff\x51\x03" + struct.pack(">L", microseconds)[1:]
+            previous = tick
+        return data
+
+    def to_bytes(self) -> bytes:
+        """Encode the whole file."""
+        notes = self.note_array()
+        header = struct.pack(">HHH", 1, self.numTracks + 1, self.ticks_per_quarternote)
+        output = bytearray(_chunk(b"MThd", header))
+        output += _chunk(b"MTrk", self._tempo_events() + _END_OF_TRACK)
+        for track in range(self.numTracks):
+            track_notes = notes[notes[:, _TRACK] == track]
+            output += _chunk(b"MTrk", self._note_events(track_notes) + _END_OF_TRACK)
+        return bytes(output)
+
+    def writeFile(self, fileHandle) -> None:
+        """Write the MIDI file to a file handle opened for binary writing."""
+        fileHandle.write(self.to_bytes())
+
+
+# Attributes of midiutil's NoteOn events that _ResolvedMIDIFile reads.
+_NOTE_ON_ATTRIBUTES = ("channel", "pitch", "tick", "duration", "volume", "annotation", "insertion_order")
+
+
+class _ResolvedMIDIFile(MIDIFile):
+    """
+    midiutil.MIDIFile that resolves overlapping notes with resolve_overlaps when it is closed.
+
+    This rewrites midiutil internals that are not part of its public API
+    (MIDITrack.eventList, NoteOn's attributes and MIDITrack.addNoteByNumber),
+    as found in midiutil 1.2 (requirements.txt pins midiutil==1.2.3). They
+    are checked when the file is created, so another midiutil version fails
+    with a clear error instead of writing a wrong file.
+    """
+
+    def __init__(self, numTracks: int = 1, overlap_policy: str = "truncate"):
+        super().__init__(numTracks, deinterleave=False)
+        self.overlap_policy = overlap_policy
+        probe = NoteOn(0, 60, 0, 1, 80, None, 0)
+        missing = [name for name in _NOTE_ON_ATTRIBUTES if not hasattr(probe, name)]
+        if not all(isinstance(getattr(track, "eventList", None), list) and hasattr(track, "addNoteByNumber")
+                   for track in self.tracks):
+            missing.append("MIDITrack.eventList/addNoteByNumber")
+        if missing:
+            raise RuntimeError(f"backend midiutil needs midiutil 1.2 internals ({', '.join(missing)} missing), "
+                               f"install midiutil==1.2.3 or use backend smf")
+
+    def close(self) -> None:
+        if not self.closed:
+            for track in self.tracks:
+                notes = [event for event in track.eventList if isinstance(event, NoteOn)]
+                if not notes:
+                    continue
+                starts = np.array([note.tick for note in notes], dtype=np.int64)
+                keep, ends = resolve_overlaps([note.channel for note in notes], [note.pitch for note in notes], starts,
+                                              starts + [note.duration for note in notes], self.overlap_policy)
+                track.eventList = [event for event in track.eventList if not isinstance(event, (NoteOn, NoteOff))]
+                for note, kept, end in zip(notes, keep.tolist(), ends.tolist()):
+                    if kept:
+                        track.addNoteByNumber(note.channel, note.pitch, note.tick, end - note.tick, note.volume,
+                                              note.annotation, note.insertion_order)
+        super().close()
+
+
+def create_midi_file(backend: str = "midiutil", num_tracks: int = 1, output_file=None,
+                     overlap_policy: str = "truncate"):
+    """
+    Create an empty MIDI file object for a backend.
+
+    Args:
+        backend: "midiutil" (midiutil.MIDIFile), "smf" (SMFWriter),
+                 "stream" (StreamingMIDIWriter, which writes to output_file
+                 while notes are added and puts all tracks into one) or
+                 "events" (NoteEventBuffer, to transform notes before writing).
+        num_tracks: Number of note tracks.
+        output_file: Path the file will be written to; required by "stream".
+        overlap_policy: How overlapping notes of the same channel and pitch
+                        are resolved before writing: "truncate" (default),
+                        "merge" or "drop" (see overlaps.resolve_overlaps).
+
+    Returns:
+        An object with addTempo and addNote, to be finished with write_midi_file.
+
+    Raises:
+        ValueError: If the backend or overlap_policy is not supported, or
+                    the backend is "stream" without an output_file.
+    """
+    if overlap_policy not in POLICIES:
+        raise ValueError(f"overlap_policy is {overlap_policy} it has to be one of {', '.join(POLICIES)}")
+    if backend == "midiutil":
+        return _ResolvedMIDIFile(num_tracks, overlap_policy)
+    if backend == "smf":
+        return SMFWriter(num_tracks, overlap_policy=overlap_policy)
+    if backend == "stream":
+        if output_file is None:
+            raise ValueError("backend stream needs an output_file to write to")
+        from src.music_theory.midi.streaming import StreamingMIDIWriter
+        return StreamingMIDIWriter(output_file, overlap_policy=overlap_policy)
+    if backend == "events":
+        from src.music_theory.midi.events import NoteEventBuffer
+        return NoteEventBuffer()
+    raise ValueError(f"backend is {backend} it has to be one of {', '.join(BACKENDS)}")
+
+
+def write_midi_file(midi, output_file) -> None:
+    """
+    Write a MIDI file object from create_midi_file to output_file.
+
+    Parent directories are created. A streaming writer already writes to its
+    file, so it is only closed.
+    """
+    from src.music_theory.midi.streaming import StreamingMIDIWriter
+
+    if isinstance(midi, StreamingMIDIWriter):
+        midi.close()
+        return
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        midi.writeFile(f)
+
+
+def _read_variable_length(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, position
+
+
+def decode_notes(data: bytes) -> List[Tuple[int, int, int, int, int, int]]:
+    """
+    Read the notes of a Standard MIDI File, e.g. to compare backends.
+
+    Args:
+        data: The file contents.
+
+    Returns:
+        (track, channel, pitch, start tick, end tick, velocity) per note,
+        sorted; tracks are numbered as in the file (the tempo track is 0).
+    """
+    notes = []
+    position = 14
+    track = 0
+    while position < len(data):
+        length = struct.unpack(">L", data[position + 4:position + 8])[0]
+        position += 8
+        end = position + length
+        tick, status, sounding = 0, 0, {}
+        while position < end:
+            delta, position = _read_variable_length(data, position)
+            tick += delta
+            if data[position] >= 0x80:
+                status = data[position]
+                position += 1
+            if status == 0xFF:
+                length, position = _read_variable_length(data, position + 1)
+                position += length
+            elif status in (0xF0, 0xF7):
+                length, position = _read_variable_length(data, position)
+                position += length
+            elif status >> 4 in (0x8, 0x9):
+                pitch, velocity = data[position], data[position + 1]
+                position += 2
+                key = (status & 0x0F, pitch)
+                if status >> 4 == 0x9 and velocity > 0:
+                    sounding.setdefault(key, []).append((tick, velocity))
+                elif sounding.get(key):
+                    start, on_velocity = sounding[key].pop(0)
+                    notes.append((track, key[0], pitch, start, tick, on_velocity))
+            else:
+                position += 1 if status >> 4 in (0xC, 0xD) else 2
+        track += 1
+    return sorted(notes)
@@ -0,0 +1,251 @@
+"""
+Streaming Standard MIDI File writer with bounded memory.
+
+StreamingMIDIWriter writes a single-track (format 0) file while notes are
+still being generated. Notes must arrive in start-time order, or at most
+reorder_window quarter notes out of order. Incoming notes are collected in a
+small buffer; whenever it fills up, overlapping notes are resolved
+(overlaps.resolve_overlaps) and every event that no later note can precede
+is sorted, encoded in bulk (variable-length delta times and running status,
+see smf.encode_track_events) and written to disk. Only still-sounding notes
+and the reorder window stay in memory, so memory use does not grow with the
+length of the piece.
+
+The track chunk is written with a placeholder length, which is patched when
+the writer is closed, so the output must be a seekable file.
+"""
+
+import struct
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from src.music_theory.midi.overlaps import POLICIES, resolve_overlaps
+from src.music_theory.midi.smf import encode_track_events, encode_variable_length
+from src.music_theory.midi.timeline import TICKS_PER_QUARTERNOTE, stable_argsort, to_ticks
+
+_END_OF_TRACK = b"\x00\xff\x2f\x00"
+# Columns of a buffered note row, and its states.
+_START, _END, _CHANNEL, _PITCH, _VELOCITY, _STATE = range(6)
+_PENDING, _STARTED, _DROPPED = range(3)
+
+
+class StreamingMIDIWriter:
+    """
+    Write notes to a MIDI file as they are produced, with flat memory use.
+
+    Offers addTempo and addNote like midiutil.MIDIFile (the track argument is
+    ignored, everything goes to one track) plus addNotes for arrays. Use it as
+    a context manager, or call close() to finish the file.
+
+    Example:
+        >>> with StreamingMIDIWriter("long.mid", reorder_window=4) as midi:
+        ...     midi.addTempo(0, 0, 240)
+        ...     for time, (pitch, duration) in enumerate(notes):
+        ...         midi.addNote(0, 0, pitch, time, duration, 80)
+    """
+
+    def __init__(self, file, ticks_per_quarternote: int = TICKS_PER_QUARTERNOTE, reorder_window: float = 0.0,
+                 buffer_notes: int = 32768, running_status: bool = True, deinterleave: bool = True,
+                 overlap_policy: str = "truncate"):
+        """
+        Open a streaming writer.
+
+        Args:
+            file: A path (parent directories are created) or a seekable file
+                  opened for binary writing.
+            ticks_per_quarternote: Tick resolution (default 960).
+            reorder_window: How far (in quarter notes) a note may start
+                            before the latest start seen so far (default 0:
+                            notes arrive in start order).
+            buffer_notes: Notes collected before encoding and writing.
+            running_status: Write note-offs as zero-velocity note-ons and leave
+                            out repeated status bytes (default True).
+            deinterleave: Resolve overlapping notes of the same channel and
+                          pitch with overlap_policy (default True).
+            overlap_policy: "truncate" (default), "merge" or "drop"; see
+                            overlaps.resolve_overlaps.
+
+        Raises:
+            ValueError: If reorder_window is negative, overlap_policy is not
+                        supported or the file is not seekable.
+        """
+        if reorder_window < 0:
+            raise ValueError(f"reorder_window is {reorder_window} it has to be at least 0")
+        if overlap_policy not in POLICIES:
+            raise ValueError(f"overlap_policy is {overlap_policy} it has to be one of {', '.join(POLICIES)}")
+        if isinstance(file, (str, Path)):
+            Path(file).parent.mkdir(parents=True, exist_ok=True)
+            self._file, self._owns_file = open(file, "wb"), True
+        else:
+            self._file, self._owns_file = file, False
+        if not self._file.seekable():
+            raise ValueError("StreamingMIDIWriter needs a seekable file to patch the track length")
+        self.ticks_per_quarternote = ticks_per_quarternote
+        self.running_status = running_status
+        self.deinterleave = deinterleave
+        self.overlap_policy = overlap_policy
+        self._window = int(reorder_window * ticks_per_quarternote)
+        self._buffer_notes = buffer_notes
+        self._incoming: List[Tuple[int, int, int, int, int, int]] = []
+        self._notes = np.zeros((0, 6), dtype=np.int64)
+        self._tempos: List[Tuple[int, int]] = []
+        self._latest_start = 0
+        # Every event before the horizon is written; last tick and status continue the delta times and running status.
+        self._horizon = 0
+        self._last_tick = 0
+        self._status = -1
+        self._length = 0
+        self.closed = False
+
+        self._file.write(b"MThd" + struct.pack(">LHHH", 6, 0, 1, ticks_per_quarternote))
+        self._file.write(b"MTrk")
+        self._length_position = self._file.tell()
+        self._file.write(b"\x00\x00\x00\x00")
+
+    def __enter__(self) -> "StreamingMIDIWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _to_ticks(self, time) -> int:
+        return to_ticks(time, self.ticks_per_quarternote)
+
+    def _check_start(self, tick: int) -> None:
+        if tick < self._horizon:
+            raise ValueError(f"event at tick {tick} arrived after tick {self._horizon} was written, "
+                             f"increase reorder_window")
+
+    def addTempo(self, track: int, time: float, tempo: float) -> None:
+        """Add a tempo change in BPM at a time in quarter notes."""
+        tick = self._to_ticks(time)
+        self._check_start(tick)
+        self._tempos.append((tick, int(60000000 / tempo)))
+
+    def addNote(self, track: int, channel: int, pitch: int, time: float, duration: float, volume: int) -> None:
+        """
+        Add one note; time and duration are in quarter notes.
+
+        Raises:
+            ValueError: If the note starts before notes that were already written.
+        """
+        start = self._to_ticks(time)
+        self._check_start(start)
+        self._latest_start = max(self._latest_start, start)
+        self._incoming.append((start, start + self._to_ticks(duration), channel, pitch, volume, _PENDING))
+        if len(self._incoming) >= self._buffer_notes:
+            self.flush()
+
+    def addNotes(self, track, channel, pitches, times, durations, volumes) -> None:
+        """
+        Add many notes at once; arguments are scalars or arrays that broadcast together.
+
+        Raises:
+            ValueError: If a note starts before notes that were already written.
+        """
+        ppq = self.ticks_per_quarternote
+        channel, pitches, starts, lengths, volumes = (column.ravel() for column in np.broadcast_arrays(
+            np.asarray(channel, dtype=np.int64), np.asarray(pitches, dtype=np.int64),
+            to_ticks(times, ppq), to_ticks(durations, ppq), np.asarray(volumes, dtype=np.int64)))
+        if len(starts) == 0:
+            return
+        self._check_start(int(starts.min()))
+        self._latest_start = max(self._latest_start, int(starts.max()))
+        rows = np.stack([starts, starts + lengths, channel, pitches, volumes, np.full_like(starts, _PENDING)], axis=1)
+        self._take_incoming()
+        self._notes = np.concatenate([self._notes, rows])
+        if len(self._notes) >= self._buffer_notes:
+            self.flush()
+
+    def _take_incoming(self) -> None:
+        if self._incoming:
+            self._notes = np.concatenate([self._notes, np.array(self._incoming, dtype=np.int64)])
+            self._incoming = []
+
+    def flush(self, final: bool = False) -> None:
+        """
+        Encode and write every buffered event that no later note can precede.
+
+        Args:
+            final: Write everything (used by close()).
+        """
+        self._take_incoming()
+        notes = self._notes
+        if final:
+            horizon = max(int(notes[:, _END].max(initial=0)), max((tick for tick, _ in self._tempos), default=0)) + 1
+        else:
+            horizon = self._latest_start - self._window
+            if horizon <= self._horizon:
+                return
+        # Started notes begin before every pending note, so resolving only changes their ends.
+        notes = notes.copy()
+        if self.deinterleave:
+            keep, notes[:, _END] = resolve_overlaps(notes[:, _CHANNEL], notes[:, _PITCH], notes[:, _START],
+                                                    notes[:, _END], self.overlap_policy)
+        else:
+            keep = notes[:, _END] > notes[:, _START]
+        # Notes that are not written (zero-length, truncated to nothing, merged or dropped) stay buffered until
+        # the horizon passes their end, so notes arriving later are resolved against them as in one pass.
+        notes[~keep, _STATE] = _DROPPED
+
+        sounding = notes[:, _STATE] != _DROPPED
+        ons = notes[sounding & (notes[:, _STATE] == _PENDING) & (notes[:, _START] < horizon)]
+        offs = notes[sounding & (notes[:, _END] < horizon)]
+        ticks = np.concatenate([offs[:, _END], ons[:, _START]])
+        is_on = np.repeat([0, 1], [len(offs), len(ons)])
+        channels = np.concatenate([offs[:, _CHANNEL], ons[:, _CHANNEL]])
+        velocities = np.concatenate([offs[:, _VELOCITY], ons[:, _VELOCITY]])
+        if self.running_status:
+            statuses = 0x90 | channels
+            velocities = np.where(is_on == 1, velocities, 0)
+        else:
+            statuses = np.where(is_on == 1, 0x90, 0x80) | channels
+        # Note-offs before note-ons at the same tick.
+        order = stable_argsort(ticks * 2 + is_on)
+        events = np.stack([ticks, statuses, np.concatenate([offs[:, _PITCH], ons[:, _PITCH]]), velocities],
+                          axis=1)[order]
+
+        tempos = sorted(tempo for tempo in self._tempos if tempo[0] < horizon)
+        self._tempos = [tempo for tempo in self._tempos if tempo[0] >= horizon]
+        start = 0
+        for tick, microseconds in tempos:
+            # Tempo changes come before notes at the same tick, and cancel running status.
+            stop = start + int(np.searchsorted(events[start:, 0], tick, side="left"))
+            self._write_events(events[start:stop])
+            codes, lengths = encode_variable_length(np.array([tick - self._last_tick]))
+            self._write(codes[0, :lengths[0]].tobytes() + b"\xff\x51\x03" + struct.pack(">L", microseconds)[1:])
+            self._last_tick, self._status = tick, -1
+            start = stop
+        self._write_events(events[start:])
+
+        notes[sounding & (notes[:, _START] < horizon), _STATE] = _STARTED
+        self._notes = notes[notes[:, _END] >= horizon]
+        self._horizon = horizon
+
+    def _write_events(self, events: np.ndarray) -> None:
+        if len(events) == 0:
+            return
+        self._write(encode_track_events(events[:, 0], events[:, 1], events[:, 2], events[:, 3], self.running_status,
+                                        self._last_tick, self._status))
+        self._last_tick = int(events[-1, 0])
+        self._status = int(events[-1, 1])
+
+    def _write(self, data) -> None:
+        self._file.write(data)
+        self._length += len(data)
+
+    def close(self) -> None:
+        """Write the remaining events, end the track and patch its length."""
+        if self.closed:
+            return
+        self.flush(final=True)
+        self._write(_END_OF_TRACK)
+        end = self._file.tell()
+        self._file.seek(self._length_position)
+        self._file.write(struct.pack(">L", self._length))
+        self._file.seek(end)
+        if self._owns_file:
+            self._file.close()
+        self.closed = True
@@ -0,0 +1,167 @@
+"""
+Integer tick timeline for the MIDI generators.
+
+Generators used to add up float durations note by note, so rounding errors
+built up over long pieces and notes could land a tick early when truncated.
+Timeline keeps musical time as exact fractions of a quarter note (pattern
+subdivisions such as triplets stay exact) and resolves each note to integer
+ticks at a configurable PPQ once. The resolved times are handed to the MIDI
+backends as fractions on the tick grid, which every backend turns into
+exactly those ticks.
+
+stable_argsort orders integer ticks with a least-significant-digit radix
+sort (counting sorts on 16-bit digits), which the writers use instead of
+comparison sorts when ordering events.
+"""
+
+import math
+from fractions import Fraction
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+TICKS_PER_QUARTERNOTE = 960
+# Largest denominator used when reading float times as fractions (0.1 -> 1/10).
+MAX_DENOMINATOR = 1000000
+# Float times this close below a tick boundary are read as that tick (float drift).
+_TICK_TOLERANCE = 1e-6
+
+
+def to_ticks(times, ticks_per_quarternote: int = TICKS_PER_QUARTERNOTE):
+    """
+    Convert times in quarter notes to integer ticks.
+
+    Ticks are truncated like midiutil does, but times a float rounding error
+    below a tick boundary count as that tick.
+
+    Returns:
+        An int for a single number, otherwise an int64 array.
+    """
+    if isinstance(times, Fraction):
+        return times.numerator * ticks_per_quarternote // times.denominator
+    if isinstance(times, (int, float, np.integer)):
+        return math.floor(times * ticks_per_quarternote + _TICK_TOLERANCE)
+    times = np.asarray(times, dtype=np.float64)
+    return np.floor(times * ticks_per_quarternote + _TICK_TOLERANCE).astype(np.int64)
+
+
+def stable_argsort(keys) -> np.ndarray:
+    """
+    Stable argsort of integers with a radix sort.
+
+    Sorts by 16-bit digits from the least significant one, each pass a
+    counting sort (NumPy's stable sort of uint16 keys), so n keys spanning a
+    range below 2**16 take one linear pass.
+
+    Args:
+        keys: Integer keys (ticks, or ticks combined with a tie-breaker).
+
+    Returns:
+        Indices that sort keys, keeping the order of equal keys.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.intp)
+    keys = keys - keys.min()
+    high = int(keys.max())
+    order = np.argsort((keys & 0xFFFF).astype(np.uint16), kind="stable")
+    shift = 16
+    while high >> shift:
+        digits = ((keys[order] >> shift) & 0xFFFF).astype(np.uint16)
+        order = order[np.argsort(digits, kind="stable")]
+        shift += 16
+    return order
+
+
+class Timeline:
+    """
+    Exact musical time resolved to integer ticks.
+
+    Attributes:
+        ticks_per_quarternote (int): Tick resolution (PPQ).
+
+    Example:
+        >>> timeline = Timeline(960)
+        >>> [timeline.ticks(offset) for offset, _ in timeline.subdivide(1, [1, 1, 1])]
+        [0, 320, 640]
+        >>> timeline.note(Fraction(1, 3), 0.25)
+        (Fraction(1, 3), Fraction(1, 4))
+    """
+
+    def __init__(self, ticks_per_quarternote: int = TICKS_PER_QUARTERNOTE):
+        """
+        Initialize a timeline.
+
+        Args:
+            ticks_per_quarternote: Tick resolution (default 960, as midiutil).
+
+        Raises:
+            ValueError: If ticks_per_quarternote is not positive.
+        """
+        if ticks_per_quarternote < 1:
+            raise ValueError(f"ticks_per_quarternote is {ticks_per_quarternote} it has to be at least 1")
+        self.ticks_per_quarternote = ticks_per_quarternote
+
+    @staticmethod
+    def fraction(time) -> Fraction:
+        """A time in quarter notes as an exact fraction; floats are read as the nearest simple fraction."""
+        if isinstance(time, Fraction):
+            return time
+        if isinstance(time, int):
+            return Fraction(time)
+        time = Fraction(float(time))
+        return time if time.denominator <= MAX_DENOMINATOR else time.limit_denominator(MAX_DENOMINATOR)
+
+    def ticks(self, time) -> int:
+        """The tick a time in quarter notes falls on (truncated, as midiutil)."""
+        time = self.fraction(time)
+        return time.numerator * self.ticks_per_quarternote // time.denominator
+
+    def time(self, ticks: int) -> Fraction:
+        """A tick as an exact time in quarter notes."""
+        return Fraction(ticks, self.ticks_per_quarternote)
+
+    def note(self, start, duration) -> Tuple[Fraction, Fraction]:
+        """
+        Resolve a note to the tick grid.
+
+        Start and end are resolved separately, so notes that follow each
+        other exactly in musical time also do so in ticks.
+
+        Returns:
+            (start, duration) in quarter notes, both whole numbers of ticks.
+        """
+        start = self.fraction(start)
+        start_tick = self.ticks(start)
+        return self.time(start_tick), self.time(self.ticks(start + self.fraction(duration)) - start_tick)
+
+    def positions(self, durations: Iterable, start=0) -> List[Fraction]:
+        """Exact start times of consecutive durations."""
+        position = self.fraction(start)
+        positions = []
+        for duration in durations:
+            positions.append(position)
+            position += self.fraction(duration)
+        return positions
+
+    def subdivide(self, duration, weights: Iterable) -> List[Tuple[Fraction, Fraction]]:
+        """
+        Split a duration in proportion to weights, exactly.
+
+        Args:
+            duration: Total duration in quarter notes.
+            weights: Relative lengths of the parts (e.g. a strum pattern [2, 1, 1]).
+
+        Returns:
+            (offset, length) of each part in quarter notes.
+        """
+        weights = [self.fraction(weight) for weight in weights]
+        total = sum(weights)
+        duration = self.fraction(duration)
+        parts = []
+        offset = Fraction(0)
+        for weight in weights:
+            length = duration * weight / total
+            parts.append((offset, length))
+            offset += length
+        return parts
@@ -1,6 +1,6 @@
 import random
-from pathlib import Path
-from midiutil import MIDIFile
+from src.music_theory.midi.smf import create_midi_file, write_midi_file
+from src.music_theory.midi.timeline import Timeline
 
 raag = {
     "aaroh": [1,2,4,5,"6b","7b"],
@@ -11,17 +11,27 @@ raag = {
 }
 
 def generate_melody(raag, length):
+    return list(iter_melody(raag, length))
+
+
+def iter_melody(raag, length):
+    """
+    Generate a raag melody one note at a time.
+
+    Yields the same (midi_note, duration) tuples as generate_melody, without
+    keeping the melody in memory, so very long melodies can be streamed
+    straight into a MIDI file.
+    """
     current_note_index = 0
-    melody = [(get_note_at_index(raag, current_note_index, "aaroh"), 1)]
+    yield get_note_at_index(raag, current_note_index, "aaroh"), 1
     for i in range(length):
         next_note_index, duration_next_note = generate_next_note(raag, current_note_index)
         if next_note_index > current_note_index:
-            melody.append((get_note_at_index(raag, next_note_index, "aaroh", 60), duration_next_note))
+            yield get_note_at_index(raag, next_note_index, "aaroh", 60), duration_next_note
         else:
-            melody.append((get_note_at_index(raag, next_note_index, "avroh", 60), duration_next_note))
+            yield get_note_at_index(raag, next_note_index, "avroh", 60), duration_next_note
 
         current_note_index = next_note_index
-    return melody
 
 
 def generate_next_note(raag, current_note_index) -> int:
@@ -120,41 +130,47 @@ def parse_solfege(note_spec):
     return interval
 
 
-def melody_to_midi(melody, output_file=None, tempo=180, volume=48, beat_duration=4, return_midi=False):
+def melody_to_midi(melody, output_file=None, tempo=180, volume=48, beat_duration=4, return_midi=False,
+                   backend="midiutil"):
     """
     Convert a melody to a MIDI file or MIDIFile object.
 
     Args:
-        melody: List of tuples (midi_note, duration) where duration is in whole notes
+        melody: Iterable of tuples (midi_note, duration) where duration is in whole notes
         output_file: Path to write the MIDI file (if None and return_midi=True, returns MIDIFile object)
         tempo: Tempo in BPM (default 180)
         volume: MIDI volume 0-127 (default 48)
         beat_duration: Beats per whole note (default 4, standard in 4/4 time)
         return_midi: If True and output_file is None, return MIDIFile object instead of writing
+        backend: MIDI writer, "midiutil" (default), "smf" for the array-backed SMFWriter,
+                 "stream" to write to output_file note by note, or "events" for a NoteEventBuffer
 
     Returns:
-        MIDIFile object if return_midi=True and output_file=None, otherwise None
+        MIDIFile (or backend) object if return_midi=True and output_file=None, otherwise None
     """
     track = 0
     channel = 0
     time = 0
 
-    midi = MIDIFile(1)
+    midi = create_midi_file(backend, output_file=output_file)
     midi.addTempo(track, 0, tempo)
 
-    current_time = 0
+    # Durations are resolved to ticks once each and added up as integers
+    timeline = Timeline()
+    beat_duration = timeline.fraction(beat_duration)
+    durations_in_ticks = {}
+    current_tick = 0
     for note_midi, duration in melody:
         # Convert whole note duration to beats
-        duration_in_beats = duration * beat_duration
+        if duration not in durations_in_ticks:
+            durations_in_ticks[duration] = timeline.ticks(timeline.fraction(duration) * beat_duration)
+        duration_in_ticks = durations_in_ticks[duration]
         will_pause = random.uniform(0, 1) < 0.8
-        midi.addNote(track, channel, note_midi, current_time, duration_in_beats, volume)
-        current_time += duration_in_beats
+        midi.addNote(track, channel, note_midi, timeline.time(current_tick), timeline.time(duration_in_ticks), volume)
+        current_tick += duration_in_ticks
 
     if output_file is not None:
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, "wb") as f:
-            midi.writeFile(f)
+        write_midi_file(midi, output_file)
         return None
     elif return_midi:
         return midi
@@ -163,7 +179,7 @@ def melody_to_midi(melody, output_file=None, tempo=180, volume=48, beat_duration
 
 
 def generate_raga_melody_prog(length=256, output_file=None, tempo=240, volume=80, 
-                               beat_duration=4, verbose=False):
+                               beat_duration=4, verbose=False, backend="midiutil"):
     """
     Convenience wrapper for generating complete raga melodies.
     
@@ -176,11 +192,17 @@ def generate_raga_melody_prog(length=256, output_file=None, tempo=240, volume=80
         volume: MIDI volume 0-127 (default 80)
         beat_duration: Beats per whole note (default 4)
         verbose: Print debug info (default False)
+        backend: MIDI writer, "midiutil" (default), "smf", "stream" or "events" (see melody_to_midi).
+                 With "stream" the melody is generated while it is written, so
+                 memory use does not grow with length.
     
     Returns:
         None if output_file is specified, otherwise MIDIFile object
     """
-    melody = generate_melody(raag, length)
+    if backend == "stream":
+        melody = iter_melody(raag, length)
+    else:
+        melody = generate_melody(raag, length)
     
     midi = melody_to_midi(
         melody,
@@ -188,7 +210,8 @@ def generate_raga_melody_prog(length=256, output_file=None, tempo=240, volume=80
         tempo=tempo,
         volume=volume,
         beat_duration=beat_duration,
-        return_midi=(output_file is None)
+        return_midi=(output_file is None),
+        backend=backend
     )
     
     if verbose and output_file:
@@ -0,0 +1,109 @@
+"""
+Unit tests for the Chord value object and progression rendering.
+
+Tests interning, hashing and interoperability with the list-based helpers,
+and batch rendering in ScaledChordProgression.
+"""
+
+import pickle
+import unittest
+
+import numpy as np
+
+from src.music_theory.core.chord import Chord, ScaledChordProgression
+from src.music_theory.core.notes import (
+    build_chord,
+    calculate_taxicab_distance_between_notes,
+    find_chord_voicing_by_common_tones,
+)
+
+
+class TestChord(unittest.TestCase):
+    """Tests for the Chord class."""
+
+    def test_build_matches_build_chord(self):
+        """Test that Chord.build wraps build_chord."""
+        chord = Chord.build("C4", "major", 1)
+        self.assertEqual(list(chord), build_chord(60, "major", 1))
+        self.assertEqual(chord.notes, (64, 67, 72))
+        self.assertEqual(chord.bass, 64)
+        self.assertEqual(chord.mask, 0b10010001)
+        self.assertEqual((chord.root, chord.chord_type, chord.inversion), (60, "major", 1))
+
+    def test_interning_and_hashing(self):
+        """Test that equal chords are the same object and usable as keys."""
+        chord = Chord.build(60, "minor_seventh")
+        self.assertIs(chord, Chord.build("C4", "minor_seventh"))
+        self.assertIs(chord, Chord([70, 67, 63, 60], 60, "minor_seventh", 0))
+        self.assertEqual({chord: "Cm7"}[Chord.build(60, "minor_seventh")], "Cm7")
+        self.assertIs(pickle.loads(pickle.dumps(chord)), chord)
+        with self.assertRaises(AttributeError):
+            chord.root = 62
+
+    def test_from_notes_names_chord(self):
+        """Test that exact chord types are recognized."""
+        self.assertIs(Chord.from_notes([72, 64, 67]), Chord.build(60, "major", 1))
+        unnamed = Chord.from_notes([60, 61])
+        self.assertIsNone(unnamed.chord_type)
+
+    def test_list_based_functions_accept_chords(self):
+        """Test that voice-leading helpers take and return Chord objects."""
+        c_major = Chord.build(60, "major")
+        g_major = Chord.build(67, "major")
+        self.assertEqual(calculate_taxicab_distance_between_notes(c_major, [62, 65, 69]), 5)
+        voiced = find_chord_voicing_by_common_tones(c_major, g_major)
+        self.assertIsInstance(voiced, Chord)
+        self.assertEqual(list(voiced), [59, 62, 67])
+        self.assertEqual((voiced.root, voiced.inversion), (55, 1))
+        self.assertEqual(find_chord_voicing_by_common_tones([60, 64, 67], [67, 71, 74]), [59, 62, 67])
+
+    def test_progression_as_chords(self):
+        """Test that generate_progression can return named Chord objects."""
+        cp = ScaledChordProgression(48).generate_progression([1, 5], "major", [[1, 3, 5, 7]] * 2, as_chords=True)
+        self.assertEqual([c.chord_type for c in cp], ["major_seventh", "dominant_seventh"])
+        self.assertEqual(list(cp[0]), [48, 52, 55, 59])
+
+
+class TestProgressionRendering(unittest.TestCase):
+    """Tests for scale-aware and batch progression rendering."""
+
+    def test_n_note_scales(self):
+        """Test inversions wrap by the scale length, not by seven."""
+        scp = ScaledChordProgression(60)
+        # C minor pentatonic: C Eb F G Bb; a "triad" on degree 1 is C F Bb.
+        self.assertEqual(scp.generate_progression([1], "minor_pentatonic"), [[60, 65, 70]])
+        self.assertEqual(scp.generate_progression([(1, 1)], "minor_pentatonic"), [[65, 70, 72]])
+        self.assertEqual(scp.generate_progression([(5, 2)], "major_blues"), [[75, 79, 84]])
+
+    def test_batch_matches_single(self):
+        """Test generate_progressions against generate_progression, padded and transposed."""
+        sequences = [[1, (4, 1), 5, (6, 0, "minor")], [2, 5, 1]]
+        chord_types = [[[1, 3, 5], [1, 3, 5], [1, 3, 5, 7], [1, 3, 5]], [[1, 3, 5, 7]] * 3]
+        rendered = ScaledChordProgression(48).generate_progressions(sequences, "major", chord_types,
+                                                                    base_notes=48 + np.arange(12))
+        self.assertEqual(rendered.shape, (12, 2, 4, 4))
+        for shift in (0, 7):
+            scp = ScaledChordProgression(48 + shift)
+            for index, degrees in enumerate(sequences):
+                for position, chord in enumerate(scp.generate_progression(degrees, "major", chord_types[index])):
+                    row = rendered[shift, index, position]
+                    self.assertEqual(row[row >= 0].tolist(), chord)
+        self.assertTrue((rendered[:, 1, 3] == -1).all())
+        shared = ScaledChordProgression(48).generate_progressions([[1, 4, 5], [2, 5]], chord_type=[1, 3, 5, 7])
+        self.assertEqual(shared.shape, (2, 3, 4))
+
+    def test_chord_types_must_match_degrees(self):
+        """Test mismatched chord_types raise instead of cutting the progression short."""
+        scp = ScaledChordProgression(48)
+        with self.assertRaises(ValueError):
+            scp.generate_progression([1, 4, 5], "major", [[1, 3, 5, 7]])
+        with self.assertRaises(ValueError):
+            scp.generate_progressions([[1, 4, 5], [2, 5]], "major", [[1, 3, 5, 7]])
+        with self.assertRaises(ValueError):
+            scp.generate_progressions([[1, 4, 5], [2, 5]], "major", [[[1, 3, 5]] * 3, [[1, 3, 5]] * 3])
+        with self.assertRaises(ValueError):
+            scp.generate_progressions([[1]], "major", [[[1, 3, 5]]], chord_type=[1, 3, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
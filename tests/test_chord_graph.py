@@ -0,0 +1,91 @@
+"""
+Unit tests for the chord graph.
+
+Tests path queries against exhaustive search over a small graph.
+"""
+
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from src.music_theory.core.chord_graph import ChordGraph
+from src.music_theory.core.key import Key
+from src.music_theory.core.voice_leading import voice_assignment
+
+
+class TestChordGraph(unittest.TestCase):
+    """Tests for ChordGraph.shortest_paths."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = ChordGraph(["major", "minor", "dominant_seventh"])
+
+    @staticmethod
+    def brute_force_costs(graph, start, goal, min_chords, max_chords):
+        """Costs of every valid path, by enumerating all routes of each length."""
+        starts, goals = graph.node_indices(start), graph.node_indices(goal)
+        names = [node[:2] for node in graph.nodes]
+        middle = np.array([name not in (names[starts[0]], names[goals[0]]) for name in names])
+        edges = graph.edges
+        costs = []
+        for length in range(min_chords, max_chords + 1):
+            axes = [starts] + [np.flatnonzero(middle)] * (length - 2) + [goals]
+            routes = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, length)
+            ids = np.array([names.index(name) for name in names])[routes]
+            valid = np.ones(len(routes), dtype=bool)
+            for i, j in combinations(range(length), 2):
+                # A chord may only repeat within a run of inversion changes, and no node repeats.
+                in_run = (ids[:, i:j + 1] == ids[:, i:i + 1]).all(axis=1)
+                valid &= (routes[:, i] != routes[:, j]) & ((ids[:, i] != ids[:, j]) | in_run)
+            routes = routes[valid]
+            costs.extend(edges[routes[:, :-1], routes[:, 1:]].sum(axis=1).tolist())
+        return sorted(costs)
+
+    def test_edges(self):
+        """Test that edge costs are voice assignment costs."""
+        voicings = self.graph.voicings
+        for a, b in [(0, 5), (7, 30), (41, 12)]:
+            self.assertEqual(self.graph.edges[a, b], voice_assignment(voicings[a], voicings[b]).cost)
+
+    def test_k_shortest_matches_exhaustive_search(self):
+        """Test the k cheapest paths of up to four chords."""
+        paths = self.graph.shortest_paths(("C", "major"), ("E", "minor"), max_chords=4, k=6)
+        self.assertEqual([path.cost for path in paths],
+                         self.brute_force_costs(self.graph, ("C", "major"), ("E", "minor"), 2, 4)[:6])
+        for path in paths:
+            self.assertEqual(path.chords[0][:2], (0, "major"))
+            self.assertEqual(path.chords[-1][:2], (4, "minor"))
+            self.assertEqual(path.cost, sum(voice_assignment(a, b).cost for a, b in zip(path.voicings, path.voicings[1:])))
+
+    def test_revisits_do_not_hide_paths(self):
+        """Test fixed-length paths of four and five chords, where the cheapest walks revisit chords."""
+        graph = ChordGraph(["major", "minor"])
+        for length in (4, 5):
+            expected = self.brute_force_costs(graph, ("C", "major"), ("E", "minor"), length, length)[:8]
+            for k in (1, 8):
+                paths = graph.shortest_paths(("C", "major"), ("E", "minor"), min_chords=length, max_chords=length, k=k)
+                self.assertEqual([path.cost for path in paths], expected[:k])
+                for path in paths:
+                    names = [chord[:2] for chord in path.chords]
+                    runs = [name for index, name in enumerate(names) if index == 0 or name != names[index - 1]]
+                    self.assertEqual(len(set(runs)), len(runs))
+
+    def test_constraints(self):
+        """Test chord type, key, length and step cost constraints."""
+        key = Key("C", "major")
+        paths = self.graph.shortest_paths(("C", "major"), ("G", "dominant_seventh"), min_chords=4, max_chords=4,
+                                          k=3, chord_types=["minor"], key=key, max_step_cost=4)
+        self.assertTrue(paths)
+        for path in paths:
+            self.assertEqual(len(path.chords), 4)
+            for root, chord_type, _ in path.chords[1:-1]:
+                self.assertEqual(chord_type, "minor")
+                self.assertIn(root, (2, 4, 9))
+            self.assertTrue(all(voice_assignment(a, b).cost <= 4 for a, b in zip(path.voicings, path.voicings[1:])))
+        with self.assertRaises(ValueError):
+            self.graph.shortest_paths(("C", "major"), ("C", "major_ninth"))
+
+
+if __name__ == '__main__':
+    unittest.main()
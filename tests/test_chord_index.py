@@ -0,0 +1,50 @@
+"""
+Unit tests for the chord index.
+
+Tests mask-based chord identification against the chord definitions.
+"""
+
+import unittest
+
+import numpy as np
+
+from src.music_theory.core.chord_index import (
+    chord_index,
+    identify_chords_batch,
+    pitch_class_mask,
+    pitch_class_masks,
+)
+from src.music_theory.core.notes import build_chord, identify_chords_from_notes
+
+
+class TestChordIndex(unittest.TestCase):
+    """Tests for ChordIndex lookups."""
+
+    def test_masks(self):
+        """Test single and batch mask encoding."""
+        self.assertEqual(pitch_class_mask([60, 64, 67]), 0b10010001)
+        masks = pitch_class_masks(np.array([[60, 64, 67, -1], [48, 52, 55, 72]]))
+        self.assertEqual(masks.tolist(), [0b10010001, 0b10010001])
+        self.assertEqual(pitch_class_masks([[60], {61, 73}]).tolist(), [1, 2])
+
+    def test_every_chord_finds_itself(self):
+        """Test that each built chord contains its own (root, type) entry."""
+        for root in (48, 61, 70):
+            for chord_type in ("major", "minor_seventh", "dominant_ninth", "6/9"):
+                matches = chord_index.identify(build_chord(root, chord_type))
+                self.assertIn((root % 12, chord_type), matches)
+
+    def test_batch_identification(self):
+        """Test padded arrays and agreement with identify_chords_from_notes."""
+        note_sets = np.array([[60, 64, 67, -1], [62, 65, 69, 72]])
+        result = identify_chords_batch(note_sets)
+        self.assertEqual(result[0], ((0, "major"),))
+        self.assertIn((2, "minor_seventh"), result[1])
+        self.assertIn((5, "major_sixth"), result[1])
+        named = identify_chords_from_notes({62, 65, 69, 72})
+        self.assertEqual(len(named), len(result[1]))
+        self.assertEqual(named["D4 minor_seventh"], build_chord(62, "minor_seventh"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for the chord symbol parser.
+
+Tests symbol parsing, slash basses and lead-sheet streaming.
+"""
+
+import os
+import tempfile
+import unittest
+
+from src.music_theory.core.chord import Chord
+from src.music_theory.core.chord_symbols import iter_lead_sheet, parse_chord_symbol
+from src.music_theory.core.notes import build_chord
+from src.music_theory.core.registry import registry
+
+
+class TestChordSymbols(unittest.TestCase):
+    """Tests for parse_chord_symbol and iter_lead_sheet."""
+
+    def test_symbols(self):
+        """Test roots, accidentals and qualities map to build_chord arguments."""
+        cases = {"F#m7b5": (66, "half_diminished_seventh", 0), "Bb13sus4": (70, "dominant_thirteenth_sus4", 0),
+                 "G7alt": (67, "altered_dominant", 0), "Ebmaj7": (63, "major_seventh", 0),
+                 "Am(maj7)": (69, "minor_major_seventh", 0), "C6/9": (60, "6/9", 0), "Bø7": (71,
+                 "half_diminished_seventh", 0), "Dbdim7": (61, "diminished_seventh", 0), "E": (64, "major", 0)}
+        for symbol, args in cases.items():
+            self.assertEqual(parse_chord_symbol(symbol).build_args(), args, symbol)
+        self.assertEqual(parse_chord_symbol("G7alt").notes(), [67, 71, 75, 77, 80, 82])
+        self.assertIs(parse_chord_symbol("Cmaj9/E"), parse_chord_symbol("Cmaj9/E"))
+        for symbol in ("H7", "Cmaj8", "C/", "c", "Cm7/X"):
+            with self.assertRaises(ValueError):
+                parse_chord_symbol(symbol)
+
+    def test_altered_symbols(self):
+        """Test altered, suspended, added-tone and power chords common in real-book charts."""
+        cases = {"C7b9": [60, 64, 67, 70, 73], "C7#9": [60, 64, 67, 70, 75], "C7#11": [60, 64, 67, 70, 78],
+                 "C7b13": [60, 64, 67, 70, 80], "C9sus4": [60, 65, 67, 70, 74], "C5": [60, 67],
+                 "Cadd2": [60, 62, 64, 67], "C7(b9,#11)": [60, 64, 67, 70, 73, 78], "Cmaj7#11": [60, 64, 67, 71, 78]}
+        for symbol, notes in cases.items():
+            self.assertEqual(parse_chord_symbol(symbol).notes(), notes, symbol)
+        self.assertEqual(parse_chord_symbol("C7b9").chord_type, "dominant_seventh")
+        # Alterations that spell a known chord type resolve to it.
+        self.assertEqual(parse_chord_symbol("Cadd2no3")[2:], ("sus2", 0, None, None))
+        chord = parse_chord_symbol("C7b9/E")
+        self.assertEqual((chord.inversion, chord.bass, chord.notes()[0]), (1, None, 64))
+        self.assertIsInstance(parse_chord_symbol("C7#9").to_progression_item(), Chord)
+        chords = [chord.symbol for _, chord in iter_lead_sheet(["| C7b9 | F9sus4 | Bb5 Ebadd2 | A7(#9,b13) |"])]
+        self.assertEqual(len(chords), 5)
+        for symbol in ("C7b", "Cadd", "C7#12", "Cnob5"):
+            with self.assertRaises(ValueError):
+                parse_chord_symbol(symbol)
+
+    def test_registered_chord_types(self):
+        """Test suffixes naming chord types added through the registry."""
+        with self.assertRaises(ValueError):
+            parse_chord_symbol("Ctest_symbols_quartal")
+        registry.register_chord("test_symbols_quartal", ["unison", "perfect_fourth", "minor_seventh"])
+        try:
+            chord = parse_chord_symbol("Dtest_symbols_quartal")
+            self.assertEqual((chord.chord_type, chord.notes()), ("test_symbols_quartal", [62, 67, 72]))
+        finally:
+            del registry.live["chords"]["test_symbols_quartal"]
+            registry.sync()
+
+    def test_slash_bass(self):
+        """Test chord-tone basses become inversions and other basses are added below."""
+        for symbol in ("Cmaj9/E", "D7/F#", "Ebø7/A", "Am/C"):
+            chord = parse_chord_symbol(symbol)
+            self.assertIsNone(chord.bass)
+            self.assertEqual(chord.notes(), build_chord(*chord.build_args()))
+            self.assertEqual(chord.notes()[0] % 12, parse_chord_symbol(symbol.split("/")[1]).root, symbol)
+        chord = parse_chord_symbol("Cmaj9/D")
+        self.assertEqual((chord.inversion, chord.bass), (0, 2))
+        self.assertEqual(chord.notes(), [50] + build_chord(60, "major_ninth"))
+        self.assertIsInstance(chord.to_progression_item(), Chord)
+
+    def test_lead_sheet(self):
+        """Test streaming a lead-sheet file with bar lines, repeats and line numbers."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tune.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("| Dm7 | G7 | Cmaj7 | % |\n\n| F#m7b5 B7alt | Em |\n")
+            chords = list(iter_lead_sheet(path))
+        self.assertEqual([line for line, _ in chords], [1, 1, 1, 1, 3, 3, 3])
+        self.assertEqual([chord.symbol for _, chord in chords], ["Dm7", "G7", "Cmaj7", "Cmaj7", "F#m7b5", "B7alt", "Em"])
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            list(iter_lead_sheet(["C F", "G Xm"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the columnar note event buffer.
+
+Tests vectorized transforms, emitting from generators and conversion to the MIDI backends.
+"""
+
+import io
+import unittest
+
+import numpy as np
+
+from src.music_theory.midi.compose import compose_chord_progression
+from src.music_theory.midi.events import NoteEventBuffer
+from src.music_theory.midi.smf import decode_notes
+
+
+def _notes(midi):
+    data = io.BytesIO()
+    midi.writeFile(data)
+    return decode_notes(data.getvalue())
+
+
+class TestNoteEventBuffer(unittest.TestCase):
+    """Tests for NoteEventBuffer."""
+
+    def test_transforms(self):
+        """Test transpose, shift, time and velocity scaling, slicing, concatenation and sorting."""
+        events = NoteEventBuffer([60, 64, 67], [2, 0, 1], 1, [100, 80, 120], tempos=[(0, 120)])
+        changed = events.transpose(-12).shift(1).scale_time(2).scale_velocity(1.2)
+        self.assertEqual(changed.pitch.tolist(), [48, 52, 55])
+        self.assertEqual(changed.start.tolist(), [6, 2, 4])
+        self.assertEqual(changed.duration.tolist(), [2, 2, 2])
+        self.assertEqual(changed.velocity.tolist(), [120, 96, 127])
+        self.assertEqual(changed.tempos, [(2, 120)])
+        self.assertEqual(events.pitch.tolist(), [60, 64, 67])
+        self.assertEqual(events.sorted().pitch.tolist(), [64, 67, 60])
+        self.assertEqual((events[1:] + events[0]).pitch.tolist(), [64, 67, 60])
+        self.assertEqual(len(events[events.pitch > 60]), 2)
+        self.assertEqual(len(NoteEventBuffer.concatenate([])), 0)
+        with self.assertRaises(ValueError):
+            events.transpose(70)
+        with self.assertRaises(ValueError):
+            events.scale_time(0)
+
+    def test_emit_and_convert(self):
+        """Test generators emit into a buffer that converts to the same notes on every backend."""
+        progression = [("C4", "major_seventh"), ("A3", "minor_seventh", 1), ("D4", "dominant_ninth")]
+        events = compose_chord_progression(progression, patterns=[3, 3, 2], loop_count=2, backend="events")
+        expected = _notes(compose_chord_progression(progression, patterns=[3, 3, 2], loop_count=2, backend="smf"))
+        self.assertIsInstance(events, NoteEventBuffer)
+        self.assertEqual(_notes(events), expected)
+        self.assertEqual(_notes(events.to_midi("midiutil")), expected)
+        events.addNotes(1, 0, [72, 74], [0, 1], 1, 90)
+        self.assertEqual(len(events), len(expected) + 2)
+        self.assertEqual(events.to_midi("smf").numTracks, 2)
+
+    def test_bulk(self):
+        """Test transforms over many notes keep every column aligned."""
+        rng = np.random.default_rng(3)
+        events = NoteEventBuffer(rng.integers(40, 80, 100000), rng.integers(0, 960000, 100000) / 960, 0.5, 80,
+                                 channel=rng.integers(0, 4, 100000))
+        ordered = events.transpose(5).sorted()
+        self.assertTrue(np.all(np.diff(ordered.start) >= 0))
+        order = np.argsort(events.start, kind="stable")
+        self.assertTrue(np.array_equal(ordered.pitch, events.pitch[order] + 5))
+        self.assertTrue(np.array_equal(ordered.channel, events.channel[order]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the Markov progression model.
+
+Tests learned transitions, backoff, output format and persistence.
+"""
+
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from src.music_theory.core.chord import ScaledChordProgression
+from src.music_theory.core.markov import MarkovProgressionModel
+
+
+class TestMarkovProgressionModel(unittest.TestCase):
+    """Tests for MarkovProgressionModel."""
+
+    def setUp(self):
+        self.corpus = [[1, 4, 5, 1], [1, 6, 4, 5], [2, 5, 1], [1, (4, 1), 5, (6, 0, "minor")]]
+        self.chord_types = [[[1, 3, 5]] * (len(p) - 1) + [[1, 3, 5, 7]] for p in self.corpus]
+        self.model = MarkovProgressionModel(order=2).fit(self.corpus, self.chord_types)
+
+    def test_learned_transitions(self):
+        """Test first chords and second-order transitions follow the corpus."""
+        samples = self.model.sample(count=4000, length=3, seed=0)
+        first = Counter(degrees[0] for degrees, _ in samples)
+        self.assertEqual(set(first), {1, 2})
+        self.assertAlmostEqual(first[1] / len(samples), 0.75, delta=0.03)
+        for degrees, _ in samples:
+            if degrees[:2] == [1, 4]:
+                self.assertEqual(degrees[2], 5)
+            if degrees[:2] == [2, 5]:
+                self.assertEqual(degrees[2], 1)
+
+    def test_backoff_and_output_format(self):
+        """Test long samples back off to shorter contexts and render with generate_progression."""
+        degrees, chord_types = self.model.sample(count=1, length=12, seed=1)[0]
+        self.assertEqual(len(degrees), 12)
+        self.assertTrue(all(type(d) in (int, tuple) for d in degrees))
+        progression = ScaledChordProgression(48).generate_progression(degrees, "major", chord_types)
+        self.assertEqual([len(chord) for chord in progression], [len(types) for types in chord_types])
+
+    def test_save_and_load(self):
+        """Test a reloaded model samples identically."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.npz")
+            self.model.save(path)
+            loaded = MarkovProgressionModel.load(path)
+        self.assertEqual(loaded.sample(count=20, length=6, seed=2), self.model.sample(count=20, length=6, seed=2))
+        with self.assertRaises(ValueError):
+            MarkovProgressionModel().sample()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Unit tests for the neo-Riemannian transforms.
+
+Tests the P/L/R tables against common-tone definitions and the vectorized walks.
+"""
+
+import unittest
+
+import numpy as np
+
+from src.music_theory.core.neo_riemannian import (
+    apply_transforms,
+    tonnetz_walks,
+    transform_table,
+    triad_index,
+    triad_name,
+    triad_voicings,
+    walk_to_progression,
+)
+from src.music_theory.core.notes import build_chord
+from src.music_theory.core.pitch_class_set import common_tone_count
+
+
+class TestTransforms(unittest.TestCase):
+    """Tests for the transform tables."""
+
+    def test_base_transforms(self):
+        """Test that P, L and R are involutions keeping two common tones."""
+        for transform in "PLR":
+            table = transform_table(transform)
+            self.assertEqual(table[table].tolist(), list(range(24)))
+            for index in range(24):
+                root, quality = triad_name(index)
+                image_root, image_quality = triad_name(int(table[index]))
+                self.assertNotEqual(quality, image_quality)
+                self.assertEqual(common_tone_count(build_chord(root, quality), build_chord(image_root, image_quality)), 2)
+
+    def test_compounds(self):
+        """Test named compound transforms on C major."""
+        c_major = triad_index("C4", "major")
+        self.assertEqual(triad_name(int(transform_table("R")[c_major])), (9, "minor"))
+        self.assertEqual(triad_name(int(transform_table("N")[c_major])), (5, "minor"))
+        self.assertEqual(triad_name(int(transform_table("H")[c_major])), (8, "minor"))
+        self.assertEqual(apply_transforms(c_major, ["PL"] * 3)[-1], c_major)
+        with self.assertRaises(ValueError):
+            transform_table("PX")
+
+
+class TestTonnetzWalks(unittest.TestCase):
+    """Tests for tonnetz_walks and its output helpers."""
+
+    def test_steps_follow_transforms(self):
+        """Test that every step is one of the chosen transforms."""
+        walks = tonnetz_walks(0, 20, count=500, transforms=["P", "L", "R"], seed=3)
+        self.assertEqual(walks.shape, (500, 21))
+        tables = np.stack([transform_table(t) for t in "PLR"])
+        self.assertTrue((tables[:, walks[:, :-1]] == walks[None, :, 1:]).any(axis=0).all())
+
+    def test_allowed_triads(self):
+        """Test constrained walks stay within the allowed triads."""
+        diatonic = [triad_index(root, quality) for root, quality in
+                    [(0, "major"), (2, "minor"), (4, "minor"), (5, "major"), (7, "major"), (9, "minor")]]
+        walks = tonnetz_walks(0, 30, count=200, transforms="PLRNSH", allowed=diatonic, seed=4)
+        self.assertTrue(np.isin(walks, diatonic).all())
+
+    def test_progression_output(self):
+        """Test MIDI output matches build_chord."""
+        walk = apply_transforms(0, "RLP")
+        self.assertEqual(triad_voicings(walk).tolist(), [build_chord(*item) for item in walk_to_progression(walk)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Unit tests for the Notes module.
+
+Tests note parsing and formatting, including the batch APIs.
+"""
+
+import unittest
+
+import numpy as np
+
+from src.music_theory.core.notes import (
+    note_string_to_midi,
+    note_strings_to_midi,
+    find_invalid_note_strings,
+    InvalidNoteError,
+    midi_to_note_string,
+    build_scale_note_strings,
+    build_chord,
+    voicing_cache_info,
+    clear_voicing_cache,
+)
+from src.music_theory.core.spelling import midi_to_note_strings, note_spelling_table
+
+
+class TestNoteParsing(unittest.TestCase):
+    """Tests for single and batch note-name parsing."""
+
+    def test_single_note_formats(self):
+        """Test sharps, flats, default octave and extended octaves."""
+        self.assertEqual(note_string_to_midi("C4"), 60)
+        self.assertEqual(note_string_to_midi("Fs3"), 54)
+        self.assertEqual(note_string_to_midi("C"), 60)
+        self.assertEqual(note_string_to_midi("Bb3"), 58)
+        self.assertEqual(note_string_to_midi("C#4"), 61)
+        self.assertEqual(note_string_to_midi("C-1"), 0)
+        self.assertEqual(note_string_to_midi("C10"), 132)
+
+    def test_single_invalid_note_raises(self):
+        """Test that an unknown note name raises ValueError."""
+        with self.assertRaises(ValueError):
+            note_string_to_midi("H4")
+
+    def test_batch_matches_single(self):
+        """Test that the batch parser agrees with note_string_to_midi."""
+        names = ["C4", "Bb3", "Eb3", "Fs", "gs2", "A10", "D-1"]
+        result = note_strings_to_midi(names)
+        self.assertEqual(result.dtype, np.int64)
+        self.assertEqual(result.tolist(), [note_string_to_midi(n) for n in names])
+
+    def test_batch_keeps_shape(self):
+        """Test that 2-D input gives 2-D output."""
+        result = note_strings_to_midi(np.array([["C4", "E4"], ["G4", "C5"]]))
+        self.assertEqual(result.tolist(), [[60, 64], [67, 72]])
+
+    def test_batch_reports_all_invalid(self):
+        """Test that every invalid entry is reported with its position."""
+        with self.assertRaises(InvalidNoteError) as context:
+            note_strings_to_midi(["C4", "H2", "Bb3", "Cx"])
+        self.assertEqual(context.exception.invalid_entries, [(1, "H2"), (3, "Cx")])
+        self.assertEqual(find_invalid_note_strings(["C4", "H2"]), [(1, "H2")])
+
+    def test_batch_invalid_value(self):
+        """Test that invalid_value fills bad entries instead of raising."""
+        result = note_strings_to_midi(["C4", "nope"], invalid_value=-1)
+        self.assertEqual(result.tolist(), [60, -1])
+
+
+class TestSpelling(unittest.TestCase):
+    """Tests for key-aware note spelling."""
+
+    def test_default_table_matches_legacy_names(self):
+        """Test that the default spelling keeps the 'Cs' sharp style."""
+        self.assertEqual(midi_to_note_string(61), "Cs4")
+        self.assertEqual(midi_to_note_string(127), "G9")
+        self.assertEqual(note_spelling_table()[60:63].tolist(), ["C4", "Cs4", "D4"])
+
+    def test_full_midi_range(self):
+        """Test that notes above 120 are accepted and 128 is rejected."""
+        self.assertEqual(midi_to_note_string(121), "Cs9")
+        with self.assertRaises(ValueError):
+            midi_to_note_string(128)
+        with self.assertRaises(ValueError):
+            midi_to_note_strings([60, 128])
+
+    def test_flat_keys(self):
+        """Test that flat keys spell black keys as flats."""
+        names = midi_to_note_strings([65, 67, 69, 70, 72], key="F major").tolist()
+        self.assertEqual(names, ["F4", "G4", "A4", "Bb4", "C5"])
+        self.assertEqual(midi_to_note_strings([61], key=("Bb", "minor")).tolist(), ["Db4"])
+
+    def test_one_letter_per_degree(self):
+        """Test enharmonic spellings that cross the octave boundary."""
+        self.assertEqual(midi_to_note_strings([60], key="Cs major").tolist(), ["Bs3"])
+        self.assertEqual(midi_to_note_strings([59], key="Gb major").tolist(), ["Cb4"])
+
+    def test_vectorized_shape_and_symbols(self):
+        """Test 2-D input and custom sharp symbol."""
+        names = midi_to_note_strings([[61, 66], [68, 73]], key="E major", sharp="#")
+        self.assertEqual(names.tolist(), [["C#4", "F#4"], ["G#4", "C#5"]])
+
+    def test_build_scale_note_strings_uses_key(self):
+        """Test that scale names follow the key signature."""
+        self.assertEqual(build_scale_note_strings(60, "major"), ['C4', 'D4', 'E4', 'F4', 'G4', 'A4', 'B4'])
+        self.assertEqual(build_scale_note_strings("F4", "major"), ['F4', 'G4', 'A4', 'Bb4', 'C5', 'D5', 'E5'])
+        self.assertEqual(build_scale_note_strings("Cs4", "major"), ['Cs4', 'Ds4', 'Es4', 'Fs4', 'Gs4', 'As4', 'Bs4'])
+        self.assertEqual(build_scale_note_strings(61, "major")[:2], ['Db4', 'Eb4'])
+
+
+class TestBuildChord(unittest.TestCase):
+    """Tests for build_chord and its voicing cache."""
+
+    def test_basic_chords(self):
+        """Test root position, inversion and doubling."""
+        self.assertEqual(build_chord("C4", "major"), [60, 64, 67])
+        self.assertEqual(build_chord(60, "major", inversion=1), [64, 67, 72])
+        self.assertEqual(build_chord("C4", "major_seventh"), [60, 64, 67, 71])
+        self.assertEqual(build_chord(60, "major", lower_octave_doubles=[0]), [48, 60, 64, 67])
+
+    def test_cache_is_transposition_invariant(self):
+        """Test that other roots reuse the cached shape."""
+        clear_voicing_cache()
+        build_chord(60, "minor_seventh", 2, openness=0.5)
+        misses = voicing_cache_info().misses
+        for root in range(30, 90):
+            build_chord(root, "minor_seventh", 2, openness=0.5)
+        info = voicing_cache_info()
+        self.assertEqual(info.misses, misses)
+        self.assertGreaterEqual(info.hits, 60)
+        clear_voicing_cache()
+        self.assertEqual(voicing_cache_info().currsize, 0)
+
+    def test_invalid_arguments(self):
+        """Test unsupported chord types and openness values."""
+        with self.assertRaises(ValueError):
+            build_chord(60, "not_a_chord")
+        with self.assertRaises(ValueError):
+            build_chord(60, "major", openness=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
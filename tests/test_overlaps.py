@@ -0,0 +1,109 @@
+"""
+Unit tests for the overlap and duplicate-note resolver.
+
+Tests the truncate, merge and drop policies and that every output path applies them the same way.
+"""
+
+import io
+import random
+import unittest
+from unittest import mock
+
+from midiutil import MIDIFile
+
+from src.music_theory.midi import smf
+from src.music_theory.midi.events import NoteEventBuffer
+from src.music_theory.midi.overlaps import resolve_overlaps
+from src.music_theory.midi.smf import create_midi_file, decode_notes
+from src.music_theory.midi.streaming import StreamingMIDIWriter
+
+
+def _notes(data):
+    return sorted(note[1:] for note in decode_notes(data))
+
+
+class TestResolveOverlaps(unittest.TestCase):
+    """Tests for resolve_overlaps and its use by the MIDI backends."""
+
+    def setUp(self):
+        # Pitch 60: a duplicate start, a note inside another and a chain; pitch 62 on two channels does not interact.
+        self.channels = [0, 0, 0, 0, 0, 0, 0, 1]
+        self.pitches = [60, 60, 60, 60, 60, 62, 62, 62]
+        self.starts = [0, 0, 100, 300, 350, 0, 100, 50]
+        self.ends = [200, 150, 120, 400, 500, 100, 200, 80]
+
+    def test_policies(self):
+        """Test truncate, merge and drop on duplicates, nested and chained notes."""
+        expected = {"truncate": ([False, True, True, True, True, True, True, True],
+                                 [0, 100, 120, 350, 500, 100, 200, 80]),
+                    "merge": ([True, False, False, True, False, True, True, True],
+                              [200, 150, 120, 500, 500, 100, 200, 80]),
+                    "drop": ([True, False, False, True, False, True, True, True],
+                             [200, 150, 120, 400, 500, 100, 200, 80])}
+        for policy, (keep, ends) in expected.items():
+            result = resolve_overlaps(self.channels, self.pitches, self.starts, self.ends, policy)
+            self.assertEqual(result[0].tolist(), keep, policy)
+            self.assertEqual([end for end, kept in zip(result[1].tolist(), keep) if kept],
+                             [end for end, kept in zip(ends, keep) if kept], policy)
+        self.assertEqual(resolve_overlaps([0], [60], [10], [10])[0].tolist(), [False])
+        with self.assertRaises(ValueError):
+            resolve_overlaps(self.channels, self.pitches, self.starts, self.ends, "ignore")
+        with self.assertRaises(ValueError):
+            create_midi_file("smf", overlap_policy="ignore")
+
+    def test_output_paths(self):
+        """Test midiutil, SMFWriter, the streaming writer and NoteEventBuffer resolve overlaps identically."""
+        rng = random.Random(11)
+        notes = sorted(((rng.randint(0, 1), rng.randint(60, 63), rng.randint(0, 200) / 4, rng.randint(0, 12) / 4,
+                         rng.randint(1, 127)) for _ in range(300)), key=lambda note: note[2])
+        for policy in ("truncate", "merge", "drop"):
+            results = []
+            for backend in ("midiutil", "smf", "stream", "events"):
+                data = io.BytesIO()
+                if backend == "stream":
+                    midi = StreamingMIDIWriter(data, buffer_notes=7, overlap_policy=policy)
+                else:
+                    midi = create_midi_file(backend, overlap_policy=policy)
+                for channel, pitch, time, duration, velocity in notes:
+                    midi.addNote(0, channel, pitch, time, duration, velocity)
+                if backend == "stream":
+                    midi.close()
+                elif backend == "events":
+                    midi.resolve_overlaps(policy).to_midi("smf").writeFile(data)
+                else:
+                    midi.writeFile(data)
+                results.append(_notes(data.getvalue()))
+            self.assertGreater(len(results[0]), 0)
+            for result in results[1:]:
+                self.assertEqual(result, results[0], policy)
+
+    def test_midiutil_deinterleaving(self):
+        """Test truncate matches midiutil's own deinterleaving for chained notes but not for nested ones."""
+        for notes, midiutil_notes, truncated in (([(0, 200), (100, 300)], [(0, 100), (100, 300)], [100, 300]),
+                                                 ([(0, 200), (100, 120)], [(0, 100), (100, 200)], [100, 120])):
+            midi = MIDIFile(1)
+            for start, end in notes:
+                midi.addNote(0, 0, 60, start / 960, (end - start) / 960, 80)
+            data = io.BytesIO()
+            midi.writeFile(data)
+            self.assertEqual([note[2:4] for note in _notes(data.getvalue())], midiutil_notes)
+            starts, ends = zip(*notes)
+            self.assertEqual(resolve_overlaps([0, 0], [60, 60], starts, ends)[1].tolist(), truncated)
+
+    def test_midiutil_internals_guard(self):
+        """Test the midiutil backend fails clearly when midiutil lacks the internals it rewrites."""
+        with mock.patch.object(smf, "_NOTE_ON_ATTRIBUTES", smf._NOTE_ON_ATTRIBUTES + ("missing_attribute",)):
+            with self.assertRaisesRegex(RuntimeError, "midiutil==1.2.3"):
+                create_midi_file("midiutil")
+
+    def test_event_buffer(self):
+        """Test NoteEventBuffer.resolve_overlaps keeps tracks apart and the original order."""
+        events = NoteEventBuffer([60, 60, 60], [1, 0, 0.5], [1, 1.5, 1], 80, track=[0, 0, 1])
+        resolved = events.resolve_overlaps("truncate")
+        self.assertEqual(resolved.start.tolist(), [1, 0, 0.5])
+        self.assertEqual(resolved.duration.tolist(), [1, 1, 1])
+        self.assertEqual(len(events.resolve_overlaps("drop")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Unit tests for PitchClassSet.
+
+Tests mask-backed set operations, set-class forms and the helpers that
+accept pitch class sets.
+"""
+
+import unittest
+
+from src.music_theory.core.notes import are_same_pitch_classes, have_same_inversion
+from src.music_theory.core.pitch_class_set import PitchClassSet, common_tone_count
+
+
+class TestPitchClassSet(unittest.TestCase):
+    """Tests for the PitchClassSet class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.c_major = PitchClassSet([60, 64, 67])
+        self.g_major = PitchClassSet([67, 71, 74])
+
+    def test_construction_and_iteration(self):
+        """Test that notes reduce to ascending pitch classes."""
+        self.assertEqual(list(self.c_major), [0, 4, 7])
+        self.assertEqual(len(self.c_major), 3)
+        self.assertIn(76, self.c_major)
+        self.assertEqual(PitchClassSet.from_mask(self.c_major.mask), self.c_major)
+
+    def test_immutable_and_hashable(self):
+        """Test that attributes cannot be set and equal sets hash alike."""
+        with self.assertRaises(AttributeError):
+            self.c_major.mask = 0
+        self.assertEqual(len({self.c_major, PitchClassSet([48, 52, 55])}), 1)
+
+    def test_operations(self):
+        """Test transposition, inversion and boolean operations."""
+        self.assertEqual(self.c_major.transpose(7), self.g_major)
+        self.assertEqual(list(self.c_major.invert()), [0, 5, 8])
+        self.assertEqual(list(self.c_major | self.g_major), [0, 2, 4, 7, 11])
+        self.assertEqual(list(self.c_major & self.g_major), [7])
+        self.assertEqual(self.c_major.common_tones(self.g_major), 1)
+        self.assertEqual(common_tone_count([60, 64, 67], [64, 67, 71]), 2)
+        self.assertTrue(self.c_major.is_transposition_of(self.g_major))
+
+    def test_set_class_forms(self):
+        """Test normal and prime forms."""
+        self.assertEqual(PitchClassSet([7, 11, 2, 5]).normal_form(), (11, 2, 5, 7))
+        self.assertEqual(self.c_major.prime_form(), (0, 3, 7))
+        self.assertEqual(PitchClassSet([60, 63, 67]).prime_form(), (0, 3, 7))
+        self.assertEqual(PitchClassSet([0, 4, 8]).prime_form(), (0, 4, 8))
+
+    def test_helpers_accept_sets(self):
+        """Test that the list-based helpers take PitchClassSets directly."""
+        self.assertTrue(are_same_pitch_classes(self.c_major, [72, 76, 79]))
+        self.assertFalse(are_same_pitch_classes(self.c_major, self.g_major))
+        self.assertTrue(have_same_inversion(self.c_major, PitchClassSet([48, 52, 55])))
+
+
+if __name__ == '__main__':
+    unittest.main()
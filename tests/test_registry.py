@@ -0,0 +1,117 @@
+"""
+Unit tests for the definition registry.
+
+Tests versioned snapshots, change tracking and cache invalidation of derived tables.
+"""
+
+import unittest
+
+from src.music_theory.core.chord_graph import ChordGraph, chord_graph
+from src.music_theory.core.chord_index import ChordIndex, chord_index, pitch_class_mask
+from src.music_theory.core.constants import chords
+from src.music_theory.core.notes import build_chord
+from src.music_theory.core.registry import TypeRegistry, registry
+from src.music_theory.core.scale_index import scale_index
+from src.music_theory.core.scale_table import scale_table
+
+
+class TestTypeRegistry(unittest.TestCase):
+    """Tests for TypeRegistry on its own definitions."""
+
+    def setUp(self):
+        self.registry = TypeRegistry({"major": ["unison", "major_third", "perfect_fifth"]},
+                                     {"major": [2, 2, 1, 2, 2, 2, 1]},
+                                     {"unison": 0, "major_third": 4, "perfect_fifth": 7, "tritone": 6})
+
+    def test_versions_and_snapshots(self):
+        """Test a batch is one version, snapshots are immutable and the live dicts follow."""
+        before = self.registry.snapshot("chords")
+        self.registry.register_chords({"lydian": ["unison", "major_third", "tritone"],
+                                       "power": ["unison", "perfect_fifth"]})
+        after = self.registry.snapshot("chords")
+        self.assertEqual((before.version, after.version), (0, 1))
+        self.assertNotIn("power", before.definitions)
+        self.assertEqual(after.definitions["power"], ("unison", "perfect_fifth"))
+        self.assertEqual(self.registry.live["chords"]["power"], ["unison", "perfect_fifth"])
+        with self.assertRaises(TypeError):
+            after.definitions["power"] = ("unison",)
+        self.registry.register_chord("power", ["unison", "perfect_fifth"])
+        self.assertEqual(self.registry.version("chords"), 1)
+
+    def test_changes_and_errors(self):
+        """Test changes_since, interval redefinitions, direct edits and invalid definitions."""
+        self.registry.register_chord("power", ["unison", "perfect_fifth"])
+        self.registry.register_chord("power", ["unison", "tritone"], replace=True)
+        self.registry.register_chord("lydian", ["unison", "major_third", "tritone"])
+        changes = self.registry.changes_since("chords", 1)
+        self.assertEqual((changes.added, changes.replaced), ({"lydian"}, {"power"}))
+        self.registry.register_interval("tritone", 6)
+        self.registry.register_interval("tritone", 5, replace=True)
+        self.assertEqual(self.registry.changes_since("chords", 3).replaced, {"power", "lydian"})
+        self.registry.live["scales"]["whole_tone"] = [2] * 6
+        self.assertEqual(self.registry.changes_since("scales", 0).added, {"whole_tone"})
+        for register, arguments in ((self.registry.register_chord, ("major", ["unison"])),
+                                    (self.registry.register_chord, ("bad", ["unison", "ninth"])),
+                                    (self.registry.register_scale, ("bad", [2, 0, 3])),
+                                    (self.registry.register_interval, ("bad", -1))):
+            with self.assertRaises(ValueError):
+                register(*arguments)
+
+
+class TestDerivedTables(unittest.TestCase):
+    """Tests that library tables follow the library registry."""
+
+    def tearDown(self):
+        for kind in ("chords", "scales"):
+            for name in [name for name in registry.live[kind] if name.startswith("test_registry_")]:
+                del registry.live[kind][name]
+        registry.sync()
+
+    def test_added_and_redefined_chords(self):
+        """Test the chord index merges new chord types and the voicing cache follows redefinitions."""
+        chord_index.table
+        registry.register_chords({"test_registry_cluster": ["unison", "minor_second", "major_second"],
+                                  "test_registry_quartal": ["unison", "perfect_fourth", "minor_seventh"]})
+        self.assertIn("test_registry_cluster", chords)
+        self.assertIn((2, "test_registry_cluster"), chord_index.exact_matches(pitch_class_mask([62, 63, 64])))
+        registry.register_chord("test_registry_augmented", ["unison", "major_third", "minor_sixth"])
+        fresh = ChordIndex()
+        self.assertEqual(chord_index.table, fresh.table)
+        augmented = pitch_class_mask([60, 64, 68])
+        self.assertEqual(chord_index.exact_matches(augmented), fresh.exact_matches(augmented))
+        self.assertEqual(build_chord(60, "test_registry_quartal"), [60, 65, 70])
+        registry.register_chord("test_registry_quartal", ["unison", "perfect_fourth", "major_sixth"], replace=True)
+        self.assertEqual(build_chord(60, "test_registry_quartal"), [60, 65, 69])
+        self.assertIn((0, "test_registry_quartal"), chord_index.exact_matches(pitch_class_mask([60, 65, 69])))
+
+    def test_chord_graph_follows_chords(self):
+        """Test chord graphs pick up new chord types and revoice redefined ones."""
+        chord_graph.nodes
+        registry.register_chord("test_registry_house", ["unison", "major_second", "perfect_fifth"])
+        house = chord_graph.node_indices((0, "test_registry_house"))
+        self.assertEqual([chord_graph.voicings[i] for i in house], [[60, 62, 67], [62, 67, 72], [55, 60, 62]])
+        graph = ChordGraph(["major", "test_registry_house"])
+        graph.edges
+        registry.register_chord("test_registry_house", ["unison", "perfect_fourth", "perfect_fifth"], replace=True)
+        self.assertEqual(graph.voicings[graph.node_indices((0, "test_registry_house", 0))[0]], [60, 65, 67])
+        self.assertEqual(graph.edges.tolist(), ChordGraph(["major", "test_registry_house"]).edges.tolist())
+
+    def test_added_and_redefined_scales(self):
+        """Test the scale table and index pick up new and redefined scale types."""
+        registry.register_scale("test_registry_scale", [3, 3, 3, 3])
+        self.assertEqual(scale_table.scale(60, "test_registry_scale").tolist(), [60, 63, 66, 69])
+        self.assertIn((0, "test_registry_scale"), scale_index.find([60, 63, 66, 69]))
+        registry.register_scale("test_registry_scale", [4, 4, 4], replace=True)
+        self.assertEqual(scale_table.scale(60, "test_registry_scale").tolist(), [60, 64, 68])
+        self.assertEqual(scale_index.find([60, 64, 68])[0], (0, "test_registry_scale"))
+
+    def test_removed_definitions(self):
+        """Test definitions deleted from the constants dicts drop out of the derived tables."""
+        registry.register_chord("test_registry_power", ["unison", "perfect_fifth"])
+        self.assertIn((0, "test_registry_power"), chord_index.identify([60, 67]))
+        del chords["test_registry_power"]
+        self.assertEqual(chord_index.identify([60, 67]), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
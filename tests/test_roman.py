@@ -0,0 +1,57 @@
+"""
+Unit tests for the Roman numeral compiler.
+
+Tests symbol parsing, key application and bulk rendering.
+"""
+
+import unittest
+
+import numpy as np
+
+from src.music_theory.core.chord import ScaledChordProgression
+from src.music_theory.core.notes import build_chord
+from src.music_theory.core.roman import compile_roman, roman_progression
+
+
+class TestRomanNumerals(unittest.TestCase):
+    """Tests for compile_roman and RomanPlan."""
+
+    def test_symbols(self):
+        """Test qualities, inversions, secondary and borrowed chords in C major."""
+        progression = roman_progression("ii7 - V7/V - V7 - I6 | bVI(minor)", "C4")
+        self.assertEqual(progression, [(62, "minor_seventh", 0), (62, "dominant_seventh", 0),
+                                       (67, "dominant_seventh", 0), (60, "major", 1), (68, "major", 0)])
+        progression = roman_progression("viiø7 V65 iv64 IVmaj7 vii°7/ii V/V/V VI(minor) V42", 60)
+        self.assertEqual(progression, [(71, "half_diminished_seventh", 0), (67, "dominant_seventh", 1),
+                                       (65, "minor", 2), (65, "major_seventh", 0), (61, "diminished_seventh", 0),
+                                       (69, "major", 0), (68, "major", 0), (67, "dominant_seventh", 3)])
+
+    def test_keys_and_errors(self):
+        """Test minor keys, plan caching and invalid symbols."""
+        self.assertIs(compile_roman("i iv V7 i"), compile_roman("i iv V7 i"))
+        self.assertEqual([root for root, _, _ in roman_progression("i iv V7 III", "A3", "minor")], [57, 62, 64, 60])
+        for text in ("I X", "V11", "VI", "I(lydianish)"):
+            with self.assertRaises(ValueError):
+                roman_progression(text, 60, "major_pentatonic" if text == "VI" else "major")
+
+    def test_render_in_all_keys(self):
+        """Test bulk rendering matches build_chord in every key."""
+        plan = compile_roman("I - vi7 - ii65 - V7/V - V")
+        rendered = plan.render(60 + np.arange(12))
+        self.assertEqual(rendered.shape, (12, 5, 4))
+        for shift in (0, 5, 11):
+            for row, item in zip(rendered[shift], plan.progression(60 + shift)):
+                self.assertEqual(row[row >= 0].tolist(), build_chord(*item))
+
+    def test_scale_degrees(self):
+        """Test diatonic plans convert to generate_progression input."""
+        degrees, chord_types = compile_roman("I vi ii7 V7").scale_degrees()
+        chords = ScaledChordProgression(60).generate_progression(degrees, "major", chord_types)
+        self.assertEqual(chords, [build_chord(60, "major"), build_chord(69, "minor"),
+                                  build_chord(62, "minor_seventh"), build_chord(67, "dominant_seventh")])
+        with self.assertRaises(ValueError):
+            compile_roman("I V/V").scale_degrees()
+
+
+if __name__ == '__main__':
+    unittest.main()
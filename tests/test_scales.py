@@ -0,0 +1,134 @@
+"""
+Unit tests for the scale table, Key and scale index.
+
+Tests the precomputed ScaleTable against the list-based scale helpers, the
+Key degree and snapping tables, and scale identification.
+"""
+
+import unittest
+
+import numpy as np
+
+from src.music_theory.core.constants import scales
+from src.music_theory.core.notes import build_scale_midi, get_scale_degree, build_diatonic_chord
+from src.music_theory.core.key import Key
+from src.music_theory.core.scale_index import scale_index, find_scales_batch
+from src.music_theory.core.scale_table import ScaleTable
+
+
+class TestScaleTable(unittest.TestCase):
+    """Tests for the ScaleTable class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.table = ScaleTable()
+
+    def test_scale_matches_step_sums(self):
+        """Test every scale type against the cumulative step definition."""
+        for scale_type, steps in scales.items():
+            expected = [60 + sum(steps[:i]) for i in range(len(steps))]
+            self.assertEqual(self.table.scale(60, scale_type).tolist(), expected)
+            self.assertEqual(build_scale_midi(60, scale_type), expected)
+
+    def test_degrees_wrap_octaves(self):
+        """Test degrees past the scale length and below the root."""
+        self.assertEqual(int(self.table.degree(60, "major", 8)), 72)
+        self.assertEqual(int(self.table.degree(60, "major", 0)), 59)
+        self.assertEqual(get_scale_degree("C4", "minor_pentatonic", 6), 72)
+
+    def test_diatonic_chords(self):
+        """Test diatonic chord stacking."""
+        self.assertEqual(build_diatonic_chord("C4", "major", 1, 3), [60, 64, 67])
+        self.assertEqual(build_diatonic_chord("C4", "major", 2, 4), [62, 65, 69, 72])
+
+    def test_batch_scales(self):
+        """Test one scale per root in a single call."""
+        result = self.table.build_scales(np.arange(48, 60), "dorian", octaves=2)
+        self.assertEqual(result.shape, (12, 14))
+        self.assertEqual(result[2].tolist(), build_scale_midi(50, "dorian") + build_scale_midi(62, "dorian"))
+
+    def test_batch_diatonic_chords_broadcast(self):
+        """Test every degree in every key with broadcasting."""
+        roots = np.arange(60, 72)[:, None]
+        degrees = np.arange(1, 8)[None, :]
+        result = self.table.build_diatonic_chords(roots, "major", degrees, 4)
+        self.assertEqual(result.shape, (12, 7, 4))
+        self.assertEqual(result[7, 4].tolist(), build_diatonic_chord(67, "major", 5, 4))
+
+    def test_unsupported_scale(self):
+        """Test that unknown scale types raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.table.scale(60, "not_a_scale")
+
+
+class TestKey(unittest.TestCase):
+    """Tests for the Key class."""
+
+    def test_degree_tables(self):
+        """Test degree and octave lookup relative to the tonic."""
+        degrees, octaves = Key("A", "minor").degree_of([57, 60, 61])
+        self.assertEqual(degrees.tolist(), [1, 3, 0])
+        self.assertEqual(octaves.tolist(), [3, 3, 3])
+        self.assertEqual(Key("C", "major").note(5), get_scale_degree(60, "major", 5))
+
+    def test_degree_round_trip(self):
+        """Test that every in-key MIDI note maps back to itself."""
+        key = Key("Eb", "dorian")
+        pitches = np.arange(128)[key.contains(np.arange(128))]
+        degrees, octaves = key.degree_of(pitches)
+        self.assertEqual(key.note(degrees, octaves).tolist(), pitches.tolist())
+
+    def test_snap_to_scale(self):
+        """Test nearest, directional and tie-breaking snapping."""
+        key = Key("C", "major")
+        self.assertEqual(key.snap_to_scale([61, 66, 70]).tolist(), [60, 65, 69])
+        self.assertEqual(key.snap_to_scale([61, 66, 70], prefer="up").tolist(), [62, 67, 71])
+        self.assertEqual(key.snap_to_scale([61], direction="up").tolist(), [62])
+        pentatonic = Key("C", "major_pentatonic")
+        self.assertEqual(pentatonic.snap_to_scale([65, 66]).tolist(), [64, 67])
+
+    def test_snap_keeps_shape(self):
+        """Test that snapping keeps array shape and in-key notes unchanged."""
+        key = Key("G", "mixolydian")
+        pitches = np.random.default_rng(0).integers(0, 128, size=(50, 20))
+        snapped = key.snap_to_scale(pitches)
+        self.assertEqual(snapped.shape, pitches.shape)
+        self.assertTrue(key.contains(snapped).all())
+        self.assertLessEqual(np.abs(snapped - pitches).max(), 2)
+
+    def test_out_of_range(self):
+        """Test that pitches outside 0-127 raise ValueError."""
+        with self.assertRaises(ValueError):
+            Key("C").snap_to_scale([128])
+
+
+class TestScaleIndex(unittest.TestCase):
+    """Tests for the ScaleIndex lookups."""
+
+    def test_find_containing_scales(self):
+        """Test that every returned scale contains the notes and none are missed."""
+        notes = [60, 64, 67, 69]
+        found = scale_index.find(notes)
+        expected = {(root, scale_type) for scale_type in scales for root in range(12)
+                    if {n % 12 for n in notes} <= {n % 12 for n in build_scale_midi(root, scale_type)}}
+        self.assertEqual(set(found), expected)
+        self.assertIn(found[0], [(0, "major_pentatonic"), (9, "minor_pentatonic")])
+
+    def test_batch_matches_single(self):
+        """Test padded batch queries."""
+        note_sets = np.array([[60, 62, 64, -1], [57, 60, 64, 67]])
+        result = find_scales_batch(note_sets)
+        self.assertEqual(result[0], scale_index.find([60, 62, 64]))
+        self.assertEqual(result[1], scale_index.find([57, 60, 64, 67]))
+
+    def test_rank_allows_missing_notes(self):
+        """Test ranking by missing then extra notes."""
+        ranked = scale_index.rank([60, 61, 62, 63], top=2)
+        self.assertEqual([r[2] for r in ranked], [1, 1])
+        order, missing, extra = scale_index.rank_batch([[60, 63, 67, 70]], top=1)
+        self.assertEqual(scale_index.entries[order[0, 0]], (0, "minor_pentatonic"))
+        self.assertEqual((missing[0, 0], extra[0, 0]), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for the array-backed Standard MIDI File writer.
+
+Tests variable-length encoding and that every generator writes the same notes with either backend.
+"""
+
+import io
+import unittest
+
+import numpy as np
+
+from src.music_theory.guitar.synthesizer import GuitarChordPattern, synthesize_guitar_progression
+from src.music_theory.midi.arpeggio import generate_arpeggio_progression
+from src.music_theory.midi.compose import compose_chord_progression
+from src.music_theory.midi.smf import SMFWriter, create_midi_file, decode_notes, encode_variable_length
+from src.music_theory.raga.raga_generator import melody_to_midi
+
+
+def _notes(midi):
+    data = io.BytesIO()
+    midi.writeFile(data)
+    return decode_notes(data.getvalue())
+
+
+class TestSMFWriter(unittest.TestCase):
+    """Tests for SMFWriter and the generator backends."""
+
+    def test_variable_length_quantities(self):
+        """Test bulk encoding against the examples of the SMF specification."""
+        values = np.array([0, 0x40, 0x7F, 0x80, 0x2000, 0x3FFF, 0x4000, 0x100000, 0x1FFFFF, 0x200000, 0xFFFFFFF])
+        codes, lengths = encode_variable_length(values)
+        encoded = [bytes(code[:length].tolist()).hex() for code, length in zip(codes, lengths)]
+        self.assertEqual(encoded, ["00", "40", "7f", "8100", "c000", "ff7f", "818000", "c08000", "ffff7f",
+                                   "81808000", "ffffff7f"])
+
+    def test_writer(self):
+        """Test bytes, running status, bulk notes and deinterleaving of overlapping notes."""
+        midi = SMFWriter(1)
+        midi.addTempo(0, 0, 120)
+        midi.addNotes(0, 0, [60, 64], [0, 0], 1, 80)
+        data = midi.to_bytes()
+        self.assertEqual(data[:14], b"MThd\x00\x00\x00\x06\x00\x01\x00\x02\x03\xc0")
+        # Tempo track, then note-ons (one status byte) and note-offs as zero-velocity note-ons.
+        self.assertIn(bytes.fromhex("00903c50" "004050" "87403c00" "004000" "00ff2f00"), data)
+        midi = SMFWriter(1)
+        for pitch, time, duration in ((60, 0, 4), (60, 2, 4), (62, 1, 1), (62, 1, 2)):
+            midi.addNote(0, 0, pitch, time, duration, 90)
+        self.assertEqual(_notes(midi), [(1, 0, 60, 0, 1920, 90), (1, 0, 60, 1920, 5760, 90),
+                                        (1, 0, 62, 960, 2880, 90)])
+        with self.assertRaises(ValueError):
+            create_midi_file("wav")
+
+    def test_note_ranges(self):
+        """Test notes outside their track, channel, pitch or velocity range are rejected."""
+        midi = SMFWriter(2)
+        for track, channel, pitch, volume in ((2, 0, 60, 80), (0, 16, 60, 80), (0, 0, 128, 80), (0, 0, -1, 80),
+                                              (0, 0, 60, 200)):
+            with self.assertRaises(ValueError):
+                midi.addNote(track, channel, pitch, 0, 1, volume)
+            with self.assertRaises(ValueError):
+                midi.addNotes(track, channel, [60, pitch], [0, 1], 1, volume)
+        midi.addNotes([0, 1], 15, [0, 127], 0, 1, [0, 127])
+        self.assertEqual(len(midi.note_array()), 2)
+
+    def test_generator_backends(self):
+        """Test the four generators write the same notes with midiutil and smf."""
+        progression = [("C4", "major_seventh"), ("A3", "minor_seventh", 1), ("D4", "dominant_ninth")]
+        patterns = [GuitarChordPattern([-1, 3, 2, 0, 1, 0], 4, [2, 1, 1]),
+                    GuitarChordPattern([3, 2, 0, 0, 0, 3], 4, [1, 1, 2])]
+        melody = [(60, 0.25), (62, 0.125), (63, 1 / 3), (67, 0.25)]
+        for render in (lambda backend: compose_chord_progression(progression, patterns=[3, 3, 2], loop_count=2,
+                                                                 backend=backend),
+                       lambda backend: generate_arpeggio_progression(progression[::2], octaves_to_span=2,
+                                                                     backend=backend),
+                       lambda backend: synthesize_guitar_progression(patterns, num_loops=2, backend=backend),
+                       lambda backend: melody_to_midi(melody, return_midi=True, backend=backend)):
+            expected = _notes(render("midiutil"))
+            self.assertGreater(len(expected), 0)
+            self.assertEqual(_notes(render("smf")), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
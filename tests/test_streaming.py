@@ -0,0 +1,124 @@
+"""
+Unit tests for the streaming MIDI writer.
+
+Tests that streamed files match SMFWriter, the reorder window and the generators' "stream" backend.
+"""
+
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from src.music_theory.midi.compose import compose_chord_progression
+from src.music_theory.midi.smf import SMFWriter, create_midi_file, decode_notes
+from src.music_theory.midi.streaming import StreamingMIDIWriter
+from src.music_theory.raga.raga_generator import generate_raga_melody_prog, melody_to_midi
+
+
+def _notes(data):
+    # Streamed files have a single track; compare without the track number.
+    return [note[1:] for note in decode_notes(data)]
+
+
+class TestStreamingMIDIWriter(unittest.TestCase):
+    """Tests for StreamingMIDIWriter."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.notes, time = [], 0
+        for _ in range(2000):
+            duration = rng.choice([0.25, 0.5, 1])
+            self.notes.append((rng.randint(40, 80), time, duration))
+            time += duration
+        reference = SMFWriter(1)
+        for pitch, time, duration in self.notes:
+            reference.addNote(0, 0, pitch, time, duration, 80)
+        self.expected = _notes(reference.to_bytes())
+
+    def test_matches_smf_writer(self):
+        """Test small buffers, bulk notes, tempo changes and the patched track length."""
+        data = io.BytesIO()
+        with StreamingMIDIWriter(data, buffer_notes=64) as midi:
+            midi.addTempo(0, 0, 120)
+            for index, (pitch, time, duration) in enumerate(self.notes):
+                midi.addNote(0, 0, pitch, time, duration, 80)
+                if index == 100:
+                    midi.addTempo(0, 60, 90)
+        data = data.getvalue()
+        self.assertEqual(data[:14], b"MThd\x00\x00\x00\x06\x00\x00\x00\x01\x03\xc0")
+        self.assertEqual(struct.unpack(">L", data[18:22])[0], len(data) - 22)
+        self.assertTrue(data.endswith(b"\x00\xff\x2f\x00"))
+        self.assertEqual(_notes(data), self.expected)
+        self.assertEqual(data.count(b"\xff\x51\x03"), 2)
+
+        data = io.BytesIO()
+        with StreamingMIDIWriter(data, buffer_notes=16) as midi:
+            midi.addNotes(0, 0, [pitch for pitch, _, _ in self.notes], [time for _, time, _ in self.notes],
+                          [duration for _, _, duration in self.notes], 80)
+        self.assertEqual(_notes(data.getvalue()), self.expected)
+
+    def test_reorder_window(self):
+        """Test notes out of order within the window are sorted and later ones are rejected."""
+        order = list(range(len(self.notes)))
+        for index in range(0, len(order) - 1, 2):
+            order[index], order[index + 1] = order[index + 1], order[index]
+        data = io.BytesIO()
+        with StreamingMIDIWriter(data, reorder_window=2, buffer_notes=16) as midi:
+            for index in order:
+                pitch, time, duration = self.notes[index]
+                midi.addNote(0, 0, pitch, time, duration, 80)
+        self.assertEqual(_notes(data.getvalue()), self.expected)
+
+        midi = StreamingMIDIWriter(io.BytesIO(), buffer_notes=4)
+        for time in range(8):
+            midi.addNote(0, 0, 60, time, 1, 80)
+        with self.assertRaisesRegex(ValueError, "reorder_window"):
+            midi.addNote(0, 0, 62, 1, 1, 80)
+        with self.assertRaises(ValueError):
+            StreamingMIDIWriter(io.BytesIO(), reorder_window=-1)
+
+    def test_matches_smf_writer_with_overlaps(self):
+        """Test out-of-order, zero-length and overlapping notes give the same notes as SMFWriter."""
+        rng = random.Random(5)
+        notes = sorted(((rng.randint(0, 1), rng.randint(60, 62), rng.randint(0, 400) / 4, rng.randint(0, 8) / 4,
+                         rng.randint(1, 127)) for _ in range(600)), key=lambda note: note[2])
+        # Swap neighbours, so notes arrive up to two quarter notes out of order.
+        for index in range(len(notes) - 1):
+            if rng.random() < 0.5 and notes[index + 1][2] - notes[index][2] <= 2:
+                notes[index], notes[index + 1] = notes[index + 1], notes[index]
+        for policy in ("truncate", "merge", "drop"):
+            reference = SMFWriter(1, overlap_policy=policy)
+            data = io.BytesIO()
+            with StreamingMIDIWriter(data, reorder_window=2, buffer_notes=5, overlap_policy=policy) as midi:
+                for channel, pitch, time, duration, velocity in notes:
+                    midi.addNote(0, channel, pitch, time, duration, velocity)
+                    reference.addNote(0, channel, pitch, time, duration, velocity)
+            self.assertEqual(sorted(_notes(data.getvalue())), sorted(_notes(reference.to_bytes())), policy)
+
+    def test_stream_backend(self):
+        """Test generators write the same notes with the stream backend as with smf."""
+        melody = [(60, 0.25), (62, 0.125), (63, 1 / 3), (67, 0.25)]
+        progression = [("C4", "major_seventh"), ("A3", "minor_seventh", 1), ("D4", "dominant_ninth")]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nested", "melody.mid")
+            melody_to_midi(melody, output_file=path, backend="stream")
+            with open(path, "rb") as file:
+                self.assertEqual(_notes(file.read()), _notes(melody_to_midi(melody, return_midi=True,
+                                                                                 backend="smf").to_bytes()))
+            expected = _notes(compose_chord_progression(progression, patterns=[3, 3, 2], backend="smf").to_bytes())
+            for backend in ("stream", "midiutil"):
+                os.remove(path)
+                compose_chord_progression(progression, output_file=path, patterns=[3, 3, 2], backend=backend)
+                with open(path, "rb") as file:
+                    self.assertEqual(_notes(file.read()), expected)
+            generate_raga_melody_prog(length=5000, output_file=path, backend="stream")
+            with open(path, "rb") as file:
+                self.assertEqual(len(decode_notes(file.read())), 5001)
+        with self.assertRaises(ValueError):
+            create_midi_file("stream")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Unit tests for the integer tick timeline.
+
+Tests exact subdivisions, tick resolution without float drift and the radix argsort.
+"""
+
+import unittest
+from fractions import Fraction
+
+import numpy as np
+
+from src.music_theory.midi.compose import compose_chord_progression
+from src.music_theory.midi.smf import decode_notes
+from src.music_theory.midi.timeline import Timeline, stable_argsort, to_ticks
+
+
+class TestTimeline(unittest.TestCase):
+    """Tests for Timeline, to_ticks and stable_argsort."""
+
+    def test_exact_times(self):
+        """Test subdivisions and positions stay exact and notes tile on the tick grid."""
+        timeline = Timeline(960)
+        parts = timeline.subdivide(4, [1, 1, 1])
+        self.assertEqual(parts, [(0, Fraction(4, 3)), (Fraction(4, 3), Fraction(4, 3)),
+                                 (Fraction(8, 3), Fraction(4, 3))])
+        self.assertEqual(timeline.positions([0.1] * 30)[-1], Fraction(29, 10))
+        self.assertEqual(timeline.ticks(0.3), 288)
+        # 1/7 of a quarter note is not on the grid: ends are resolved, so consecutive notes still touch.
+        first, second = timeline.note(0, Fraction(1, 7)), timeline.note(Fraction(1, 7), Fraction(1, 7))
+        self.assertEqual(first[0] + first[1], second[0])
+        self.assertEqual([timeline.ticks(value) for value in first + second], [0, 137, 137, 137])
+        self.assertEqual(Timeline(480).ticks(1.5), 720)
+        self.assertEqual(to_ticks([0.1 * 3, 299.90000000000001, 1 / 3]).tolist(), [288, 287904, 320])
+        with self.assertRaises(ValueError):
+            Timeline(0)
+
+    def test_stable_argsort(self):
+        """Test the radix argsort matches NumPy's stable argsort for small, large and negative keys."""
+        rng = np.random.default_rng(5)
+        for keys in (rng.integers(0, 50, 1000), rng.integers(-2 ** 40, 2 ** 40, 1000), np.zeros(10, dtype=int),
+                     np.array([], dtype=int)):
+            self.assertTrue(np.array_equal(stable_argsort(keys), np.argsort(keys, kind="stable")))
+
+    def test_no_drift(self):
+        """Test long progressions of float durations land on exact ticks."""
+        midi = compose_chord_progression([("C4", "major")] * 3000, chord_durations=[0.1] * 3000, backend="smf")
+        starts = sorted({note[3] for note in decode_notes(midi.to_bytes())})
+        self.assertEqual(starts, list(range(0, 3000 * 96, 96)))
+
+
+if __name__ == "__main__":
+    unittest.main()
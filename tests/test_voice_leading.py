@@ -0,0 +1,156 @@
+"""
+Unit tests for the voice leading module.
+
+Tests the distance kernels against the pairwise functions, and
+progression-level voicing against exhaustive search and greedy smoothing.
+"""
+
+import random
+import unittest
+from itertools import combinations, product
+
+import numpy as np
+
+from src.music_theory.core.chord import Chord
+from src.music_theory.core.notes import (
+    build_chord,
+    calculate_mean_chord_distance_between_notes,
+    calculate_taxicab_distance_between_notes,
+    find_chord_voicing_by_common_tones,
+    find_closest_chord_voicing_for_voice_leading,
+    find_smooth_chord_voicing_from_notes,
+    generate_all_chord_voicings,
+)
+from src.music_theory.core.pitch_class_set import common_tone_count
+from src.music_theory.core.voice_leading import (
+    optimal_voice_leading,
+    voice_assignment,
+    voice_assignment_distances,
+    voice_leading_distances,
+    _candidate_voicings,
+    _chord_key,
+)
+
+
+def movement(voicings):
+    return sum(calculate_taxicab_distance_between_notes(a, b) for a, b in zip(voicings, voicings[1:]))
+
+
+class TestDistanceKernels(unittest.TestCase):
+    """Tests for the broadcast distance matrices."""
+
+    def test_matches_pairwise_functions(self):
+        """Test every kernel against its pairwise counterpart on chords of mixed sizes."""
+        rng = random.Random(0)
+        candidates = [[rng.randint(36, 84) for _ in range(rng.randint(1, 6))] for _ in range(40)]
+        references = [[rng.randint(36, 84) for _ in range(rng.randint(1, 6))] for _ in range(7)]
+        distances = voice_leading_distances(candidates, references)
+        for i, candidate in enumerate(candidates):
+            for j, reference in enumerate(references):
+                self.assertEqual(distances.taxicab[i, j], calculate_taxicab_distance_between_notes(candidate, reference))
+                self.assertAlmostEqual(distances.mean[i, j],
+                                       calculate_mean_chord_distance_between_notes(candidate, reference))
+                self.assertEqual(distances.common_tones[i, j], common_tone_count(candidate, reference))
+
+    def test_padded_arrays(self):
+        """Test that negative entries are treated as padding."""
+        candidates = np.array([[67, 60, 64, -1], [60, 65, 69, 72]])
+        distances = voice_leading_distances(candidates, [[60, 64, 67]])
+        self.assertEqual(distances.taxicab[:, 0].tolist(), [0, 3])
+        self.assertEqual(distances.common_tones[:, 0].tolist(), [3, 1])
+
+    def test_low_register_smoothing(self):
+        """Test smoothing low chords picks the closest voicing with valid MIDI notes."""
+        chord_one, chord_2 = [14, 17, 21], [7, 11, 14]
+        voicing = find_smooth_chord_voicing_from_notes(chord_one, chord_2)
+        self.assertEqual(voicing, [14, 19, 23])
+        candidates = [candidate for candidate in generate_all_chord_voicings([note - 12 for note in chord_2], 3)
+                      if min(candidate) >= 0]
+        self.assertEqual(calculate_taxicab_distance_between_notes(voicing, chord_one),
+                         min(calculate_taxicab_distance_between_notes(candidate, chord_one) for candidate in candidates))
+        self.assertGreaterEqual(min(find_closest_chord_voicing_for_voice_leading(2, "major", 7, "major", 0)), 0)
+
+
+def brute_force_edge_cover(chord_1, chord_2, distance):
+    """Cheapest set of moves touching every voice of both chords, by exhaustive search."""
+    edges = list(product(range(len(chord_1)), range(len(chord_2))))
+    costs = [sum(distance(chord_1[i], chord_2[j]) for i, j in subset)
+             for size in range(max(len(chord_1), len(chord_2)), len(chord_1) + len(chord_2))
+             for subset in combinations(edges, size)
+             if {i for i, _ in subset} == set(range(len(chord_1))) and {j for _, j in subset} == set(range(len(chord_2)))]
+    return min(costs)
+
+
+class TestVoiceAssignment(unittest.TestCase):
+    """Tests for voice_assignment and its batch mode."""
+
+    def test_matches_exhaustive_search(self):
+        """Test pitch and pitch-class costs against every edge cover."""
+        rng = random.Random(1)
+        pitch_class_distance = lambda a, b: min((a - b) % 12, (b - a) % 12)
+        for _ in range(100):
+            chord_1 = [rng.randint(50, 75) for _ in range(rng.randint(1, 4))]
+            chord_2 = [rng.randint(50, 75) for _ in range(rng.randint(1, 4))]
+            result = voice_assignment(chord_1, chord_2)
+            self.assertEqual(result.cost, brute_force_edge_cover(chord_1, chord_2, lambda a, b: abs(a - b)))
+            self.assertEqual(result.cost, sum(abs(a - b) for a, b in result.moves))
+            result = voice_assignment(chord_1, chord_2, pitch_class=True)
+            self.assertEqual(result.cost, brute_force_edge_cover(chord_1, chord_2, pitch_class_distance))
+
+    def test_splitting_voices(self):
+        """Test that a voice splits so no voice is left out, unlike sliding alignment."""
+        triad, seventh = [60, 64, 67], [59, 62, 65, 67]
+        result = voice_assignment(triad, seventh)
+        self.assertEqual(result.moves, [(60, 59), (60, 62), (64, 65), (67, 67)])
+        self.assertEqual({target for _, target in result.moves}, set(seventh))
+        self.assertEqual(voice_assignment(seventh, triad).cost, result.cost)
+
+    def test_batch(self):
+        """Test the batch costs against single pairs, padded and ragged."""
+        chords_1 = [build_chord(60, "major"), build_chord(62, "minor_seventh"), build_chord(55, "dominant_thirteenth")]
+        chords_2 = [build_chord(65, "major_seventh"), build_chord(67, "dominant_seventh"), build_chord(60, "major")]
+        for pitch_class in (False, True):
+            expected = [voice_assignment(a, b, pitch_class).cost for a, b in zip(chords_1, chords_2)]
+            self.assertEqual(voice_assignment_distances(chords_1, chords_2, pitch_class).tolist(), expected)
+        padded = np.array([[67, 60, 64, -1], [60, 64, 67, 71]])
+        self.assertEqual(voice_assignment_distances(padded, padded[::-1]).tolist(), [4, 4])
+
+
+class TestOptimalVoiceLeading(unittest.TestCase):
+    """Tests for optimal_voice_leading."""
+
+    def test_matches_exhaustive_search(self):
+        """Test that the chosen voicings minimize total movement."""
+        progression = [build_chord(60, "major"), build_chord(57, "minor"), build_chord(65, "major_seventh"),
+                       build_chord(55, "dominant_seventh")]
+        register = (52, 76)
+        result = optimal_voice_leading(progression, register=register, drift_weight=0, max_candidates=12)
+        options = [[progression[0]]] + [_candidate_voicings(_chord_key(c), register, None, 12).tolist()
+                                        for c in progression[1:]]
+        best = min(movement(choice) for choice in product(*options))
+        self.assertEqual(movement(result), best)
+        for voicing, chord in zip(result, progression):
+            self.assertEqual(sorted(n % 12 for n in voicing), sorted(n % 12 for n in chord))
+
+    def test_stays_in_register(self):
+        """Test that a long progression stays in range and beats greedy smoothing."""
+        roots = [60, 65, 67, 62, 69, 64] * 50
+        progression = [build_chord(root, "dominant_seventh") for root in roots]
+        result = optimal_voice_leading(progression, register=(48, 79))
+        self.assertTrue(all(48 <= note <= 79 for voicing in result[1:] for note in voicing))
+        greedy = [progression[0]]
+        for chord in progression[1:]:
+            greedy.append(find_chord_voicing_by_common_tones(greedy[-1], chord))
+        self.assertLessEqual(movement(result), movement(greedy))
+
+    def test_chords_and_errors(self):
+        """Test Chord inputs are revoiced and impossible registers are rejected."""
+        result = optimal_voice_leading([Chord.build(60, "major"), Chord.build(65, "major")])
+        self.assertIsInstance(result[1], Chord)
+        self.assertEqual(result[1].chord_type, "major")
+        with self.assertRaises(ValueError):
+            optimal_voice_leading([[60, 64, 67], [60, 64, 67, 71]], register=(60, 64))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the voicing module.
+
+Tests the pruned voicing generator against brute-force enumeration.
+"""
+
+import math
+import unittest
+from itertools import product
+from unittest import mock
+
+from src.music_theory.core import voicing
+from src.music_theory.core.notes import generate_chord_voicings
+from src.music_theory.core.voicing import (
+    iter_chord_voicings,
+    top_chord_voicings,
+    count_chord_voicings,
+    chord_voicing_at,
+)
+
+
+def brute_force_voicings(chord, octaves):
+    """All voicings sorted by evenness, as the original enumeration produced them."""
+    def get_evenness(voicing):
+        return math.prod(voicing[i] - voicing[i - 1] for i in range(1, len(voicing)))
+    combos = product(*[[note + 12 * octave for octave in range(octaves)] for note in chord])
+    return sorted([sorted(combo) for combo in combos], key=get_evenness)
+
+
+class TestIterChordVoicings(unittest.TestCase):
+    """Tests for iter_chord_voicings and its helpers."""
+
+    def test_matches_brute_force_order(self):
+        """Test that unconstrained output equals the sorted cartesian product."""
+        for chord, octaves in [([60, 64, 67], 3), ([60, 64, 67, 71], 2), ([62, 65, 69, 72, 76], 2)]:
+            self.assertEqual(list(iter_chord_voicings(chord, octaves)), brute_force_voicings(chord, octaves))
+
+    def test_min_span_matches_filtered_voicings(self):
+        """Test that min_span reproduces generate_chord_voicings filtering."""
+        chord = [60, 64, 67, 70]
+        expected = generate_chord_voicings(chord, 3)
+        self.assertEqual(list(iter_chord_voicings(chord, 3, min_span=24)), expected)
+
+    def test_duplicate_pitches(self):
+        """Test chords with doubled tones keep every placement."""
+        chord = [60, 64, 67, 60]
+        self.assertEqual(list(iter_chord_voicings(chord, 2)), brute_force_voicings(chord, 2))
+
+    def test_constraints_prune(self):
+        """Test register, gap and bass constraints."""
+        chord = [60, 64, 67, 71]
+        expected = [v for v in brute_force_voicings(chord, 3)
+                    if v[0] >= 62 and v[-1] <= 90 and v[0] % 12 == 4
+                    and all(v[i] - v[i - 1] <= 8 for i in range(1, len(v)))]
+        result = list(iter_chord_voicings(chord, 3, low=62, high=90, max_gap=8, bass_pitch_class=4))
+        self.assertEqual(result, expected)
+        self.assertEqual(count_chord_voicings(chord, 3, low=62, high=90, max_gap=8, bass_pitch_class=4), len(expected))
+
+    def test_top_k_and_percentile(self):
+        """Test partial consumption helpers."""
+        chord = [60, 64, 67, 70, 74]
+        voicings = brute_force_voicings(chord, 3)
+        self.assertEqual(top_chord_voicings(chord, 3, 5), voicings[:5])
+        self.assertEqual(chord_voicing_at(chord, 3, 0.25), voicings[math.floor(0.25 * len(voicings))])
+        self.assertIsNone(chord_voicing_at(chord, 3, 0.5, high=60))
+
+    def test_percentile_paths_agree(self):
+        """Test the NumPy enumeration of small spaces picks the same voicings as the lazy search."""
+        chord = [60, 64, 67, 71]
+        for constraints in ({}, {"low": 62, "high": 90, "max_gap": 8, "bass_pitch_class": 4}, {"min_span": 24},
+                            {"pitch_class_order": [4, 7, 11, 0]}):
+            expected = list(iter_chord_voicings(chord, 3, **constraints))
+            for fraction in (0, 0.3, 0.99):
+                index = math.floor(fraction * len(expected))
+                self.assertEqual(chord_voicing_at(chord, 3, fraction, **constraints), expected[index])
+                with mock.patch.object(voicing, "BRUTE_FORCE_LIMIT", 0):
+                    self.assertEqual(chord_voicing_at(chord, 3, fraction, **constraints), expected[index])
+
+
+if __name__ == '__main__':
+    unittest.main()